@@ -25,6 +25,16 @@ def _short_err(exc):
     return msg
 
 
+# Page Visibility API override: chess.com (and any other page code that
+# pauses on visibilityState === 'hidden') always sees the page as visible.
+_VISIBILITY_OVERRIDE_JS = (
+    'Object.defineProperty(document,"visibilityState",'
+    '{get:()=>"visible",configurable:true});'
+    'Object.defineProperty(document,"hidden",'
+    '{get:()=>false,configurable:true});'
+)
+
+
 class BrowserLauncher:
     """Handles launching and connecting to Edge browser with debugging enabled."""
 
@@ -168,21 +178,18 @@ class BrowserLauncher:
             except Exception:
                 pass
 
-            # Layer 4 – Page Visibility API override: inject a script that
-            # runs on every new document so chess.com (and any other page code
-            # that pauses on visibilityState === 'hidden') always sees the
-            # page as visible, even when the window is minimised or covered.
+            # Layer 4 – Page Visibility API override: registered once so it
+            # runs on every new document before any page script, even when
+            # the window is minimised or covered.  The document that is
+            # already loaded at connect time never sees a "new document"
+            # event, so patch it directly once as well.
             try:
                 self.driver.execute_cdp_cmd(
                     'Page.addScriptToEvaluateOnNewDocument',
-                    {
-                        'source': (
-                            'Object.defineProperty(document,"visibilityState",'
-                            '{get:()=>"visible",configurable:true});'
-                            'Object.defineProperty(document,"hidden",'
-                            '{get:()=>false,configurable:true});'
-                        )
-                    },
+                    {'source': _VISIBILITY_OVERRIDE_JS},
+                )
+                self.driver.execute_cdp_cmd(
+                    'Runtime.evaluate', {'expression': _VISIBILITY_OVERRIDE_JS}
                 )
             except Exception:
                 pass
@@ -1,12 +1,18 @@
 """Chess.com interface for interacting with the game board."""
+import json
+import logging
 import re
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
 from uci_handler import UCIHandler
 
+# Per-move trace lines on the hot move path.  Unlike the print()ed status
+# and error lines they are silent unless logging is configured at DEBUG
+# level, and their arguments are only formatted when it is.
+log = logging.getLogger(__name__)
+
 # Substrings (lowercase) indicating the browser session is dead.
 # Keep in sync with the matching tuple in variants_client.py.
 _SESSION_DEATH_KEYWORDS = (
@@ -29,19 +35,2679 @@ _WEBDRIVER_NOISE_RE = re.compile(
     re.DOTALL,
 )
 
+# Algebraic square ("e4", "j10"): file letter + one or more rank digits.
+_SQ_RE = re.compile(r'^([a-z])(\d+)$')
+
+# File letter -> 1-based file number (a=1, b=2, ..., z=26).
+_FILE_NUM = {chr(ord('a') + i): i + 1 for i in range(26)}
+
 
 def _short_err(exc):
     """Return a concise one-liner from a (possibly verbose) exception.
 
-    Strips the verbose multi-line tail that Chromium-based WebDrivers
-    append (``from unknown error``, ``Session info``, ``Stacktrace``).
-    Also removes the leading ``Message: `` prefix so the caller's own
-    tag (e.g. ``[ChessCom] Error detecting turn:``) reads naturally.
-    """
-    msg = _WEBDRIVER_NOISE_RE.sub('', str(exc)).strip()
-    if msg.startswith('Message: '):
-        msg = msg[len('Message: '):]
-    return msg
+    Strips the verbose multi-line tail that Chromium-based WebDrivers
+    append (``from unknown error``, ``Session info``, ``Stacktrace``).
+    Also removes the leading ``Message: `` prefix so the caller's own
+    tag (e.g. ``[ChessCom] Error detecting turn:``) reads naturally.
+    """
+    msg = _WEBDRIVER_NOISE_RE.sub('', str(exc)).strip()
+    if msg.startswith('Message: '):
+        msg = msg[len('Message: '):]
+    return msg
+
+
+# Interpolation fractions for the intermediate points of a drop-move drag
+# (the last one lands exactly on the destination).  Precomputed once so
+# building a path is a single multiply-add per coordinate.
+_DRAG_STEPS = 3
+_DRAG_STEP_FRACTIONS = tuple(i / _DRAG_STEPS for i in range(1, _DRAG_STEPS + 1))
+
+
+# Replays a mouse path in-page as synthetic pointer + mouse events.
+# arguments[0] is a list of [kind, x, y, delayAfterMs] steps where kind is
+# 'move', 'down' or 'up'; the async callback receives true when every step
+# found an element to dispatch on, false otherwise.  Used to collapse a
+# multi-event drag into a single execute_async_script round-trip.
+_DISPATCH_MOUSE_PATH_JS = """
+    var path = arguments[0];
+    var done = arguments[arguments.length - 1];
+    var buttons = 0;
+    var POINTER = { move: 'pointermove', down: 'pointerdown', up: 'pointerup' };
+    var MOUSE   = { move: 'mousemove',   down: 'mousedown',   up: 'mouseup'   };
+
+    function fire(kind, x, y) {
+        var el = document.elementFromPoint(x, y);
+        if (!el) return false;
+        if (kind === 'down') buttons = 1;
+        if (kind === 'up')   buttons = 0;
+        var base = {
+            bubbles: true, cancelable: true, view: window,
+            clientX: x, clientY: y, screenX: x, screenY: y,
+            button: 0, buttons: buttons
+        };
+        el.dispatchEvent(new PointerEvent(POINTER[kind], Object.assign({
+            pointerId: 1, pointerType: 'mouse', isPrimary: true
+        }, base)));
+        el.dispatchEvent(new MouseEvent(MOUSE[kind], base));
+        return true;
+    }
+
+    var i = 0;
+    (function next() {
+        while (i < path.length) {
+            var step = path[i++];
+            if (!fire(step[0], step[1], step[2])) { done(false); return; }
+            if (step[3] > 0) { setTimeout(next, step[3]); return; }
+        }
+        done(true);
+    })();
+"""
+
+
+# Click-click move in one execute_async_script call: cursor move + click on
+# (arguments[0], arguments[1]), then after a 150 ms gap cursor move + click
+# on (arguments[2], arguments[3]).  The callback receives false when either
+# point hits no element (see make_move_cdp for the cursor/gap rationale).
+_CLICK_CLICK_MOVE_JS = """
+    var fx = arguments[0], fy = arguments[1];
+    var tx = arguments[2], ty = arguments[3];
+    var done = arguments[4];
+
+    function moveCursor(x, y) {
+        var base = {
+            bubbles: true, cancelable: true, view: window,
+            clientX: x, clientY: y, screenX: x, screenY: y,
+            buttons: 0
+        };
+        document.dispatchEvent(new PointerEvent('pointermove',
+            Object.assign({}, base, {
+                pointerId: 1, pointerType: 'mouse', isPrimary: true
+            })));
+        document.dispatchEvent(new MouseEvent('mousemove', base));
+    }
+
+    function syntheticClick(x, y) {
+        var el = document.elementFromPoint(x, y);
+        if (!el) return false;
+        function mkP(t, b) {
+            return new PointerEvent(t, {
+                bubbles: true, cancelable: true, view: window,
+                clientX: x,  clientY: y,
+                screenX: x,  screenY: y,
+                pointerId: 1, pointerType: 'mouse',
+                isPrimary: true, button: 0, buttons: b
+            });
+        }
+        function mkM(t, b) {
+            return new MouseEvent(t, {
+                bubbles: true, cancelable: true, view: window,
+                clientX: x,  clientY: y,
+                screenX: x,  screenY: y,
+                button: 0, buttons: b
+            });
+        }
+        el.dispatchEvent(mkP('pointerdown', 1));
+        el.dispatchEvent(mkM('mousedown',   1));
+        el.dispatchEvent(mkP('pointerup',   0));
+        el.dispatchEvent(mkM('mouseup',     0));
+        el.dispatchEvent(mkM('click',       0));
+        return true;
+    }
+
+    moveCursor(fx, fy);
+    if (!syntheticClick(fx, fy)) { done(false); return; }
+    setTimeout(function() {
+        moveCursor(tx, ty);
+        done(syntheticClick(tx, ty));
+    }, 150);
+"""
+
+
+# Declares findBoard(): the main board element, via the helper bundle's
+# cached lookup when it is installed, else the selector chain directly.
+_FIND_BOARD_FN_JS = """
+function findBoard() {
+    if (window.__tilted && window.__tilted.board) return window.__tilted.board();
+    return document.querySelector('.TheBoard-squares') ||
+           document.querySelector('[class*="Board-squares"]') ||
+           document.querySelector('.board') ||
+           document.querySelector('[class*="board"]');
+}
+"""
+
+
+# Coordinate-label candidates around a board element: declares
+# boardLabelCandidates(board) -> [{el, text, rect}] for elements whose
+# trimmed text looks like a file letter or rank number.  The search is
+# scoped to the board's parent (SVG <text> and coord/notation elements plus
+# their descendants); only when that finds nothing is the whole document
+# walked.  Text is filtered before any rect is read, and all rects are then
+# read in one pass so the page lays out once.
+_BOARD_LABELS_FN_JS = """
+// Label tests shared by every loop over the candidates, compiled once
+const LABEL_LETTER_RE = /^[a-z]$/;
+const LABEL_NUMBER_RE = /^[0-9]+$/;
+// Pockets, material counters, player info, etc. (not board-size labels)
+const LABEL_SKIP_RE = /pocket|material|player|captured|score|clock|timer/i;
+// Notifications, icons, badges, etc. (not orientation labels)
+const LABEL_UI_RE = /notification|icon|badge|button|menu/i;
+
+// className is an SVGAnimatedString on SVG elements; treat it as empty
+function classOf(el) {
+    return el && typeof el.className === 'string' ? el.className : '';
+}
+
+function boardLabelCandidates(board) {
+    const LABEL_RE = /^([a-z]|[0-9]+)$/;
+    function collect(elements) {
+        const out = [];
+        for (const el of elements) {
+            const text = el.textContent?.trim();
+            if (text && text.length <= 3 && LABEL_RE.test(text)) out.push({ el: el, text: text });
+        }
+        return out;
+    }
+
+    let candidates = [];
+    const scope = board.parentElement;
+    if (scope) {
+        const scoped = new Set();
+        for (const hit of scope.querySelectorAll('text, [class*="coord"], [class*="notation"]')) {
+            scoped.add(hit);
+            for (const child of hit.querySelectorAll('*')) scoped.add(child);
+        }
+        candidates = collect(scoped);
+    }
+    if (candidates.length === 0) candidates = collect(document.querySelectorAll('*'));
+
+    for (const c of candidates) c.rect = c.el.getBoundingClientRect();
+    return candidates;
+}
+"""
+
+
+# Script behind detect_board_size(): files from the furthest file letter
+# and ranks from the highest rank number among the labels within 60 px of
+# the board.  Returns {files, ranks, method}, defaulting to 8x8.
+_DETECT_BOARD_SIZE_JS = _FIND_BOARD_FN_JS + _BOARD_LABELS_FN_JS + """
+    // Find the main game board
+    const board = findBoard();
+
+    if (!board) {
+        return { files: 8, ranks: 8, method: 'default-no-board' };
+    }
+
+    const boardRect = board.getBoundingClientRect();
+    const margin = 60; // Area around board where labels appear
+
+    // Collect all coordinate labels near the board
+    const fileLetters = new Set();
+    const rankNumbers = new Set();
+
+    for (const { el, text, rect } of boardLabelCandidates(board)) {
+        if (rect.width === 0 || rect.height === 0) continue;
+
+        // Skip elements inside pockets, material counters, player info, etc.
+        if (LABEL_SKIP_RE.test(classOf(el)) || LABEL_SKIP_RE.test(classOf(el.parentElement))) {
+            continue;
+        }
+
+        // Check for file letters (a-z) - should be ABOVE or BELOW board
+        if (LABEL_LETTER_RE.test(text)) {
+            const nearTopOrBottom = (
+                Math.abs(rect.top - boardRect.bottom) < margin ||
+                Math.abs(rect.bottom - boardRect.top) < margin
+            );
+            if (nearTopOrBottom) {
+                fileLetters.add(text);
+            }
+        }
+        // Check for rank numbers (1-14) - should be LEFT or RIGHT of board
+        else if (LABEL_NUMBER_RE.test(text)) {
+            const nearLeftOrRight = (
+                Math.abs(rect.left - boardRect.right) < margin ||
+                Math.abs(rect.right - boardRect.left) < margin
+            );
+            const num = parseInt(text);
+            if (nearLeftOrRight && num >= 1 && num <= 14) {
+                rankNumbers.add(num);
+            }
+        }
+    }
+
+    // Determine board size from labels
+    let files = 8, ranks = 8;
+    let method = 'default';
+
+    if (fileLetters.size > 0 && rankNumbers.size > 0) {
+        // Find max file letter
+        const maxFile = Array.from(fileLetters).sort().pop();
+        files = maxFile.charCodeAt(0) - 'a'.charCodeAt(0) + 1;
+
+        // Find max rank number
+        ranks = Math.max(...Array.from(rankNumbers));
+
+        method = 'coordinate-labels';
+    }
+
+    return { files, ranks, method };
+"""
+
+# Script behind get_board_orientation(): the 'flipped' class first, then the
+# topmost rank label within 40 px of the board.  Returns
+# {is_flipped, method, detail, debug}.
+_BOARD_ORIENTATION_JS = _FIND_BOARD_FN_JS + _BOARD_LABELS_FN_JS + """
+    const debug = { allLabels: [], nearLabels: [], boardInfo: null };
+
+    // STEP 1: Find the MAIN game board
+    const board = findBoard();
+
+    if (!board) {
+        return {
+            is_flipped: false,
+            method: 'none',
+            detail: 'board element not found',
+            debug: debug
+        };
+    }
+
+    const boardRect = board.getBoundingClientRect();
+    debug.boardInfo = {
+        top: Math.round(boardRect.top),
+        left: Math.round(boardRect.left),
+        width: Math.round(boardRect.width),
+        height: Math.round(boardRect.height),
+        hasFlippedClass: board.classList.contains('flipped')
+    };
+
+    // METHOD 1: Check for 'flipped' CSS class (like Wilted-Chess-Client)
+    if (board.classList.contains('flipped')) {
+        return {
+            is_flipped: true,
+            method: 'css-class',
+            detail: 'board has "flipped" class',
+            debug: debug
+        };
+    }
+
+    // METHOD 2: Analyze coordinate labels (generalized for any board size)
+    const margin = 40; // Coordinate labels are right next to the board
+    const coordinates = [];
+    const allRankNumbers = new Set();
+
+    // First pass: find all rank numbers near the board
+    for (const { el, text, rect } of boardLabelCandidates(board)) {
+        // Check if it's a number between 1-14 (support up to 14x14 boards)
+        if (LABEL_NUMBER_RE.test(text)) {
+            const num = parseInt(text);
+            if (num >= 1 && num <= 14) {
+
+                if (rect.width > 0 && rect.height > 0) {
+                    const className = classOf(el);
+                    const labelInfo = {
+                        text: text,
+                        number: num,
+                        top: Math.round(rect.top),
+                        left: Math.round(rect.left),
+                        width: Math.round(rect.width),
+                        height: Math.round(rect.height),
+                        className: el.className
+                    };
+
+                    // Track ALL labels for debugging
+                    debug.allLabels.push(labelInfo);
+
+                    // FILTER 1: Exclude UI elements (notifications, icons, badges)
+                    if (LABEL_UI_RE.test(className)) {
+                        labelInfo.excluded = 'UI element';
+                        continue;
+                    }
+
+                    // FILTER 2: Must be near the board (within 40px)
+                    const nearBoard =
+                        Math.abs(rect.left - boardRect.left) < margin ||
+                        Math.abs(rect.right - boardRect.right) < margin ||
+                        Math.abs(rect.top - boardRect.top) < margin ||
+                        Math.abs(rect.bottom - boardRect.bottom) < margin;
+
+                    if (nearBoard) {
+                        debug.nearLabels.push(labelInfo);
+                        allRankNumbers.add(num);
+                        coordinates.push({
+                            text: text,
+                            number: num,
+                            top: rect.top,
+                            left: rect.left
+                        });
+                    }
+                }
+            }
+        }
+    }
+
+    // Determine orientation from topmost label near board
+    if (coordinates.length >= 2) {
+        coordinates.sort((a, b) => a.top - b.top);
+        const topmost = coordinates[0];
+        const bottommost = coordinates[coordinates.length - 1];
+
+        debug.topmost = { text: topmost.text, top: Math.round(topmost.top) };
+        debug.bottommost = { text: bottommost.text, top: Math.round(bottommost.top) };
+
+        // Determine min and max ranks
+        const minRank = Math.min(...Array.from(allRankNumbers));
+        const maxRank = Math.max(...Array.from(allRankNumbers));
+
+        if (topmost.number === minRank) {
+            return {
+                is_flipped: true,
+                method: 'coordinate-labels',
+                detail: `rank ${minRank} at top (black perspective)`,
+                debug: debug
+            };
+        } else if (topmost.number === maxRank) {
+            return {
+                is_flipped: false,
+                method: 'coordinate-labels',
+                detail: `rank ${maxRank} at top (white perspective)`,
+                debug: debug
+            };
+        }
+    }
+
+    // Fallback: assume not flipped
+    return {
+        is_flipped: false,
+        method: 'default',
+        detail: 'assumed not flipped (no labels found)',
+        debug: debug
+    };
+"""
+
+# detect_board_size() + get_board_orientation() + board rect in a single
+# script and a single pass over the label candidates: each one is measured
+# once and checked both as a size label (files/ranks within 60 px
+# of the board) and as an orientation label (rank numbers within 40 px).
+# Returns {is_flipped, orientation_method, files, ranks, size_method,
+# board_rect}; board_rect is null when no board is found.
+_PROBE_BOARD_JS = _FIND_BOARD_FN_JS + _BOARD_LABELS_FN_JS + """
+    const board = findBoard();
+
+    if (!board) {
+        return {
+            is_flipped: false, orientation_method: 'none',
+            files: 8, ranks: 8, size_method: 'default-no-board',
+            board_rect: null
+        };
+    }
+
+    const boardRect = board.getBoundingClientRect();
+    const SIZE_MARGIN = 60;         // Area around board where labels appear
+    const ORIENT_MARGIN = 40;       // Rank labels are right next to the board
+
+    const fileLetters = new Set();
+    const rankNumbers = new Set();
+    const orientRanks = new Set();
+    const coordinates = [];
+
+    for (const { el, text, rect } of boardLabelCandidates(board)) {
+        if (rect.width === 0 || rect.height === 0) continue;
+        const isLetter = LABEL_LETTER_RE.test(text);
+        const className = classOf(el);
+
+        // Size labels: skip pockets, material counters, player info, etc.
+        const skipForSize = LABEL_SKIP_RE.test(className) ||
+                            LABEL_SKIP_RE.test(classOf(el.parentElement));
+
+        if (isLetter) {
+            // File letters sit ABOVE or BELOW the board
+            if (!skipForSize && (
+                    Math.abs(rect.top - boardRect.bottom) < SIZE_MARGIN ||
+                    Math.abs(rect.bottom - boardRect.top) < SIZE_MARGIN)) {
+                fileLetters.add(text);
+            }
+            continue;
+        }
+
+        const num = parseInt(text);
+        if (num < 1 || num > 14) continue;
+
+        // Rank numbers sit LEFT or RIGHT of the board
+        if (!skipForSize && (
+                Math.abs(rect.left - boardRect.right) < SIZE_MARGIN ||
+                Math.abs(rect.right - boardRect.left) < SIZE_MARGIN)) {
+            rankNumbers.add(num);
+        }
+
+        // Orientation labels: exclude UI elements (notifications, icons, badges)
+        if (LABEL_UI_RE.test(className)) continue;
+        const nearBoard =
+            Math.abs(rect.left - boardRect.left) < ORIENT_MARGIN ||
+            Math.abs(rect.right - boardRect.right) < ORIENT_MARGIN ||
+            Math.abs(rect.top - boardRect.top) < ORIENT_MARGIN ||
+            Math.abs(rect.bottom - boardRect.bottom) < ORIENT_MARGIN;
+        if (nearBoard) {
+            orientRanks.add(num);
+            coordinates.push({ number: num, top: rect.top });
+        }
+    }
+
+    // Board size from labels
+    let files = 8, ranks = 8, sizeMethod = 'default';
+    if (fileLetters.size > 0 && rankNumbers.size > 0) {
+        const maxFile = Array.from(fileLetters).sort().pop();
+        files = maxFile.charCodeAt(0) - 'a'.charCodeAt(0) + 1;
+        ranks = Math.max(...rankNumbers);
+        sizeMethod = 'coordinate-labels';
+    }
+
+    // Orientation: 'flipped' CSS class, else the topmost rank label
+    let isFlipped = false, orientMethod = 'default';
+    if (board.classList.contains('flipped')) {
+        isFlipped = true;
+        orientMethod = 'css-class';
+    } else if (coordinates.length >= 2) {
+        let topmost = coordinates[0];
+        for (const c of coordinates) if (c.top < topmost.top) topmost = c;
+        if (topmost.number === Math.min(...orientRanks)) {
+            isFlipped = true;
+            orientMethod = 'coordinate-labels';
+        } else if (topmost.number === Math.max(...orientRanks)) {
+            orientMethod = 'coordinate-labels';
+        }
+    }
+
+    return {
+        is_flipped: isFlipped,
+        orientation_method: orientMethod,
+        files: files,
+        ranks: ranks,
+        size_method: sizeMethod,
+        board_rect: {
+            left: Math.round(boardRect.left),
+            top: Math.round(boardRect.top),
+            width: Math.round(boardRect.width)
+        }
+    };
+"""
+
+
+# Runtime.evaluate expression for get_username_from_page(): the user's
+# name from the status bar, or null.
+_USERNAME_EXPR = """(() => {
+    const statusBarUsername = document.querySelector('.status-bar-username');
+    return statusBarUsername ? statusBarUsername.textContent.trim() : null;
+})()"""
+
+
+# Pixel centre of the square in arguments[0] ('e2', 'j10') for the given
+# orientation and board size (see get_square_coordinates()).  The square is
+# parsed in-page so the script text is the same on every call.  Returns
+# {x, y, method, flipped, boardSize, debug}, or null when no board is found.
+_SQUARE_COORDS_JS = _FIND_BOARD_FN_JS + """
+    const [square, isFlipped, numFiles, numRanks, DEBUG] = arguments;
+
+    // Convert file letter to number (a=1, b=2, ..., j=10, etc.) and
+    // support multi-digit ranks (e.g., '10', '14')
+    const fileNum = square.charCodeAt(0) - 96;
+    const rankNumber = parseInt(square.slice(1), 10);
+
+    // Find the chess board
+    const board = findBoard();
+
+    if (!board) {
+        if (DEBUG) console.log('[Coords] Could not find board element');
+        return null;
+    }
+
+    const rect = board.getBoundingClientRect();
+    const squareSize = rect.width / numFiles;
+
+    // Orientation resolved once into linear maps (pixel coords (0,0) at
+    // top-left, any board size NxM):
+    //   WHITE ON BOTTOM: fileIndex = fileNum - 1         (a=0, b=1, ...)
+    //                    rankIndex = numRanks - rankNumber (highest rank=0)
+    //   BLACK ON BOTTOM: fileIndex = numFiles - fileNum  (rightmost=0)
+    //                    rankIndex = rankNumber - 1      (rank 1=0)
+    const fileBase = isFlipped ? numFiles : -1, fileSign = isFlipped ? -1 : 1;
+    const rankBase = isFlipped ? -1 : numRanks, rankSign = isFlipped ? 1 : -1;
+    const fileIndex = fileBase + fileSign * fileNum;
+    const rankIndex = rankBase + rankSign * rankNumber;
+    if (DEBUG) console.log('[Coords] ' + (isFlipped ? 'FLIPPED' : 'NORMAL') + ' (' + square + '): fileIndex=' + fileIndex + ', rankIndex=' + rankIndex);
+
+    const x = rect.left + (fileIndex * squareSize) + (squareSize / 2);
+    const y = rect.top + (rankIndex * squareSize) + (squareSize / 2);
+
+    return {
+        x: x,
+        y: y,
+        method: 'calculated',
+        flipped: isFlipped,
+        boardSize: { files: numFiles, ranks: numRanks },
+        debug: {
+            boardRect: { left: rect.left, top: rect.top, width: rect.width, height: rect.height },
+            squareSize: squareSize,
+            fileIndex: fileIndex,
+            rankIndex: rankIndex
+        }
+    };
+"""
+
+# Which playerbox ('top' | 'bottom' | 'unknown') shows the username in
+# arguments[0] (see get_player_position()).  The username is passed as an
+# argument, not interpolated, so the script text never changes and needs no
+# escaping.
+_PLAYER_POSITION_JS = """
+    const username = arguments[0];
+
+    // Find playerboxes
+    const topBox = document.querySelector('.playerbox-top');
+    const bottomBox = document.querySelector('.playerbox-bottom');
+
+    // Check top box
+    if (topBox) {
+        const topUserTag = topBox.querySelector('.playerbox-user-tag');
+        if (topUserTag && topUserTag.textContent.includes(username)) {
+            return 'top';
+        }
+    }
+
+    // Check bottom box
+    if (bottomBox) {
+        const bottomUserTag = bottomBox.querySelector('.playerbox-user-tag');
+        if (bottomUserTag && bottomUserTag.textContent.includes(username)) {
+            return 'bottom';
+        }
+    }
+
+    return 'unknown';
+"""
+
+# Like _PLAYER_POSITION_JS, plus that playerbox's data-player attribute:
+# returns {position, dataPlayer} (see get_player_color()).
+_PLAYER_COLOR_JS = """
+    const username = arguments[0];
+    const topBox = document.querySelector('.playerbox-top');
+    const bottomBox = document.querySelector('.playerbox-bottom');
+
+    // Check top box
+    if (topBox) {
+        const userTag = topBox.querySelector('.playerbox-user-tag');
+        if (userTag && userTag.textContent.includes(username)) {
+            const playerDiv = topBox.querySelector('[data-player]');
+            const dataPlayer = playerDiv ? playerDiv.getAttribute('data-player') : null;
+            return { position: 'top', dataPlayer: dataPlayer };
+        }
+    }
+
+    // Check bottom box
+    if (bottomBox) {
+        const userTag = bottomBox.querySelector('.playerbox-user-tag');
+        if (userTag && userTag.textContent.includes(username)) {
+            const playerDiv = bottomBox.querySelector('[data-player]');
+            const dataPlayer = playerDiv ? playerDiv.getAttribute('data-player') : null;
+            return { position: 'bottom', dataPlayer: dataPlayer };
+        }
+    }
+
+    return { position: 'unknown', dataPlayer: null };
+"""
+
+# Script behind detect_piece_colors(): counts white and black pieces per rank.
+# Returns {white_ranks, black_ranks, confidence, debug}, most populated
+# rank first.
+_DETECT_PIECE_COLORS_JS = """
+    // Square classes include the square name like "square-11" (a1),
+    // "square-88" (h8): "square-<file><rank>" where file=1-8 (a-h).
+    // Querying the squares directly and looking for a piece inside each
+    // avoids walking up from every piece to find its square.
+    const SQUARE_RE = /square-(\\d)(\\d)/;
+    // Piece classes are like "piece wp" (white pawn), "piece bn" (black
+    // knight): the first letter of the two-letter code is the colour.
+    const COLOR_RE = /(?:^|\\s)([wb])[a-z](?:\\s|$)|(white)|(black)/;
+
+    // Count pieces by color and rank (indexed by the single rank digit)
+    const whiteCounts = new Uint8Array(10);
+    const blackCounts = new Uint8Array(10);
+    let totalPieces = 0;
+
+    for (const square of document.querySelectorAll('[class*="square-"]')) {
+        if (typeof square.className !== 'string') continue;
+        const match = SQUARE_RE.exec(square.className);
+        if (!match) continue;
+        const piece = square.querySelector('[class*="piece"]');
+        if (!piece || typeof piece.className !== 'string') continue;
+        totalPieces++;
+
+        const color = COLOR_RE.exec(piece.className);
+        if (!color) continue;
+        const rank = match[2].charCodeAt(0) - 48;  // Second digit is the rank
+        if (color[1] === 'w' || color[2]) {
+            whiteCounts[rank]++;
+        } else {
+            blackCounts[rank]++;
+        }
+    }
+
+    if (totalPieces === 0) {
+        return { white_ranks: [], black_ranks: [], confidence: 'low', error: 'No pieces found' };
+    }
+
+    // Ranks holding pieces, most populated first (ties keep rank order)
+    function ranksByCount(counts) {
+        const ranks = [];
+        for (let r = 1; r <= 8; r++) if (counts[r]) ranks.push(r);
+        return ranks.sort((a, b) => counts[b] - counts[a]);
+    }
+    const whiteRanks = ranksByCount(whiteCounts);
+    const blackRanks = ranksByCount(blackCounts);
+
+    // Per-rank counts for the debug payload
+    const whitePieces = {};
+    const blackPieces = {};
+    for (let r = 1; r <= 8; r++) {
+        whitePieces[r] = whiteCounts[r];
+        blackPieces[r] = blackCounts[r];
+    }
+
+    // Determine confidence
+    let confidence = 'low';
+    if (whiteRanks.length >= 2 && blackRanks.length >= 2) {
+        confidence = 'high';
+    } else if (whiteRanks.length >= 1 && blackRanks.length >= 1) {
+        confidence = 'medium';
+    }
+
+    return {
+        white_ranks: whiteRanks,
+        black_ranks: blackRanks,
+        confidence: confidence,
+        debug: {
+            total_pieces: totalPieces,
+            white_pieces: whitePieces,
+            black_pieces: blackPieces
+        }
+    };
+"""
+
+# Whose turn it is, from move-list parity (see get_turn()).  Declared as a
+# function so other scripts (_WAIT_BOARD_SETTLE_JS, the helper bundle) can
+# embed it.
+_DETECT_TURN_FN_JS = """
+function detectTurn() {
+    // Find the move table container
+    const moveTable = document.querySelector('.moves-table');
+
+    if (!moveTable) {
+        return 'unknown';  // Can't find move list
+    }
+
+    // Find all move cells - these are individual moves (e4, b5, Bxb5, d5, etc.)
+    // Use the specific selector that matches the actual DOM structure
+    const moveCells = moveTable.querySelectorAll('.moves-table-cell.moves-move');
+
+    if (!moveCells || moveCells.length === 0) {
+        return 'white';  // No moves yet, white starts
+    }
+
+    // Walk back from the end to the last actual move: empty cells are
+    // placeholders for future moves and only ever trail the real ones, so
+    // the NodeList index is the move index and only the tail is inspected.
+    //
+    // Parity check:
+    // Index 0 = first move (white's e4) → black's turn next
+    // Index 1 = second move (black's b5) → white's turn next
+    // Index 2 = third move (white's Bxb5) → black's turn next
+    // Index 3 = fourth move (black's d5) → white's turn next
+    // etc.
+    for (let i = moveCells.length - 1; i >= 0; i--) {
+        if (moveCells[i].textContent.trim().length > 0) {
+            // Even index (0, 2, 4...) = white moved, black's turn
+            // Odd index (1, 3, 5...) = black moved, white's turn
+            return (i % 2 === 0) ? 'black' : 'white';
+        }
+    }
+
+    return 'white';  // No actual moves yet
+}
+"""
+
+
+# Synthetic pointer + mouse drag for make_move_js(): down on the element at
+# (arguments[0], arguments[1]), then 50 ms later move to, release and click
+# the element at (arguments[2], arguments[3]).  Returns right away with
+# {success, from, to, turn} - turn is detectTurn()'s answer read just before
+# dispatch, so make_move_js needs no separate get_turn() round-trip - or
+# {success: false, error}.
+_SYNTHETIC_DRAG_MOVE_JS = _DETECT_TURN_FN_JS + """
+    const fromX = arguments[0], fromY = arguments[1];
+    const toX = arguments[2], toY = arguments[3];
+
+    const turnBefore = detectTurn();
+
+    // Find elements at coordinates
+    const fromElement = document.elementFromPoint(fromX, fromY);
+    const toElement = document.elementFromPoint(toX, toY);
+
+    if (!fromElement || !toElement) {
+        return {success: false, error: 'Elements not found'};
+    }
+
+    // Helper to create mouse event with all required properties
+    function createMouseEvent(type, x, y, element) {
+        return new MouseEvent(type, {
+            view: window,
+            bubbles: true,
+            cancelable: true,
+            clientX: x,
+            clientY: y,
+            screenX: x,
+            screenY: y,
+            button: 0,
+            buttons: type === 'mouseup' ? 0 : 1,
+            relatedTarget: element
+        });
+    }
+
+    // Helper to create pointer event (some sites use this instead)
+    function createPointerEvent(type, x, y, element) {
+        return new PointerEvent(type, {
+            view: window,
+            bubbles: true,
+            cancelable: true,
+            clientX: x,
+            clientY: y,
+            screenX: x,
+            screenY: y,
+            pointerId: 1,
+            pointerType: 'mouse',
+            isPrimary: true,
+            button: 0,
+            buttons: type === 'pointerup' ? 0 : 1,
+            relatedTarget: element
+        });
+    }
+
+    // Dispatch full event sequence
+    // Some chess sites need both mouse AND pointer events
+    try {
+        // 1. Start at source square
+        fromElement.dispatchEvent(createPointerEvent('pointerdown', fromX, fromY, fromElement));
+        fromElement.dispatchEvent(createMouseEvent('mousedown', fromX, fromY, fromElement));
+
+        // 2. Small delay (simulate human timing)
+        setTimeout(() => {
+            // 3. Move events
+            fromElement.dispatchEvent(createPointerEvent('pointermove', fromX, fromY, toElement));
+            fromElement.dispatchEvent(createMouseEvent('mousemove', fromX, fromY, toElement));
+
+            // 4. Arrive at destination
+            toElement.dispatchEvent(createPointerEvent('pointermove', toX, toY, toElement));
+            toElement.dispatchEvent(createMouseEvent('mousemove', toX, toY, toElement));
+
+            // 5. Release at destination
+            toElement.dispatchEvent(createPointerEvent('pointerup', toX, toY, toElement));
+            toElement.dispatchEvent(createMouseEvent('mouseup', toX, toY, toElement));
+
+            // 6. Click event (some sites need this)
+            toElement.dispatchEvent(new MouseEvent('click', {
+                view: window,
+                bubbles: true,
+                cancelable: true,
+                clientX: toX,
+                clientY: toY
+            }));
+        }, 50);
+
+        return {
+            success: true,
+            from: fromElement.className,
+            to: toElement.className,
+            turn: turnBefore
+        };
+    } catch (error) {
+        return {success: false, error: error.message};
+    }
+"""
+
+
+# Waits for the board to settle after an input sequence.  A MutationObserver
+# on the board (squares and pieces layers) restarts a quiet timer on every
+# mutation; the callback fires once the board has been quiet for
+# arguments[0] ms, or after arguments[1] ms at the latest.  Resolves
+# [mutated, turn] - the turn is read in-page at that moment so callers that
+# verify a move need no separate get_turn() round-trip.  Replaces fixed
+# Python-side sleeps, which always paid the worst case even when the UI
+# updated within a frame.
+_WAIT_BOARD_SETTLE_JS = _FIND_BOARD_FN_JS + _DETECT_TURN_FN_JS + """
+    const quietMs = arguments[0];
+    const timeoutMs = arguments[1];
+    const done = arguments[arguments.length - 1];
+    const board = findBoard();
+    if (!board) {
+        setTimeout(() => done([false, detectTurn()]), timeoutMs);
+        return;
+    }
+
+    let mutated = false;
+    let finished = false;
+    let quietTimer = null;
+    let capTimer = null;
+    const observer = new MutationObserver(() => {
+        mutated = true;
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(finish, quietMs);
+    });
+    function finish() {
+        if (finished) return;
+        finished = true;
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        done([mutated, detectTurn()]);
+    }
+    observer.observe(board.parentElement || board,
+                     { attributes: true, childList: true, subtree: true });
+    quietTimer = setTimeout(finish, quietMs);
+    capTimer = setTimeout(finish, timeoutMs);
+"""
+
+
+# Declares findPromotionPiece(pieceLetter, DEBUG, cachedSelector): locates
+# the promotion choice for a UCI piece letter in the largest visible
+# promotion dialog, which it remembers on window.__promoDialog (and the
+# choice on window.__promoTarget).  cachedSelector is the dialog selector
+# that matched last time (or null), tried before the full selector scan.
+# Returns {found: true, piece, clickMethod, selector, x, y},
+# {found: false, searched, available} or {error}.
+_FIND_PROMOTION_PIECE_FN_JS = """
+function findPromotionPiece(pieceLetter, DEBUG, cachedSelector) {
+        // Map UCI promotion characters to piece types
+        // NOTE: UCI uses 'a'/'c' for Archbishop/Chancellor, but chess.com uses 'H'/'E'
+        const promotionPiece = pieceLetter.toLowerCase();
+        const pieceMap = {
+            'q': 'Q',  // Queen
+            'r': 'R',  // Rook
+            'b': 'B',  // Bishop
+            'n': 'N',  // Knight
+            'k': 'K',  // King (for variants)
+            'u': 'U',  // Unicorn (for variants)
+            'w': 'W',  // Wazir (for variants)
+            'f': 'F',  // Ferz (for variants)
+            'a': 'H',  // Archbishop (UCI: a → chess.com: H)
+            'c': 'E',  // Chancellor (UCI: c → chess.com: E)
+            'd': 'Δ'   // Dragon Bishop (UCI: d → chess.com: Δ)
+        };
+
+        const targetPiece = pieceMap[promotionPiece];
+        if (!targetPiece) {
+            return { error: 'Unknown promotion piece: ' + promotionPiece };
+        }
+
+        // First, find the promotion dialog container
+        const dialogSelectors = [
+            '[class*="promotion"]',
+            '.promotion-area',
+            '[class*="piece-choice"]',
+            '[class*="upgrade"]'
+        ];
+
+        // Find the LARGEST visible promotion dialog (not hidden/minimized ones)
+        let promotionDialog = null;
+        let winningSelector = null;
+        let largestArea = 0;
+
+        function scanDialogs(selector) {
+            for (const elem of document.querySelectorAll(selector)) {
+                const rect = elem.getBoundingClientRect();
+                const area = rect.width * rect.height;
+
+                // Must be visible and larger than what we've found
+                if (area > largestArea && rect.width > 50 && rect.height > 50) {
+                    promotionDialog = elem;
+                    winningSelector = selector;
+                    largestArea = area;
+                }
+            }
+        }
+
+        // The selector that found the dialog last time is tried on its own
+        // first; the full scan only runs when it finds nothing.
+        if (cachedSelector) scanDialogs(cachedSelector);
+        if (!promotionDialog) {
+            for (const selector of dialogSelectors) scanDialogs(selector);
+        }
+
+        if (!promotionDialog) {
+            return { error: 'Promotion dialog container not found (no large visible dialogs)' };
+        }
+
+        // Remember the dialog so the post-click visibility check can
+        // test this one element instead of re-scanning the document.
+        window.__promoDialog = promotionDialog;
+
+        // LOG DIALOG DETAILS
+        if (DEBUG) {
+            const dialogRect = promotionDialog.getBoundingClientRect();
+            console.log('[Promotion] Dialog found:', {
+                class: promotionDialog.className,
+                rect: { x: dialogRect.left, y: dialogRect.top, w: dialogRect.width, h: dialogRect.height },
+                innerHTML: promotionDialog.innerHTML.substring(0, 300)
+            });
+        }
+
+        // Find pieces WITHIN the promotion dialog - try multiple selectors
+        let promotionPieces = promotionDialog.querySelectorAll('[data-piece]');
+
+        // If no pieces found, try alternative selectors
+        if (promotionPieces.length === 0) {
+            promotionPieces = promotionDialog.querySelectorAll('[class*="piece"]');
+        }
+        if (promotionPieces.length === 0) {
+            promotionPieces = promotionDialog.querySelectorAll('img[src*="piece"]');
+        }
+        if (promotionPieces.length === 0) {
+            promotionPieces = promotionDialog.querySelectorAll('div[role="button"]');
+        }
+
+        if (promotionPieces.length === 0) {
+            return { error: 'No promotion pieces found in dialog' };
+        }
+
+        if (DEBUG) console.log('[Promotion] Looking for:', targetPiece);
+
+        // Find the matching piece
+        for (const piece of promotionPieces) {
+            const dataPiece = piece.getAttribute('data-piece');
+
+            // ONLY match by data-piece attribute (exact match)
+            // This prevents false positives like 'H' matching "bisHop"
+            if (dataPiece === targetPiece) {
+                // Found the target piece! Use its ACTUAL bounding rect
+                const pieceRect = piece.getBoundingClientRect();
+
+                if (DEBUG) {
+                    console.log('[Promotion] Found target piece:', {
+                        dataPiece,
+                        rect: { x: Math.round(pieceRect.left), y: Math.round(pieceRect.top), w: Math.round(pieceRect.width), h: Math.round(pieceRect.height) }
+                    });
+                }
+
+                // Use the piece's actual position (trust getBoundingClientRect now that we have the right dialog!)
+                const x = Math.round(pieceRect.left + pieceRect.width / 2);
+                const y = Math.round(pieceRect.top + pieceRect.height / 2);
+
+                if (DEBUG) console.log('[Promotion] Will click at piece center:', { x, y });
+
+                // Kept for the in-page click in _PROMOTE_IN_PAGE_JS
+                window.__promoTarget = piece;
+
+                return {
+                    found: true,
+                    piece: targetPiece,
+                    clickMethod: 'cdp',
+                    selector: winningSelector,
+                    x: x,
+                    y: y
+                };
+            }
+        }
+
+        // Not found - only now collect every piece's rect for debugging
+        if (DEBUG) {
+            const availablePieces = Array.from(promotionPieces).map((p, idx) => {
+                const pRect = p.getBoundingClientRect();
+                return {
+                    index: idx,
+                    dataPiece: p.getAttribute('data-piece'),
+                    rect: { x: Math.round(pRect.left), y: Math.round(pRect.top), w: Math.round(pRect.width), h: Math.round(pRect.height) }
+                };
+            });
+            console.log('[Promotion] Available pieces:', availablePieces);
+        }
+
+        return {
+            found: false,
+            searched: targetPiece,
+            available: Array.from(promotionPieces, p => p.getAttribute('data-piece')).join(', ')
+        };
+}
+"""
+
+# Describes the element under viewport point (arguments[0], arguments[1]);
+# debug output for handle_promotion().
+_ELEMENT_AT_POINT_JS = """
+    const elem = document.elementFromPoint(arguments[0], arguments[1]);
+    if (!elem) return { error: 'No element at coordinates' };
+
+    const rect = elem.getBoundingClientRect();
+    return {
+        tag: elem.tagName,
+        class: elem.className,
+        dataPiece: elem.getAttribute('data-piece'),
+        rect: { x: rect.left, y: rect.top, w: rect.width, h: rect.height },
+        pointerEvents: window.getComputedStyle(elem).pointerEvents
+    };
+"""
+
+# Waits (up to arguments[0] ms) for the promotion dialog remembered on
+# window.__promoDialog to be removed or hidden.  Resolves
+# {stillVisible: bool} as soon as the dialog is gone instead of after a
+# fixed delay.
+_WAIT_PROMO_DIALOG_CLOSED_JS = """
+    const timeoutMs = arguments[0];
+    const done = arguments[arguments.length - 1];
+    const dialog = window.__promoDialog;
+    const deadline = Date.now() + timeoutMs;
+    function visible() {
+        if (!dialog || !dialog.isConnected) return false;
+        const rect = dialog.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+    (function poll() {
+        const stillVisible = visible();
+        if (!stillVisible || Date.now() >= deadline) {
+            done({ stillVisible: stillVisible });
+            return;
+        }
+        setTimeout(poll, 20);
+    })();
+"""
+
+
+# Declares clickElement(el, x, y): dispatches the same pointer + mouse +
+# click sequence a real click at viewport point (x, y) produces on el.
+# Prepended to scripts that locate and click an element in one call.
+_CLICK_ELEMENT_FN_JS = """
+function clickElement(el, x, y) {
+    // Remembered for _WAIT_CLICK_EFFECT_JS
+    window.__lastClicked = { el: el, text: el.textContent || '' };
+    const base = {
+        bubbles: true, cancelable: true, view: window,
+        clientX: x, clientY: y, screenX: x, screenY: y, button: 0
+    };
+    const ptr = Object.assign({ pointerId: 1, pointerType: 'mouse', isPrimary: true }, base);
+    el.dispatchEvent(new PointerEvent('pointermove', Object.assign({ buttons: 0 }, ptr)));
+    el.dispatchEvent(new MouseEvent('mousemove', Object.assign({ buttons: 0 }, base)));
+    el.dispatchEvent(new PointerEvent('pointerdown', Object.assign({ buttons: 1 }, ptr)));
+    el.dispatchEvent(new MouseEvent('mousedown', Object.assign({ buttons: 1 }, base)));
+    el.dispatchEvent(new PointerEvent('pointerup', Object.assign({ buttons: 0 }, ptr)));
+    el.dispatchEvent(new MouseEvent('mouseup', Object.assign({ buttons: 0 }, base)));
+    el.dispatchEvent(new MouseEvent('click', Object.assign({ buttons: 0 }, base)));
+}
+"""
+
+# Waits (up to arguments[0] ms) for the element last clicked by
+# clickElement() to react: removed, hidden, or its text changed.  Resolves
+# true on change, false on timeout, null when no in-page click is recorded
+# (the caller then falls back to a fixed delay).
+_WAIT_CLICK_EFFECT_JS = """
+    const timeoutMs = arguments[0];
+    const done = arguments[arguments.length - 1];
+    const last = window.__lastClicked;
+    if (!last) { done(null); return; }
+    const deadline = Date.now() + timeoutMs;
+    function changed() {
+        const el = last.el;
+        if (!el.isConnected) return true;
+        if ((el.textContent || '') !== last.text) return true;
+        const rect = el.getBoundingClientRect();
+        return rect.width <= 0 || rect.height <= 0;
+    }
+    (function poll() {
+        const c = changed();
+        if (c || Date.now() >= deadline) { done(c); return; }
+        setTimeout(poll, 20);
+    })();
+"""
+
+# Waits (up to arguments[0] ms) for the game-over dialog to close.
+# Resolves true if it is still open at the deadline, false once closed, or
+# null when the helper bundle is missing.
+_WAIT_GAME_OVER_DIALOG_CLOSED_JS = """
+    const timeoutMs = arguments[0];
+    const done = arguments[arguments.length - 1];
+    const t = window.__tilted;
+    if (!t || !t.isGameOverDialogOpen) { done(null); return; }
+    const deadline = Date.now() + timeoutMs;
+    (function poll() {
+        const open = t.isGameOverDialogOpen();
+        if (!open || Date.now() >= deadline) { done(open); return; }
+        setTimeout(poll, 20);
+    })();
+"""
+
+# Clicks the element at viewport point (arguments[0], arguments[1]).
+# Returns false when no element is hit so the caller can fall back to CDP
+# input.
+_SYNTHETIC_CLICK_JS = _CLICK_ELEMENT_FN_JS + """
+    const x = arguments[0], y = arguments[1];
+    const el = document.elementFromPoint(x, y);
+    if (!el) return false;
+    clickElement(el, x, y);
+    return true;
+"""
+
+
+# Whole promotion in one execute_async_script call: polls (every 20 ms, up
+# to arguments[3] ms) for the choice of UCI piece arguments[0] to appear,
+# clicks it in-page, then waits up to arguments[4] ms for the dialog to
+# close.  arguments[1] / arguments[2] are findPromotionPiece()'s DEBUG and
+# cachedSelector.  Resolves findPromotionPiece()'s result, plus
+# stillVisible when the choice was found and clicked.
+_PROMOTE_IN_PAGE_JS = _FIND_PROMOTION_PIECE_FN_JS + _CLICK_ELEMENT_FN_JS + """
+    const [pieceLetter, DEBUG, cachedSelector, appearMs, closeMs] = arguments;
+    const done = arguments[arguments.length - 1];
+    const appearDeadline = Date.now() + appearMs;
+
+    function dialogVisible() {
+        const dialog = window.__promoDialog;
+        if (!dialog || !dialog.isConnected) return false;
+        const rect = dialog.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+
+    (function find() {
+        const result = findPromotionPiece(pieceLetter, DEBUG, cachedSelector);
+        if (!result.found) {
+            if (Date.now() >= appearDeadline) { done(result); return; }
+            setTimeout(find, 20);
+            return;
+        }
+        clickElement(window.__promoTarget, result.x, result.y);
+        const closeDeadline = Date.now() + closeMs;
+        (function poll() {
+            const stillVisible = dialogVisible();
+            if (!stillVisible || Date.now() >= closeDeadline) {
+                result.stillVisible = stillVisible;
+                done(result);
+                return;
+            }
+            setTimeout(poll, 20);
+        })();
+    })();
+"""
+
+
+# Locates our pocket's piece for a drop: arguments are [pieceType (chess.com
+# letter, H/E rather than A/C), playerColor, isFlipped, DEBUG].  Returns
+# {found: true, x, y, dataColor, className} for the matching pocket piece
+# (any such piece left of the board when no pocket container matches)
+# nearest our side, or {error[, searched]}.
+_POCKET_PIECE_COORDS_JS = """
+    // pieceType is in chess.com notation (H/E, not A/C)
+    const [pieceType, playerColor, isFlipped, DEBUG] = arguments;
+
+    // Step 1: Find the board position
+    const board = document.querySelector('.TheBoard-squares') ||
+                 document.querySelector('[class*="Board-squares"]') ||
+                 document.querySelector('.board');
+
+    if (!board) {
+        return { error: 'Board not found' };
+    }
+
+    const boardRect = board.getBoundingClientRect();
+
+    // DEBUG: Find ALL pocket pieces to see what's available
+    if (DEBUG) {
+        const allPocketElements = document.querySelectorAll('[class*="pocket"] [data-piece]');
+        const debugPocketPieces = [];
+        for (const elem of allPocketElements) {
+            const dataPiece = elem.dataset.piece;
+            const rect = elem.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) {
+                debugPocketPieces.push({
+                    dataPiece: dataPiece,
+                    className: elem.className,
+                    rect: { x: Math.round(rect.left), y: Math.round(rect.top), w: Math.round(rect.width), h: Math.round(rect.height) }
+                });
+            }
+        }
+        console.log('[PocketDrop] All pocket pieces found:', debugPocketPieces);
+        console.log('[PocketDrop] Searching for piece type:', pieceType);
+    }
+
+    // Step 2: Find the pieces with matching data-piece attribute.  The
+    // pocket containers are searched first so board pieces are never
+    // measured; only when they hold no match is the whole document
+    // scanned and filtered by position (left of the board).
+    const pieceSelector = '[data-piece="' + CSS.escape(pieceType) + '"]';
+    let allPieces = document.querySelectorAll('[class*="pocket"] ' + pieceSelector);
+    const inPocket = allPieces.length > 0;
+    if (!inPocket) {
+        allPieces = document.querySelectorAll(pieceSelector);
+    }
+
+    // Step 3: Decide which pocket is ours based on player color AND board orientation
+    // - NORMAL orientation (rank 8 at top): Black pocket at TOP, White pocket at BOTTOM
+    // - FLIPPED orientation (rank 1 at top): Black pocket at BOTTOM, White pocket at TOP
+
+    let selectTopPocket = false;
+
+    if (playerColor === 'black') {
+        // Black in normal orientation → top pocket
+        // Black in flipped orientation → bottom pocket
+        selectTopPocket = !isFlipped;
+    } else if (playerColor === 'white') {
+        // White in normal orientation → bottom pocket
+        // White in flipped orientation → top pocket
+        selectTopPocket = isFlipped;
+    } else {
+        // Unknown - try bottom pocket
+        selectTopPocket = false;
+    }
+
+    // Step 4: Single pass over the pocket pieces (or, without a pocket
+    // container, the pieces LEFT of the board), keeping the one closest
+    // to the TOP (or BOTTOM) of the screen
+    let selectedPiece = null;
+    let bestCenterX = 0;
+    let bestCenterY = 0;
+
+    for (const piece of allPieces) {
+        const rect = piece.getBoundingClientRect();
+
+        // Must have non-zero size (filters out hidden elements)
+        if (!(rect.width > 0 && rect.height > 0)) continue;
+
+        if (!inPocket) {
+            // Check if piece is to the LEFT of the board
+            // (right edge of piece is before or near left edge of board)
+            const isLeftOfBoard = rect.right < boardRect.left + 50;
+
+            // Check if piece is near the vertical range of the board
+            const isNearBoard = rect.bottom > boardRect.top - 50 &&
+                               rect.top < boardRect.bottom + 50;
+
+            if (!(isLeftOfBoard && isNearBoard)) continue;
+        }
+
+        const centerY = rect.top + rect.height / 2;
+        if (selectedPiece === null ||
+                (selectTopPocket ? centerY < bestCenterY : centerY > bestCenterY)) {
+            selectedPiece = piece;
+            bestCenterX = rect.left + rect.width / 2;
+            bestCenterY = centerY;
+        }
+    }
+
+    if (!selectedPiece) {
+        return { error: 'No pocket pieces found', searched: pieceType };
+    }
+
+    return {
+        x: bestCenterX,
+        y: bestCenterY,
+        dataColor: selectedPiece.dataset.color,
+        className: selectedPiece.className,
+        found: true
+    };
+"""
+
+
+# Script behind get_last_move(): reads the move list's last entry and the
+# highlighted squares (with the pieces on them) of the main board.
+# arguments: numFiles, numRanks, isFlipped (from the board-param cache).
+_LAST_MOVE_JS = _FIND_BOARD_FN_JS + """
+    const [numFiles, numRanks, isFlipped] = arguments;
+    return (function() {
+        // ── chess.com piece letter → UCI character ──────────────────────
+        // Used for class-encoded pieces ("piece wn").
+        // chess.com: E=Chancellor, H=Archbishop; UCI: c=Chancellor, a=Archbishop
+        const chesscomToUci = {
+            'p': 'p', 'n': 'n', 'b': 'b', 'r': 'r',
+            'q': 'q', 'k': 'k',
+            'e': 'c',   // Chancellor  (chess.com E → UCI c)
+            'h': 'a',   // Archbishop  (chess.com H → UCI a)
+            'u': 'u', 'w': 'w', 'f': 'f', 'd': 'd'
+        };
+
+        // data-piece values from the TheBoard architecture (uppercase).
+        // Δ is chess.com's symbol for the Dragon Bishop.
+        const dataPieceToUci = {
+            'R':'r','N':'n','B':'b','Q':'q','K':'k','P':'p',
+            'E':'c', 'H':'a', 'Δ':'d', 'D':'d',
+            'U':'u', 'W':'w', 'F':'f'
+        };
+
+        // data-color: chess.com's internal player-color codes.
+        const dataColorToStr = { '5': 'white', '6': 'black' };
+
+
+        // ── Read last move text from move list ──────────────────────────
+        // Reuses the same selector as get_turn().
+        let lastMoveText  = null;
+        let lastMoveTitle = null;   // title attribute – contains raw 14×14 coords
+        let actualMovesLength = 0;  // total moves played (used to determine castling color)
+        const moveTable = document.querySelector('.moves-table');
+        if (moveTable) {
+            const moveCells = moveTable.querySelectorAll(
+                '.moves-table-cell.moves-move'
+            );
+            const actualMoves = Array.from(moveCells).filter(
+                c => c.textContent.trim().length > 0
+            );
+            actualMovesLength = actualMoves.length;
+            if (actualMoves.length > 0) {
+                const lastCell = actualMoves[actualMoves.length - 1];
+                const raw = lastCell.textContent.trim();
+                // Strip check (+) and mate (#) markers – irrelevant to what moved
+                lastMoveText  = raw.replace(/[+#]/g, '');
+                // The title attribute lives on an inner child (e.g. the
+                // .moves-pointer element), not on the outer cell element.
+                lastMoveTitle = lastCell.getAttribute('title')
+                             || lastCell.querySelector('[title]')?.getAttribute('title');
+            }
+        }
+
+        // ── Locate the board ────────────────────────────────────────────
+        const board = findBoard();
+        if (!board) return { error: 'Board not found' };
+
+        // Use the board dimensions from detect_board_size() (coordinate-label
+        // detection).  A previous DOM child-count heuristic was unreliable:
+        // on 10x8 boards the board element's direct children are file-columns
+        // (10 items), not rank-rows, so it returned files/ranks swapped.
+        const numFilesActual = numFiles;
+        const numRanksActual = numRanks;
+
+        const boardRect  = board.getBoundingClientRect();
+        const squareW    = boardRect.width  / numFiles;
+        const squareH    = boardRect.height / numRanks;
+
+        // ── Pixel → algebraic square ────────────────────────────────────
+        function pixelToSquare(cx, cy) {
+            if (cx < boardRect.left - 2 || cx > boardRect.right  + 2) return null;
+            if (cy < boardRect.top  - 2 || cy > boardRect.bottom + 2) return null;
+
+            const fi = Math.min(Math.floor((cx - boardRect.left) / squareW), numFiles - 1);
+            const ri = Math.min(Math.floor((cy - boardRect.top)  / squareH), numRanks - 1);
+
+            let file, rank;
+            if (isFlipped) {
+                file = String.fromCharCode('a'.charCodeAt(0) + (numFiles - 1 - fi));
+                rank = ri + 1;
+            } else {
+                file = String.fromCharCode('a'.charCodeAt(0) + fi);
+                rank = numRanks - ri;
+            }
+            return file + rank;
+        }
+
+        // ── Extract UCI piece type from element's className ──────────────
+        function pieceTypeFromClass(cls) {
+            if (typeof cls !== 'string') return null;
+            // Pattern: "piece w<letter>" or "piece b<letter>"
+            const m = cls.match(/piece\\s+[wb]([a-z])/);
+            if (!m) return null;
+            return chesscomToUci[m[1]] || m[1];
+        }
+
+        // ── Extract color ('white'/'black') from className ──────────────
+        function pieceColorFromClass(cls) {
+            if (typeof cls !== 'string') return null;
+            const m = cls.match(/piece\\s+([wb])/);
+            if (!m) return null;
+            return m[1] === 'w' ? 'white' : 'black';
+        }
+
+        // ── Element-level helpers: prefer data-* attrs (TheBoard arch) ──
+        // Falls back to class-based detection for the traditional .board.
+        function pieceTypeFromEl(el) {
+            const dp = el.getAttribute('data-piece');
+            if (dp) return dataPieceToUci[dp] || null;
+            return pieceTypeFromClass(el.className);
+        }
+        function pieceColorFromEl(el) {
+            const dc = el.getAttribute('data-color');
+            if (dc) return dataColorToStr[dc] || null;
+            return pieceColorFromClass(el.className);
+        }
+
+        // ── Collect highlighted squares ─────────────────────────────────
+        const highlightEls = document.querySelectorAll('[class*="highlight"]');
+        const seenSquares  = new Set();
+        const highlighted  = [];
+        const rawHighlightCount = highlightEls.length;
+
+        // Helper: extract an algebraic square name (e.g. "f3") from a
+        // title/aria-label string, e.g. "Square f3", "f3 highlight", "f3".
+        function sqFromTitle(attr) {
+            if (!attr) return null;
+            const m = attr.match(/\b([a-n]\d{1,2})\b/i);
+            return m ? m[1].toLowerCase() : null;
+        }
+
+        // Primary: title attribute first (most direct + works for variants),
+        // then pixel-based getBoundingClientRect as fallback.
+        for (const el of highlightEls) {
+            const rect = el.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) continue;
+            const cx = (rect.left + rect.right)  / 2;
+            const cy = (rect.top  + rect.bottom) / 2;
+
+            // Try title/aria-label on the element and its nearest ancestor
+            let sq = sqFromTitle(el.getAttribute('title'))
+                  || sqFromTitle(el.getAttribute('aria-label'))
+                  || sqFromTitle(el.parentElement?.getAttribute('title'))
+                  || sqFromTitle(el.parentElement?.getAttribute('aria-label'))
+                  || sqFromTitle(el.closest('[title]')?.getAttribute('title'));
+            if (!sq) sq = pixelToSquare(cx, cy);
+
+            if (!sq || seenSquares.has(sq)) continue;
+            seenSquares.add(sq);
+            highlighted.push({ square: sq,
+                left: rect.left, right: rect.right,
+                top:  rect.top,  bottom: rect.bottom });
+        }
+
+        // Fallback 1: extract square from CSS class (e.g. 'square-35' → 'c5').
+        // Used when the pixel approach finds nothing – e.g. elements are
+        // inside a shadow DOM or the board rect belongs to a different
+        // container than where the highlights are positioned.
+        if (highlighted.length === 0) {
+            for (const el of highlightEls) {
+                const cls = typeof el.className === 'string' ? el.className : '';
+                const m = cls.match(/(?:^| )square-(\d+)(?= |$)/);
+                if (!m) continue;
+                const code = m[1];
+                // chess.com square code: last char = rank (1-8),
+                // leading chars = file index (1=a, 2=b, …, 10=j, …)
+                const rankNum   = parseInt(code.slice(-1), 10);
+                const fileDigit = parseInt(code.slice(0, -1), 10);
+                if (isNaN(rankNum) || isNaN(fileDigit) || fileDigit < 1) continue;
+                const sq = String.fromCharCode('a'.charCodeAt(0) + fileDigit - 1) + rankNum;
+                if (seenSquares.has(sq)) continue;
+                seenSquares.add(sq);
+                highlighted.push({ square: sq });
+            }
+        }
+
+        // Fallback 2: scan every square's computed background colour.
+        // Chess.com variants don't add a CSS class or inline style to
+        // highlighted squares; instead the highlight is applied via CSS
+        // rules that change the element's rendered background.
+        // Strategy:
+        //   • collect getComputedStyle().backgroundColor for all squares
+        //   • the two most frequent colours are the normal light/dark tile colours
+        //   • any square with a different colour is a highlight candidate
+        //   • piece presence is determined by a direct rect-overlap test
+        //     against each piece element's getBoundingClientRect() – this
+        //     avoids the globally-built pieceMap which has wrong keys when
+        //     board-size detection is off (e.g. 8×8 detected for a 10×10 board)
+        if (highlighted.length === 0 && board) {
+            // Snapshot piece visual centres before entering the square loop
+            const pieceCenters = [];
+            for (const el of document.querySelectorAll('[class*="piece"]')) {
+                const r = el.getBoundingClientRect();
+                if (r.width === 0 || r.height === 0) continue;
+                const pt = pieceTypeFromEl(el);
+                const pc = pieceColorFromEl(el);
+                if (!pt || !pc) continue;
+                pieceCenters.push({
+                    cx: (r.left + r.right) / 2,
+                    cy: (r.top  + r.bottom) / 2,
+                    left: r.left, right: r.right, top: r.top, bottom: r.bottom,
+                    pieceType: pt, pieceColor: pc
+                });
+            }
+
+            const bgCount = {};
+            const allSqBgs = [];
+            for (const rankRow of board.children) {
+                for (const sqEl of rankRow.children) {
+                    const bg = window.getComputedStyle(sqEl).backgroundColor;
+                    bgCount[bg] = (bgCount[bg] || 0) + 1;
+                    allSqBgs.push({ sqEl, bg });
+                }
+            }
+            // Two most common bg colours = normal square colours
+            const normalBgs = new Set(
+                Object.entries(bgCount)
+                      .sort((a, b) => b[1] - a[1])
+                      .slice(0, 2)
+                      .map(([c]) => c)
+            );
+            for (const { sqEl, bg } of allSqBgs) {
+                if (normalBgs.has(bg)) continue;
+                const sqRect = sqEl.getBoundingClientRect();
+                if (sqRect.width === 0 || sqRect.height === 0) continue;
+                const cx = (sqRect.left + sqRect.right) / 2;
+                const cy = (sqRect.top  + sqRect.bottom) / 2;
+                const sq = pixelToSquare(cx, cy);
+                if (!sq || seenSquares.has(sq)) continue;
+                seenSquares.add(sq);
+                // Overlap test: find a piece whose visual centre is inside this square
+                let piece = null, color = null;
+                for (const pc of pieceCenters) {
+                    if (pc.cx >= sqRect.left && pc.cx <= sqRect.right &&
+                        pc.cy >= sqRect.top  && pc.cy <= sqRect.bottom) {
+                        piece = pc.pieceType;
+                        color = pc.pieceColor;
+                        break;
+                    }
+                }
+                highlighted.push({ square: sq, piece, color });
+            }
+        }
+
+        // ── Collect board pieces ────────────────────────────────────────
+        // Map: square → { pieceType, pieceColor }
+        //
+        // Strategy: walk the board DOM (rank-rows → square elements) so
+        // that we can read each square element's title/aria-label for the
+        // square name, and look for piece children inside it.  This avoids
+        // calling pixelToSquare on piece elements whose bounding rect can be
+        // slightly off due to CSS transitions / animations.
+        //
+        // If pieces are NOT children of their square elements (some board
+        // implementations float all pieces at the board root), the fallback
+        // global scan uses the overlap approach instead.
+        const pieceMap = {};
+        let piecesFoundViaStructure = 0;
+
+        for (const rankRow of board.children) {
+            for (const sqEl of rankRow.children) {
+                const sqRect = sqEl.getBoundingClientRect();
+                if (sqRect.width === 0 || sqRect.height === 0) continue;
+
+                // Square name: title attr > aria-label > pixelToSquare on centre
+                let sqName = sqFromTitle(sqEl.getAttribute('title'))
+                          || sqFromTitle(sqEl.getAttribute('aria-label'));
+                if (!sqName) {
+                    const cx = (sqRect.left + sqRect.right) / 2;
+                    const cy = (sqRect.top  + sqRect.bottom) / 2;
+                    sqName = pixelToSquare(cx, cy);
+                }
+                if (!sqName) continue;
+
+                // Find a piece that is a descendant of this square element
+                for (const child of sqEl.querySelectorAll('[class*="piece"]')) {
+                    const pt = pieceTypeFromEl(child);
+                    const pc = pieceColorFromEl(child);
+                    if (pt && pc) {
+                        pieceMap[sqName] = { pieceType: pt, pieceColor: pc };
+                        piecesFoundViaStructure++;
+                        break;
+                    }
+                }
+            }
+        }
+
+        // Fallback: if no pieces were found as square children (pieces live
+        // at the board root), scan globally and use a spatial overlap test
+        // against the highlighted square rects to assign them.
+        const pieceEls = document.querySelectorAll('[class*="piece"]');
+        if (piecesFoundViaStructure === 0) {
+            for (const el of pieceEls) {
+                const pieceType  = pieceTypeFromEl(el);
+                const pieceColor = pieceColorFromEl(el);
+                if (!pieceType || !pieceColor) continue;
+
+                const rect = el.getBoundingClientRect();
+                if (rect.width === 0 || rect.height === 0) continue;
+                const cx = (rect.left + rect.right) / 2;
+                const cy = (rect.top  + rect.bottom) / 2;
+                const sq = pixelToSquare(cx, cy);
+                if (!sq) continue;
+                pieceMap[sq] = { pieceType, pieceColor };
+            }
+        }
+
+        // ── Annotate each highlighted square with its piece ─────────────
+        const annotated = highlighted.map(h => {
+            const p = pieceMap[h.square];
+            return {
+                square: h.square,
+                piece:  p ? p.pieceType  : null,
+                color:  p ? p.pieceColor : null
+            };
+        });
+
+        // ── Piece-map diagnostic (runs when highlights exist but all lack piece) ──
+        const pieceMapDiag = (annotated.length > 0 && annotated.every(h => !h.piece))
+            ? (() => {
+                // TheBoard-pieces is a separate layer; its children are the
+                // actual piece elements.  Capture their classes so we can
+                // update pieceTypeFromClass to match.
+                const piecesLayer = document.querySelector('.TheBoard-pieces');
+                const layerChildren = piecesLayer
+                    ? Array.from(piecesLayer.children).slice(0, 5).map(c => ({
+                        cls:       c.className,
+                        title:     c.getAttribute('title'),
+                        ariaLabel: c.getAttribute('aria-label'),
+                        dataAttrs: Object.fromEntries(
+                            Array.from(c.attributes)
+                                 .filter(a => a.name.startsWith('data-'))
+                                 .map(a => [a.name, a.value])
+                        ),
+                        style:     (c.getAttribute('style') || '').slice(0, 80)
+                      }))
+                    : null;
+                return {
+                    pieceMapKeys:          Object.keys(pieceMap).slice(0, 10),
+                    piecesFoundViaStruct:  piecesFoundViaStructure,
+                    totalPieceEls:         pieceEls.length,
+                    samplePieceClass:      pieceEls[0] ? pieceEls[0].className : null,
+                    sampleSqTitle:         board.children[0]?.children[0]?.getAttribute('title'),
+                    sampleSqAriaLabel:     board.children[0]?.children[0]?.getAttribute('aria-label'),
+                    highlightedSquares:    annotated.map(h => h.square),
+                    piecesLayerChildren:   layerChildren
+                };
+              })()
+            : null;
+
+        // ── Diagnostic: DOM inspection when no highlights found ─────────────
+        let diag = null;
+        if (rawHighlightCount === 0 && board && board.parentElement) {
+
+            // 1. Class-frequency map inside the board wrapper.
+            //    Elements that appear only 1-2 times are candidates for
+            //    highlight squares (from + to square).
+            const classCounts = {};
+            for (const el of board.parentElement.querySelectorAll('*')) {
+                for (const cls of el.classList) {
+                    classCounts[cls] = (classCounts[cls] || 0) + 1;
+                }
+            }
+            const rareClasses = Object.entries(classCounts)
+                .filter(([, n]) => n <= 4)
+                .sort((a, b) => a[1] - b[1])
+                .slice(0, 20);
+
+            // 2. CSS custom properties set via inline style on the board
+            //    and every ancestor up to <body>.
+            const cssVarChain = [];
+            let el = board;
+            while (el && el.tagName !== 'BODY') {
+                const st = el.getAttribute('style') || '';
+                if (st.includes('--')) {
+                    cssVarChain.push({
+                        cls:   (el.className || '').slice(0, 60),
+                        style: st.slice(0, 300)
+                    });
+                }
+                el = el.parentElement;
+            }
+
+            // 3. Canvas / SVG elements anywhere in the board wrapper.
+            const canvases = Array.from(
+                board.parentElement.querySelectorAll('canvas, svg')
+            ).map(c => ({
+                tag: c.tagName,
+                id:  c.id,
+                cls: (c.className && c.className.baseVal !== undefined
+                      ? c.className.baseVal : c.className || '').slice(0, 60),
+                w:   c.getAttribute('width'),
+                h:   c.getAttribute('height'),
+                childCount: c.children.length
+            }));
+
+            // 4. Computed background of individual squares (catches highlight
+            //    colours applied via CSS rules that don't change className).
+            //    Also samples the ::before pseudo-element background.
+            const squareBgs = [];
+            let ri = 0;
+            for (const rankRow of board.children) {
+                let ci = 0;
+                for (const sq of rankRow.children) {
+                    const cs   = window.getComputedStyle(sq);
+                    const csBefore = window.getComputedStyle(sq, '::before');
+                    const bg   = cs.backgroundColor;
+                    const bgB  = csBefore.backgroundColor;
+                    const transparent = ['rgba(0, 0, 0, 0)', 'transparent', ''];
+                    if (!transparent.includes(bg) || !transparent.includes(bgB)) {
+                        squareBgs.push({ ri, ci, bg, bgBefore: bgB });
+                    }
+                    ci++;
+                }
+                ri++;
+            }
+
+            // 5. Last non-empty move-list cell outer-HTML.
+            const moveCells2 = document.querySelectorAll('.moves-table-cell.moves-move');
+            const lastNonEmpty = Array.from(moveCells2)
+                .filter(c => c.textContent.trim().length > 0)
+                .pop();
+            const lastCellHtml = lastNonEmpty ? lastNonEmpty.outerHTML : null;
+
+            diag = {
+                rareClasses,
+                cssVarChain,
+                canvases,
+                squareBgs:   squareBgs.slice(0, 10),
+                lastCellHtml
+            };
+        }
+
+        return {
+            highlights:        annotated,
+            numHighlights:     annotated.length,
+            pieceMap:          pieceMap,
+            lastMoveText:      lastMoveText,
+            lastMoveTitle:     lastMoveTitle,
+            numFilesActual:    numFilesActual,
+            numRanksActual:    numRanksActual,
+            rawHighlightCount: rawHighlightCount,
+            actualMovesLength: actualMovesLength,
+            pieceMapDiag:      pieceMapDiag,
+            diag:              diag
+        };
+    })();
+"""
+
+
+# Finds the lobby card whose own (direct) text equals arguments[0]
+# (lowercase variant title) and returns {x, y, text} for its centre, or
+# null.  Used by the variant search in the lobby.
+_VARIANT_CARD_JS = """
+    const target = arguments[0];
+
+    for (const el of document.querySelectorAll('*')) {
+        // Read only the direct text nodes of this element (not descendants)
+        // so we match the card title, not the full card text block.
+        let ownText = '';
+        for (const node of el.childNodes) {
+            if (node.nodeType === Node.TEXT_NODE)
+                ownText += node.textContent;
+        }
+        if (ownText.trim().toLowerCase() !== target) continue;
+
+        // Click the title element itself — it sits on the right side of
+        // the card, away from the icon on the left.
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 || r.height === 0) continue;
+
+        return {x: r.left + r.width / 2, y: r.top + r.height / 2,
+                text: ownText.trim()};
+    }
+    return null;
+"""
+
+
+# Page-side helper bundle.  Installs window.__tilted with the detection
+# routines that used to be shipped (and re-parsed, with their regexes
+# re-compiled) inside every poll.  Installed once per page by
+# ChessComInterface._ensure_helpers(), which also registers it with
+# Page.addScriptToEvaluateOnNewDocument so full navigations get it for free;
+# callers then run one-line scripts such as
+# "return window.__tilted.detectGameOver()".
+_TILTED_HELPERS_JS = """
+(function () {
+""" + _CLICK_ELEMENT_FN_JS + _DETECT_TURN_FN_JS + """
+    const GAME_OVER_RE = /black won|white won|you won|you lost|you drew|draw by agreement|draw|checkmate|stalemate|time.*out|flagged|resign|abandon/i;
+
+    // Broad class-name patterns: variants.chess.com may use class names
+    // unlike the standard chess.com modal/dialog names.  One regex over the
+    // class attribute stands in for the equivalent
+    // '[class*="modal"], [class*="dialog"], ...' selector list.
+    const GAME_OVER_CLASS_RE =
+        /modal|dialog|popup|game-over|result|challenge|win|victory|defeat|end/;
+
+    // TreeWalker filter accepting elements whose class matches
+    // GAME_OVER_CLASS_RE (children of rejected elements are still visited)
+    const GAME_OVER_CLASS_FILTER = {
+        acceptNode(el) {
+            const cls = el.getAttribute('class');
+            return cls && GAME_OVER_CLASS_RE.test(cls)
+                ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+        }
+    };
+
+    // Inline-styled overlay/modal elements (position:fixed or z-index)
+    const OVERLAY_SELECTORS =
+        '[style*="position: fixed"], [style*="position:fixed"], [style*="z-index"]';
+
+    // Dialog containers searched for close buttons / backdrop clicks
+    const DIALOG_ROOT_SELECTORS =
+        '[class*="modal"], [class*="dialog"], [class*="popup"], [class*="game-over"]';
+
+    // Board and move list: piece animations and new moves mutate these
+    // constantly, and a game-over dialog never appears inside them.
+    const BUSY_REGION_SELECTORS =
+        '.TheBoard-squares, [class*="Board-squares"], .moves-table';
+
+    // Narrower set used to decide whether a dismissed dialog is still open
+    const OPEN_DIALOG_SELECTORS =
+        '[class*="modal"], [class*="dialog"], [class*="popup"], ' +
+        '[class*="game-over"], [class*="result"]';
+
+    // Result phrases in priority order (when several appear, the earliest
+    // entry wins), scanned for in a single pass by RESULT_RE.
+    const RESULT_LABELS = {
+        'black won':         'Black Won',
+        'white won':         'White Won',
+        'you won':           'You Won',
+        'you lost':          'You Lost',
+        'you drew':          'Draw',
+        'draw by agreement': 'Draw (By Agreement)',
+        'stalemate':         'Stalemate',
+        'checkmate':         'Checkmate',
+        'draw':              'Draw',
+        'timeout':           'Timeout',
+        'flagged':           'Timeout',
+        'resign':            'Resigned',
+        'abandon':           'Abandoned'
+    };
+    const RESULT_RANK = Object.fromEntries(
+        Object.keys(RESULT_LABELS).map((key, i) => [key, i]));
+    const RESULT_RE = /black won|white won|you won|you lost|you drew|draw by agreement|stalemate|checkmate|draw|time.*?out|flagged|resign|abandon/gi;
+
+    function extractResult(text) {
+        let best = null;
+        for (const m of text.matchAll(RESULT_RE)) {
+            let key = m[0].toLowerCase();
+            if (key.startsWith('time')) key = 'timeout';
+            if (best === null || RESULT_RANK[key] < RESULT_RANK[best]) {
+                best = key;
+                if (RESULT_RANK[key] === 0) break;
+            }
+        }
+        return best === null ? 'Game Over' : RESULT_LABELS[best];
+    }
+
+    // Game-over element found by the last successful scan
+    let lastDialog = null;
+
+    // Returns {rect, text} for the first visible element showing game-over
+    // text, or null.  The text test runs first: textContent needs no
+    // layout, whereas getBoundingClientRect may force one (the observer
+    // calls this mid-animation), so only text matches are measured.
+    // The hit is also remembered as lastDialog for findDismissTarget().
+    function findGameOverElement() {
+        // Walk in document order and stop at the first hit instead of
+        // materialising every wildcard-selector match up front
+        const walker = document.createTreeWalker(
+            document.body, NodeFilter.SHOW_ELEMENT, GAME_OVER_CLASS_FILTER);
+        let el;
+        while ((el = walker.nextNode())) {
+            const text = el.textContent || '';
+            if (!GAME_OVER_RE.test(text)) continue;
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) {
+                lastDialog = el;
+                return { rect: rect, text: text };
+            }
+        }
+        for (const el of document.querySelectorAll(OVERLAY_SELECTORS)) {
+            const text = el.textContent || '';
+            if (!GAME_OVER_RE.test(text)) continue;
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 150 && rect.height > 80) {
+                lastDialog = el;
+                return { rect: rect, text: text };
+            }
+        }
+        return null;
+    }
+
+    // Builds the detect_game_over() payload from a findGameOverElement() hit
+    // (or null).
+    function gameOverInfo(hit) {
+        if (!hit) {
+            return { game_over: false, result: null, dialog_found: false, dialog_coords: null };
+        }
+        const rect = hit.rect;
+        return {
+            game_over: true,
+            result: extractResult(hit.text),
+            dialog_found: true,
+            dialog_coords: {
+                left: rect.left, top: rect.top,
+                right: rect.right, bottom: rect.bottom,
+                width: rect.width, height: rect.height
+            }
+        };
+    }
+
+    function detectGameOver() {
+        // The game-over MutationObserver already ran the scan when the
+        // dialog appeared and cached the full payload; reuse it.
+        if (window.__gameOverInfo) return window.__gameOverInfo;
+        return gameOverInfo(findGameOverElement());
+    }
+
+    function isGameOverDialogOpen() {
+        for (const el of document.querySelectorAll(OPEN_DIALOG_SELECTORS)) {
+            if (!GAME_OVER_RE.test(el.textContent || '')) continue;
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) return true;
+        }
+        return false;
+    }
+
+    // Containers found by the first successful detectGameStarted() scan of
+    // each kind.  Later calls only look inside them (re-resolved once the
+    // element is detached), instead of walking every element matching the
+    // wildcard class selectors.
+    const startScopes = { chat: null, notifications: null, playerPanel: null };
+
+    function scopeFor(key) {
+        const el = startScopes[key];
+        if (el && el.isConnected) return el;
+        startScopes[key] = null;
+        return null;
+    }
+
+    const GAME_STARTED_RE = /Game #(\\d+) started/i;
+
+    function isStartNotification(el) {
+        const text = (el.textContent || '').toLowerCase();
+        if (!(text.includes('game has begun') ||
+              text.includes('game is starting') ||
+              text.includes('your game'))) {
+            return false;
+        }
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+
+    // The "Game #X started" line is among the newest chat messages, so
+    // only this many are checked, walking back from the last one.
+    const CHAT_TAIL = 8;
+
+    function chatTailGameNumber(chat) {
+        let msg = chat.lastElementChild;
+        for (let i = 0; msg && i < CHAT_TAIL; i++, msg = msg.previousElementSibling) {
+            const match = (msg.textContent || '').match(GAME_STARTED_RE);
+            if (match) return match[1];
+        }
+        return null;
+    }
+
+    function findChatGameNumber() {
+        const chat = scopeFor('chat');
+        if (chat) return chatTailGameNumber(chat);
+
+        const messages = document.querySelector('[class*="chat-messages"]');
+        if (messages) {
+            const number = chatTailGameNumber(messages);
+            if (number) {
+                startScopes.chat = messages;
+                return number;
+            }
+        }
+
+        // Document order: the last match is the innermost (newest) message,
+        // whose parent is the chat container.
+        let number = null;
+        let deepest = null;
+        for (const msg of document.querySelectorAll('[class*="chat"], [class*="message"]')) {
+            const match = (msg.textContent || '').match(GAME_STARTED_RE);
+            if (!match) continue;
+            number = match[1];
+            deepest = msg;
+        }
+        if (deepest && deepest.parentElement) startScopes.chat = deepest.parentElement;
+        return number;
+    }
+
+    function findStartNotification() {
+        const container = scopeFor('notifications');
+        if (container) {
+            for (const notif of container.children) {
+                if (isStartNotification(notif)) return true;
+            }
+            return false;
+        }
+
+        const notifications = document.querySelectorAll('[class*="notification"], [class*="alert"], [class*="toast"]');
+        for (const notif of notifications) {
+            if (isStartNotification(notif)) {
+                if (notif.parentElement) startScopes.notifications = notif.parentElement;
+                return true;
+            }
+        }
+        return false;
+    }
+
+    function findActivePlayerPanel() {
+        const cached = scopeFor('playerPanel');
+        if (cached) return !!cached.querySelector('[class*="clock"], [class*="timer"]');
+
+        const playerBoxes = document.querySelectorAll('[class*="player"], [class*="user"]');
+        for (const box of playerBoxes) {
+            const text = (box.textContent || '').trim();
+            if (text.length > 0 && text.length < 50) {
+                // Check if this looks like an active game (timer present, etc.)
+                const parent = box.closest('[class*="player-component"], [class*="player-panel"]');
+                if (parent && parent.querySelector('[class*="clock"], [class*="timer"]')) {
+                    startScopes.playerPanel = parent;
+                    return true;
+                }
+            }
+        }
+        return false;
+    }
+
+    function detectGameStarted() {
+        const result = {
+            started: false,
+            game_number: null,
+            method: null
+        };
+
+        // Method 1: Check for "Game #X started" in chat
+        const gameNumber = findChatGameNumber();
+        if (gameNumber) {
+            result.started = true;
+            result.game_number = gameNumber;
+            result.method = 'chat_message';
+            return result;
+        }
+
+        // Method 2: Check for blue notification pop-ups (game starting notifications)
+        if (findStartNotification()) {
+            result.started = true;
+            result.method = 'notification_popup';
+            return result;
+        }
+
+        // Method 3: Check if username is in player boxes and game is active
+        if (findActivePlayerPanel()) {
+            result.started = true;
+            result.method = 'player_boxes';
+        }
+
+        return result;
+    }
+
+    // ── Post-game action buttons (Rematch / Play Again / Exit) ──
+    // Text predicates per button key; only elements whose text matches are
+    // ever measured with getBoundingClientRect.
+    const ACTION_BUTTON_MATCHERS = {
+        rematch: (text, aria) => text.includes('rematch') || aria.includes('rematch'),
+        // "Play Again" may be shortened to just "Play" (but never "rematch")
+        playAgain: (text, aria) =>
+            text.includes('play again') || aria.includes('play again') ||
+            (text.includes('play') && !text.includes('rematch')),
+        exit: (text, aria) => text.includes('exit') || aria.includes('exit')
+    };
+
+    // Attribute selectors tried before the text scan: the selector engine
+    // does the filtering natively (case-insensitive via the i flag) and
+    // usually returns zero or one element.
+    const ACTION_BUTTON_SELECTORS = {
+        rematch: ':is(button, a):is([aria-label*="rematch" i], [data-cy="rematch"])',
+        playAgain: ':is(button, a):is([aria-label*="play again" i], [data-cy="play-again"])',
+        exit: ':is(button, a):is([aria-label*="exit" i], [data-cy="exit"])'
+    };
+
+    // Last element found per key.  Re-validated on every lookup, so a
+    // repeated lookup is O(1) until the dialog is re-rendered.
+    const actionButtonCache = new Map();
+
+    function textMatches(el, key) {
+        const text = (el.textContent || '').toLowerCase();
+        const aria = (el.getAttribute('aria-label') || '').toLowerCase();
+        return ACTION_BUTTON_MATCHERS[key](text, aria);
+    }
+
+    function onScreen(el, sidebarRight) {
+        const rect = el.getBoundingClientRect();
+        // Ignore buttons in the left sidebar
+        return rect.width > 0 && rect.height > 0 && rect.left > sidebarRight;
+    }
+
+    function findActionButton(key, sidebarRight) {
+        const cached = actionButtonCache.get(key);
+        if (cached && cached.el.isConnected &&
+                (cached.bySelector || textMatches(cached.el, key)) &&
+                onScreen(cached.el, sidebarRight)) {
+            return cached.el;
+        }
+        actionButtonCache.delete(key);
+
+        // 1. Native attribute match
+        for (const el of document.querySelectorAll(ACTION_BUTTON_SELECTORS[key])) {
+            if (onScreen(el, sidebarRight)) {
+                actionButtonCache.set(key, { el: el, bySelector: true });
+                return el;
+            }
+        }
+
+        // 2. Text scan; only text matches are measured
+        for (const el of document.querySelectorAll('button, a')) {
+            if (textMatches(el, key) && onScreen(el, sidebarRight)) {
+                actionButtonCache.set(key, { el: el, bySelector: false });
+                return el;
+            }
+        }
+        return null;
+    }
+
+    // Finds the action button for key and clicks it in-page.
+    function clickActionButton(key, sidebarRight) {
+        const button = findActionButton(key, sidebarRight);
+        if (!button) return { clicked: false };
+        const rect = button.getBoundingClientRect();
+        const x = rect.left + rect.width / 2;
+        const y = rect.top + rect.height / 2;
+        clickElement(button, x, y);
+        return { clicked: true, x: x, y: y, text: button.textContent };
+    }
+
+    // ── Post-game navigation ──
+    // Clicks the first on-screen ancestor (right of the sidebar) of a text
+    // node reading exactly label, e.g. the "Lobby" tab.
+    function clickTabByLabel(label, sidebarRight) {
+        const re = new RegExp('^' + label + '$', 'i');
+        const walker = document.createTreeWalker(
+            document.body, NodeFilter.SHOW_TEXT, null
+        );
+        let node;
+        while ((node = walker.nextNode())) {
+            if (re.test(node.nodeValue.trim())) {
+                let el = node.parentElement;
+                while (el && el !== document.body) {
+                    const rect = el.getBoundingClientRect();
+                    if (rect.width > 0 && rect.height > 0 && rect.left > sidebarRight) {
+                        const x = rect.left + rect.width / 2;
+                        const y = rect.top + rect.height / 2;
+                        clickElement(el, x, y);
+                        return { clicked: true, x: x, y: y };
+                    }
+                    el = el.parentElement;
+                }
+            }
+        }
+        return { clicked: false };
+    }
+
+    // Locates a close/X button of the game-over dialog, or else a backdrop
+    // point left of it.  Returns {found, method, x, y}.
+    function findDismissTarget(sidebarRight) {
+        // Candidates: explicit close/dismiss buttons and aria-labelled buttons
+        const closeSelectors = [
+            '[aria-label*="close" i]',
+            '[class*="close"]',
+            '[class*="dismiss"]',
+            'button[class*="icon-"]'
+        ];
+        // Fast path: a close button inside the dialog the game-over scan
+        // already found, skipping the document-wide candidate walk
+        if (lastDialog && lastDialog.isConnected) {
+            const root = lastDialog.closest(DIALOG_ROOT_SELECTORS) || lastDialog;
+            const close = root.querySelector('[aria-label*="close" i], [class*="close"]');
+            if (close) {
+                const rect = close.getBoundingClientRect();
+                if (rect.width > 0 && rect.height > 0) {
+                    return {
+                        found: true,
+                        method: 'close_button',
+                        x: rect.left + rect.width / 2,
+                        y: rect.top + rect.height / 2
+                    };
+                }
+            }
+        }
+
+        for (const sel of closeSelectors) {
+            for (const btn of document.querySelectorAll(sel)) {
+                // Must be inside a modal/dialog container (checked before
+                // any layout read)
+                const parent = btn.closest(DIALOG_ROOT_SELECTORS);
+                if (!parent) continue;
+
+                const rect = btn.getBoundingClientRect();
+                if (rect.width <= 0 || rect.height <= 0) continue;
+
+                const parentRect = parent.getBoundingClientRect();
+                // X button is typically in upper-right corner of the dialog
+                if (rect.right > parentRect.right - 60 && rect.top < parentRect.top + 60) {
+                    return {
+                        found: true,
+                        method: 'close_button',
+                        x: rect.left + rect.width / 2,
+                        y: rect.top + rect.height / 2
+                    };
+                }
+            }
+        }
+
+        // If no X button found, fall back to backdrop (left of dialog).
+        // Only target large dialogs (actual modals, not small sidebar
+        // elements that happen to match the class selectors), and clamp
+        // the click x-coordinate so it never lands on the left sidebar.
+        for (const dialog of document.querySelectorAll(DIALOG_ROOT_SELECTORS)) {
+            const rect = dialog.getBoundingClientRect();
+            if (rect.width >= 250 && rect.height >= 200) {
+                const bx = Math.max(sidebarRight + 10, rect.left - 60);
+                return {
+                    found: true,
+                    method: 'backdrop',
+                    x: bx,
+                    y: rect.top + rect.height / 2
+                };
+            }
+        }
+
+        return { found: false };
+    }
+
+    // ── Game state ──
+    // get_username_from_page(), get_player_color() and get_turn() in one
+    // pass: the status-bar username selects the playerbox whose
+    // data-player attribute ("0" = white, "2" = black) gives the colour.
+    function getGameState() {
+        const nameEl = document.querySelector('.status-bar-username');
+        const username = nameEl ? nameEl.textContent.trim() : null;
+        let color = 'unknown';
+        if (username) {
+            for (const box of document.querySelectorAll('.playerbox-top, .playerbox-bottom')) {
+                const userTag = box.querySelector('.playerbox-user-tag');
+                if (!userTag || !userTag.textContent.includes(username)) continue;
+                const playerDiv = box.querySelector('[data-player]');
+                const dataPlayer = playerDiv ? playerDiv.getAttribute('data-player') : null;
+                if (dataPlayer === '0') color = 'white';
+                else if (dataPlayer === '2') color = 'black';
+                break;
+            }
+        }
+        return {
+            // data-player is only present during a game
+            in_game: color === 'white' || color === 'black',
+            username: username || null,
+            color: color,
+            turn: getPositionState().turn
+        };
+    }
+
+    // getGameState() plus the FEN and the board rect: everything the
+    // per-tick Python code reads, in one call (see get_game_state).
+    function getSnapshot() {
+        const snapshot = getGameState();
+        snapshot.fen = getPositionState().fen;
+        const rect = boardRect();
+        snapshot.board_rect = rect
+            ? { left: rect.left, top: rect.top, width: rect.width }
+            : null;
+        return snapshot;
+    }
+
+    // ── Board element ──
+    // The main board element, re-queried only once it has been detached
+    // (e.g. the board re-rendered for a new game), and its rect, kept
+    // until the board resizes or anything scrolls / the window resizes
+    // (the rect is viewport-relative).
+    let boardEl = null;
+    let boardRectCache = null;
+    let boardResizeObserver = null;
+
+    function board() {
+        if (!boardEl || !boardEl.isConnected) {
+            boardEl = document.querySelector('.TheBoard-squares') ||
+                      document.querySelector('[class*="Board-squares"]') ||
+                      document.querySelector('.board') ||
+                      document.querySelector('[class*="board"]');
+            boardRectCache = null;
+            if (boardResizeObserver) boardResizeObserver.disconnect();
+            boardResizeObserver = null;
+            if (boardEl && window.ResizeObserver) {
+                // The board can change size without the window resizing
+                // (side panels, devtools docking), so a board resize also
+                // raises window.__layoutChanged.  The callback that fires
+                // as soon as observation starts is not a change.
+                let initial = true;
+                boardResizeObserver = new ResizeObserver(() => {
+                    boardRectCache = null;
+                    if (initial) { initial = false; return; }
+                    window.__layoutChanged = true;
+                });
+                boardResizeObserver.observe(boardEl);
+            }
+        }
+        return boardEl;
+    }
+
+    function boardRect() {
+        const el = board();
+        if (!el) return null;
+        if (!boardRectCache) boardRectCache = el.getBoundingClientRect();
+        return boardRectCache;
+    }
+
+    // Re-running the bundle replaces the listeners instead of stacking them.
+    // A window resize (which includes page-zoom / devicePixelRatio changes)
+    // also raises window.__layoutChanged so the Python-side board rect
+    // cache is dropped on the next poll (see poll_observer_flags).
+    if (window.__tiltedDropBoardRect) {
+        window.removeEventListener('scroll', window.__tiltedDropBoardRect, true);
+        window.removeEventListener('resize', window.__tiltedOnResize);
+    }
+    window.__tiltedDropBoardRect = () => { boardRectCache = null; };
+    window.__tiltedOnResize = () => {
+        boardRectCache = null;
+        window.__layoutChanged = true;
+    };
+    window.addEventListener('scroll', window.__tiltedDropBoardRect, { capture: true, passive: true });
+    window.addEventListener('resize', window.__tiltedOnResize, { passive: true });
+
+    // ── Square coordinates ──
+    // Pixel centres of [[fileNum, rankNumber], ...] on the main board, or
+    // null when no board is found (see get_two_square_coordinates).
+    function squareCenters(numFiles, numRanks, isFlipped, squares) {
+        const rect = boardRect();
+        if (!rect) return null;
+        const sqSize = rect.width / numFiles;
+        // Orientation resolved once: each centre is a linear function of
+        // the algebraic file / rank (see ChessComInterface._flip_map), so
+        // the per-square map has no branch.
+        const fileStep = isFlipped ? -sqSize : sqSize;
+        const rankStep = isFlipped ? sqSize : -sqSize;
+        const x0 = rect.left + sqSize / 2 + (isFlipped ? numFiles : -1) * sqSize;
+        const y0 = rect.top  + sqSize / 2 + (isFlipped ? -1 : numRanks) * sqSize;
+        return squares.map(([fileNum, rankNumber]) => ({
+            x: x0 + fileNum * fileStep,
+            y: y0 + rankNumber * rankStep
+        }));
+    }
+
+    // ── Position state (get_fen / get_turn) ──
+    function readFen() {
+        // Try multiple sources for the complete FEN
+        let fen = null;
+
+        // Priority 1: window.chessGame.getFEN() - most common
+        if (window.chessGame && typeof window.chessGame.getFEN === 'function') {
+            try {
+                fen = window.chessGame.getFEN();
+            } catch (e) {}
+        }
+
+        // Priority 2: window.game.getFEN() - alternative location
+        if (!fen && window.game && typeof window.game.getFEN === 'function') {
+            try {
+                fen = window.game.getFEN();
+            } catch (e) {}
+        }
+
+        // Priority 3: window.gameSetup.fen - used for puzzles/from-position games
+        if (!fen && window.gameSetup && window.gameSetup.fen) {
+            fen = window.gameSetup.fen;
+        }
+
+        return fen || null;
+    }
+
+    // Element watched by the move observer, and the {fen, turn} computed
+    // since its last mutation.  The cache is only trusted while that
+    // observer is live on a connected target; otherwise every call reads
+    // the DOM afresh.
+    let moveTarget = null;
+    let positionState = null;
+
+    function getPositionState() {
+        const tracked = window.__moveObserver && moveTarget && moveTarget.isConnected;
+        if (tracked && positionState && positionState.fen !== null) return positionState;
+        const state = { fen: readFen(), turn: detectTurn() };
+        positionState = tracked ? state : null;
+        return state;
+    }
+
+    // ── Observers (polled by Python via window flags) ──
+    function setupMoveObserver() {
+        // Clean up any existing observer
+        if (window.__moveObserver) {
+            window.__moveObserver.disconnect();
+            delete window.__moveObserver;
+        }
+
+        // Initialize the flag
+        window.__boardChanged = false;
+
+        // Create the observer.
+        // NO debounce timer: MutationObserver callbacks fire synchronously
+        // with DOM mutations and are NOT subject to Chrome's timer throttling
+        // (IntensiveWakeUpThrottling, background-tab setTimeout slowdown, etc).
+        // A setTimeout debounce inside the callback IS throttled, adding a
+        // guaranteed ≥50 ms floor to every move detection in background tabs.
+        // The moves table fires one clean mutation per move (a new cell is
+        // appended), so batching is unnecessary.
+        const observer = new MutationObserver(() => {
+            window.__boardChanged = true;
+            positionState = null;
+        });
+
+        // Watch only the moves table - this fires exactly once per move played.
+        // NOTE: Variants server uses .moves-table, NOT .move-list
+        // Observing the board element (even childList only) fires on every piece
+        // animation (elements added/removed during movement), so we avoid it.
+        // Observe ONE target: the container is only a fallback for layouts
+        // without .moves-table.  Observing both (the container usually
+        // encloses the table) queued a duplicate record per mutation.
+        // subtree stays on: a black move fills a cell inside the row that
+        // white's move appended, which a tbody childList watch would miss.
+        const target = document.querySelector('.moves-table') ||
+                       document.querySelector('[class*="moves"]');
+
+        positionState = null;
+        if (!target) return false;
+        observer.observe(target, {
+            childList: true,
+            subtree: true
+        });
+        window.__moveObserver = observer;
+        moveTarget = target;
+        return true;
+    }
+
+    function setupGameOverObserver() {
+        // Clean up any existing observer
+        if (window.__gameOverObserver) {
+            window.__gameOverObserver.disconnect();
+            delete window.__gameOverObserver;
+        }
+
+        // Initialize flags (both exposed on window so Python can reset them)
+        window.__gameOver = false;
+        window.__gameOverLogged = false;
+        window.__gameOverResult = null;
+        window.__gameOverInfo = null;
+
+        const observer = new MutationObserver((mutations) => {
+            // Only check if we haven't already logged
+            if (window.__gameOverLogged) return;
+
+            // Skip batches confined to the board / move list so piece
+            // animations do not trigger document-wide selector scans
+            let relevant = false;
+            for (const m of mutations) {
+                const el = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+                if (!el || !el.closest(BUSY_REGION_SELECTORS)) {
+                    relevant = true;
+                    break;
+                }
+            }
+            if (!relevant) return;
+
+            // The full detect_game_over() payload is cached so Python's
+            // confirmation call does not repeat the document scan.
+            const hit = findGameOverElement();
+            if (hit) {
+                const info = gameOverInfo(hit);
+                window.__gameOverInfo = info;
+                window.__gameOverResult = info.result;
+                window.__gameOverLogged = true;
+                window.__gameOver = true;
+            }
+        });
+
+        // Watch the entire document body for changes
+        // This catches any new dialogs being added
+        observer.observe(document.body, {
+            childList: true,
+            subtree: true,
+            attributes: true,
+            attributeFilter: ['class', 'style']  // Watch for dialogs becoming visible
+        });
+
+        window.__gameOverObserver = observer;
+        return true;
+    }
+
+    window.__tilted = {
+        GAME_OVER_RE: GAME_OVER_RE,
+        clickElement: clickElement,
+        findActionButton: findActionButton,
+        clickActionButton: clickActionButton,
+        extractResult: extractResult,
+        findGameOverElement: findGameOverElement,
+        gameOverInfo: gameOverInfo,
+        detectGameOver: detectGameOver,
+        isGameOverDialogOpen: isGameOverDialogOpen,
+        detectGameStarted: detectGameStarted,
+        clickTabByLabel: clickTabByLabel,
+        findDismissTarget: findDismissTarget,
+        setupMoveObserver: setupMoveObserver,
+        setupGameOverObserver: setupGameOverObserver,
+        getGameState: getGameState,
+        getSnapshot: getSnapshot,
+        getPositionState: getPositionState,
+        squareCenters: squareCenters,
+        board: board,
+        boardRect: boardRect
+    };
+})();
+"""
+
+# Calls window.__tilted[arguments[0]](...arguments[1:]).  Reports
+# {__tiltedMissing: true} instead of throwing when the bundle (or that
+# helper) is not installed on the current page, so the caller can install
+# it and retry.
+_CALL_HELPER_JS = """
+    const t = window.__tilted;
+    if (!t || typeof t[arguments[0]] !== 'function') return { __tiltedMissing: true };
+    return t[arguments[0]].apply(null, Array.prototype.slice.call(arguments, 1));
+"""
+
+# Runtime.evaluate expression that reads and clears both MutationObserver
+# flags (see setup_move_observer / setup_game_over_observer) plus the
+# helper bundle's layout flag (window or board resized).  Evaluates to
+# [boardChanged, gameOver, gameOverInfo, layoutChanged] - the observer's
+# cached detect_game_over() payload rides along when the game-over flag is
+# set.
+_POLL_OBSERVER_FLAGS_EXPR = """(() => {
+    const gameOver = window.__gameOver === true;
+    const flags = [window.__boardChanged === true, gameOver,
+                   gameOver ? (window.__gameOverInfo || null) : null,
+                   window.__layoutChanged === true];
+    window.__boardChanged = false;
+    window.__gameOver = false;
+    window.__layoutChanged = false;
+    return flags;
+})()"""
+
+
+# Declares the resign-flow lookups:
+#   findResignButton(openMenu) - the visible resign button, or null.  Direct
+#     attribute lookups are tried first (a single querySelector each); only
+#     when none of them hits is every <button> scanned with one precompiled
+#     regex.  On a miss the game menu is opened when openMenu is set
+#     (re-checks while it opens must not toggle it shut again).
+#   findResignConfirm(resignBtn) - {el, separate} for the confirmation
+#     button, or null.  Prefers a matching button other than resignBtn
+#     (separate: true) and falls back to resignBtn only when it is the sole
+#     match (inline "are you sure" toggles).
+_RESIGN_FN_JS = """
+function resignVisible(el) {
+    if (!el) return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0;
+}
+
+function findResignButton(openMenu) {
+    // Method 1: direct lookups
+    for (const sel of ['button[data-cy="resign"]',
+                       '[data-test-element="resign"]',
+                       'button[aria-label*="resign" i]']) {
+        const el = document.querySelector(sel);
+        if (resignVisible(el)) return el;
+    }
+
+    // Method 2: buttons whose text or aria-label mentions "resign"
+    const RESIGN_RE = /resign/i;
+    const buttons = document.getElementsByTagName('button');
+    for (let i = 0; i < buttons.length; i++) {
+        const button = buttons[i];
+        if ((RESIGN_RE.test(button.textContent || '') ||
+             RESIGN_RE.test(button.getAttribute('aria-label') || '')) &&
+                resignVisible(button)) {
+            return button;
+        }
+    }
+
+    // Method 3: open the game menu so a later check can find the button
+    if (openMenu) {
+        const menuButtons = document.querySelectorAll('button[aria-label*="Menu"], button[aria-label*="menu"], [class*="menu-button"]');
+        for (const menuBtn of menuButtons) {
+            if (resignVisible(menuBtn)) {
+                menuBtn.click();
+                break;
+            }
+        }
+    }
+    return null;
+}
+
+function findResignConfirm(resignBtn) {
+    const CONFIRM_RE = /resign|confirm|yes/i;
+    let fallback = null;
+    const buttons = document.getElementsByTagName('button');
+    for (let i = 0; i < buttons.length; i++) {
+        const button = buttons[i];
+        if (!CONFIRM_RE.test(button.textContent || '')) continue;
+        if (!resignVisible(button)) continue;
+        if (button !== resignBtn) return { el: button, separate: true };
+        fallback = { el: button, separate: false };
+    }
+    return fallback;
+}
+"""
+
+# Whole resign flow in one execute_async_script: finds the resign button
+# (opening the game menu and re-checking every 20 ms for up to
+# arguments[0] ms if needed), clicks it in-page, waits up to arguments[0] ms
+# for a separate confirmation button and clicks that (or the fallback
+# match).  Resolves {resignClicked, confirmClicked, x, y, confirmX,
+# confirmY} or {resignClicked: false, error}.
+_RESIGN_IN_PAGE_JS = _RESIGN_FN_JS + _CLICK_ELEMENT_FN_JS + """
+    const timeoutMs = arguments[0];
+    const done = arguments[arguments.length - 1];
+
+    function clickCentre(el) {
+        const r = el.getBoundingClientRect();
+        const x = r.left + r.width / 2, y = r.top + r.height / 2;
+        clickElement(el, x, y);
+        return [x, y];
+    }
+
+    const findDeadline = Date.now() + timeoutMs;
+    let resignBtn = findResignButton(true);
+    (function waitResign() {
+        if (!resignBtn) {
+            if (Date.now() >= findDeadline) {
+                done({ resignClicked: false, error: 'Could not find resign button' });
+                return;
+            }
+            setTimeout(() => { resignBtn = findResignButton(false); waitResign(); }, 20);
+            return;
+        }
+        const [x, y] = clickCentre(resignBtn);
+        const confirmDeadline = Date.now() + timeoutMs;
+        (function waitConfirm() {
+            const confirm = findResignConfirm(resignBtn);
+            if (!(confirm && confirm.separate) && Date.now() < confirmDeadline) {
+                setTimeout(waitConfirm, 20);
+                return;
+            }
+            const result = { resignClicked: true, confirmClicked: !!confirm, x: x, y: y };
+            if (confirm) [result.confirmX, result.confirmY] = clickCentre(confirm.el);
+            done(result);
+        })();
+    })();
+"""
 
 
 class ChessComInterface:
@@ -55,7 +2721,10 @@ class ChessComInterface:
             driver: Selenium WebDriver instance
         """
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        # 50 ms polling instead of the 500 ms default, so a wait returns
+        # within a frame or two of its condition becoming true.  Hot paths
+        # wait in-page instead (MutationObserver / async scripts).
+        self.wait = WebDriverWait(driver, 10, poll_frequency=0.05)
         # Cached board parameters (is_flipped, board_size) shared between
         # get_last_move() and make_move_cdp().  Board orientation and size
         # are stable for the entire game; recomputing them on every move
@@ -67,11 +2736,156 @@ class ChessComInterface:
         # 1-2 execute_script calls (href + title) from every get_last_move()
         # invocation.  Cleared alongside board params when a new game starts.
         self._variant_name_cache = None   # str | None
+        # The cached board params flattened to plain numbers:
+        # (left, top, square_size, is_flipped, files, ranks), or None while
+        # the board params (or their board rect) are not cached.
+        self._board_geom = None
+        # Every square's pixel centre for _board_geom, precomputed once per
+        # geometry so a lookup is a single dict hit:
+        # {'e4': (x, y), ...} | None
+        self._centres = None
+        # CSS selector that matched the promotion dialog last time; the
+        # selector (not the element) is kept, so it stays valid across
+        # games and navigations and is re-checked for visibility each use.
+        self._promo_selector_cache = None  # str | None
+        # The user's colour never changes mid-game.  Only a definite
+        # 'white'/'black' answer is cached, and only callers that opt in
+        # (use_cache=True) read it: game-start detection relies on a fresh
+        # 'unknown' once the game is over.  Cleared alongside board params
+        # when a new game starts and after a resignation.
+        self._player_color_cache = None   # 'white' | 'black' | None
+        # The logged-in user's name cannot change mid-session: cached on the
+        # first successful read.  The playerbox holding a given username
+        # only changes between games, so positions are cached per username
+        # and cleared alongside board params.
+        self._username_cache = None       # str | None
+        self._player_position_cache = {}  # username -> 'top' | 'bottom'
         # Cached right-edge of the left sidebar (CSS px).  Measured once
         # from the DOM; used as an exclusion zone for button searches so
         # that sidebar nav links (Play, Puzzles, Other …) are never
         # accidentally matched.  None = not yet measured.
         self._sidebar_right_cache = None   # float | None
+        # When True, the hot-path scripts (square coordinates, promotion,
+        # pocket drops) emit their console.log diagnostics and build the
+        # extra per-element debug arrays.  Off by default: every console
+        # message is serialised over CDP and the debug arrays force a
+        # getBoundingClientRect per element.
+        self._js_debug = False
+        # Driver on which the window.__tilted helper bundle was registered
+        # for new documents (see _ensure_helpers); None = not yet.
+        self._helpers_driver = None
+        # detect_game_over() payload delivered by the game-over observer
+        # through poll_observer_flags(); lets detect_game_over() answer
+        # without touching the page.  Cleared whenever the observer is
+        # reset or reinstalled.
+        self._last_game_over = None   # dict | None
+        # Reusable Input.dispatchMouseEvent payloads keyed by event kind;
+        # _cdp_mouse() only rewrites x/y instead of building a fresh dict
+        # for every event.  'drag' is a move with the left button held.
+        self._cdp_mouse_tmpl = {
+            'move': {'type': 'mouseMoved', 'x': 0, 'y': 0},
+            'drag': {'type': 'mouseMoved', 'x': 0, 'y': 0, 'button': 'left'},
+            'down': {'type': 'mousePressed', 'x': 0, 'y': 0,
+                     'button': 'left', 'clickCount': 1},
+            'up':   {'type': 'mouseReleased', 'x': 0, 'y': 0,
+                     'button': 'left', 'clickCount': 1},
+        }
+
+    # ── Page-side helper bundle ───────────────────────────────────────────────
+
+    def _ensure_helpers(self, force=False):
+        """Install the window.__tilted helper bundle on the current page.
+
+        The first call per driver also registers the bundle with
+        Page.addScriptToEvaluateOnNewDocument so every later document load
+        installs it before any page script runs.  Subsequent calls are
+        no-ops unless force=True (used when a page turns out to lack it).
+        """
+        if self._helpers_driver is not self.driver:
+            try:
+                self.driver.execute_cdp_cmd(
+                    'Page.addScriptToEvaluateOnNewDocument',
+                    {'source': _TILTED_HELPERS_JS})
+            except Exception:
+                pass
+            self._helpers_driver = self.driver
+            force = True
+        if force:
+            self.driver.execute_script(_TILTED_HELPERS_JS)
+
+    def _run_with_helpers(self, script, *args):
+        """execute_script() for scripts that rely on window.__tilted.
+
+        Such scripts return {__tiltedMissing: true} when the bundle is
+        absent; it is then installed and the script retried once.
+        """
+        self._ensure_helpers()
+        result = self.driver.execute_script(script, *args)
+        if isinstance(result, dict) and result.get('__tiltedMissing'):
+            self._ensure_helpers(force=True)
+            result = self.driver.execute_script(script, *args)
+        return result
+
+    def _call_helper(self, name, *args):
+        """Return window.__tilted[name](*args), installing the bundle if needed."""
+        return self._run_with_helpers(_CALL_HELPER_JS, name, *args)
+
+    def _cdp_eval(self, expression):
+        """Evaluate a JS expression via CDP Runtime.evaluate and return its value.
+
+        Skips the WebDriver execute/sync layer that execute_script() goes
+        through, so it is used for the hottest polls.  The expression must
+        produce a JSON-serialisable value (no DOM nodes).
+
+        Raises:
+            RuntimeError: If the expression threw in the page
+        """
+        response = self.driver.execute_cdp_cmd('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+        })
+        if response.get('exceptionDetails'):
+            details = response['exceptionDetails']
+            message = details.get('exception', {}).get('description') or details.get('text')
+            raise RuntimeError(f"Runtime.evaluate failed: {message}")
+        return response.get('result', {}).get('value')
+
+    def _call_helper_cdp(self, name, *args):
+        """_call_helper() over Runtime.evaluate (see _cdp_eval)."""
+        self._ensure_helpers()
+        call = f"window.__tilted.{name}({', '.join(json.dumps(a) for a in args)})"
+        expression = (f"(window.__tilted && window.__tilted.{name}) "
+                      f"? {call} : {{__tiltedMissing: true}}")
+        result = self._cdp_eval(expression)
+        if isinstance(result, dict) and result.get('__tiltedMissing'):
+            self._ensure_helpers(force=True)
+            result = self._cdp_eval(expression)
+        return result
+
+    def poll_observer_flags(self):
+        """Read and clear the move / game-over observer flags in one call.
+
+        When the game-over flag is set, the observer's result payload comes
+        back in the same call and is cached for detect_game_over().  When
+        the window or the board was resized (or the page zoomed) since the
+        last poll, the cached board params are dropped so the next move
+        re-probes the board rect.
+        Exceptions propagate so the caller can detect a dead session.
+
+        Returns:
+            tuple: (board_changed, game_over)
+        """
+        flags = self._cdp_eval(_POLL_OBSERVER_FLAGS_EXPR)
+        if not flags:
+            return (False, False)
+        board_changed, game_over, info, layout_changed = flags
+        if info:
+            self._last_game_over = info
+        if layout_changed:
+            self._board_params_cache = None
+            self._board_geom = None
+            self._centres = None
+        return (board_changed, game_over)
 
     def _is_session_dead(self):
         """Quick check whether the browser session is still alive.
@@ -89,15 +2903,122 @@ class ChessComInterface:
                 kw in str(exc).lower() for kw in _SESSION_DEATH_KEYWORDS
             )
 
+    def _cdp_mouse(self, kind, x, y, timestamp=None):
+        """Dispatch one trusted CDP mouse event ('move', 'drag', 'down' or 'up') at (x, y).
+
+        timestamp, if given, is the event time in seconds since the epoch;
+        otherwise the browser stamps the event on arrival.
+        """
+        event = self._cdp_mouse_tmpl[kind]
+        event['x'] = x
+        event['y'] = y
+        if timestamp is None:
+            event.pop('timestamp', None)
+        else:
+            event['timestamp'] = timestamp
+        self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', event)
+
+    @staticmethod
+    def _drag_path(fx, fy, tx, ty):
+        """Mouse path for a drag from (fx, fy) to (tx, ty).
+
+        Hover, press, glide to the destination in a few steps, release.
+        Each entry is (kind, x, y, delay_after_ms), the step format of
+        _DISPATCH_MOUSE_PATH_JS and _cdp_drag().
+        """
+        dx, dy = tx - fx, ty - fy
+        path = [('move', fx, fy, 10), ('down', fx, fy, 20)]
+        path.extend(('move', fx + dx * t, fy + dy * t, 0)
+                    for t in _DRAG_STEP_FRACTIONS)
+        path.append(('up', tx, ty, 0))
+        return path
+
+    def _cdp_drag(self, path):
+        """Replay a _drag_path() as trusted CDP mouse events.
+
+        The browser does not hold an event back until its timestamp, so
+        the path's delays (after the hover and the press) are real sleeps.
+        """
+        pressed = False
+        for kind, x, y, delay_ms in path:
+            if kind != 'move':
+                pressed = (kind == 'down')
+            elif pressed:
+                # Drag moves carry the held button
+                kind = 'drag'
+            self._cdp_mouse(kind, x, y)
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+
+    def _cdp_click(self, x, y):
+        """Trusted left click at viewport (x, y) via CDP press/release.
+
+        No sleeps between the events: CDP input events are dispatched in
+        order, and the page's handlers need no gap between them.  No
+        hover move is sent first either; the press itself hit-tests at
+        (x, y), and a click handler does not need a preceding mousemove.
+        """
+        self._cdp_mouse('down', x, y)
+        self._cdp_mouse('up', x, y)
+
+    def _click_at(self, x, y):
+        """Click whatever element is at viewport (x, y).
+
+        The pointer/mouse/click sequence is dispatched in-page by a single
+        execute_script (one round-trip, no sleeps).  The trusted CDP
+        press/release pair is only used when nothing is hit at
+        (x, y) or the script raises.
+        """
+        try:
+            if self.driver.execute_script(_SYNTHETIC_CLICK_JS, x, y):
+                return
+        except Exception:
+            pass
+        self._cdp_click(x, y)
+
+    def _wait_for_click_effect(self, timeout_ms):
+        """Wait until the element last clicked in-page reacts, capped at timeout_ms.
+
+        Replaces blind post-click sleeps: returns as soon as the clicked
+        button disappears or changes text.  Falls back to sleeping the full
+        timeout when no in-page click was recorded or the script fails.
+
+        Returns:
+            bool: True if the clicked element changed before the timeout
+        """
+        try:
+            changed = self.driver.execute_async_script(_WAIT_CLICK_EFFECT_JS, timeout_ms)
+        except Exception:
+            changed = None
+        if changed is None:
+            time.sleep(timeout_ms / 1000)
+        return bool(changed)
+
+    def _wait_for_game_over_dialog_closed(self, timeout_ms):
+        """Wait up to timeout_ms for the game-over dialog to close.
+
+        Returns:
+            bool: True if the dialog is still open afterwards
+        """
+        try:
+            still_open = self.driver.execute_async_script(
+                _WAIT_GAME_OVER_DIALOG_CLOSED_JS, timeout_ms)
+        except Exception:
+            still_open = None
+        if still_open is None:
+            time.sleep(timeout_ms / 1000)
+            still_open = self._call_helper('isGameOverDialogOpen')
+        return bool(still_open)
+
     def focus_browser(self):
-        """Bring the browser window to focus."""
+        """Bring the browser window to focus.
+
+        Page.bringToFront returns once the tab is in front, so no settle
+        delay is needed.  The window is not re-maximized here: Edge is
+        launched with --start-maximized.
+        """
         try:
-            # Maximize and focus the window
-            self.driver.maximize_window()
-            # Execute JavaScript to focus the window
-            self.driver.execute_script("window.focus();")
-            # Small delay to ensure focus is transferred
-            time.sleep(0.3)
+            self.driver.execute_cdp_cmd('Page.bringToFront', {})
         except Exception as e:
             print(f"[ChessCom] Warning: Could not focus browser: {_short_err(e)}")
 
@@ -110,39 +3031,54 @@ class ChessComInterface:
         within a game; recomputing them on every move wastes execute_script
         round-trips (~80-120 ms each, and much worse when the tab is occluded
         and Chrome throttles JS execution).  The cache is invalidated
-        externally when a new game starts.
+        externally when a new game starts, and by poll_observer_flags()
+        when the window or the board is resized or the page zoomed.
+
+        board_rect is {'left': float, 'top': float, 'width': float}.
+        Refreshing the cache also rebuilds _centres, so square lookups need
+        zero execute_script calls.  board_rect may be None if the board
+        element was not found.
 
-        board_rect is {'left': float, 'top': float, 'width': float} and is
-        extracted at no extra cost from the debug info already returned by
-        get_board_orientation().  Callers can use _coords_for_square_py()
-        to compute pixel coordinates in pure Python with zero execute_script
-        calls.  board_rect may be None if the board element was not found.
+        A cache miss costs one round-trip: orientation, size and rect come
+        from the fused _PROBE_BOARD_JS.  Only if that script fails are
+        get_board_orientation() and detect_board_size() run separately.
         """
         now = time.monotonic()
         if self._board_params_cache and (now - self._board_params_time < max_age):
             return self._board_params_cache
-        # get_board_orientation() already calls getBoundingClientRect() and
-        # stores the result in debug.boardInfo — extract it for free rather
-        # than running a separate script just to get the board rect.
-        orientation = self.get_board_orientation()
-        is_flipped  = orientation['is_flipped']
-        board_info  = orientation.get('debug', {}).get('boardInfo') or {}
-        board_rect  = (
-            {'left': board_info['left'], 'top': board_info['top'],
-             'width': board_info['width']}
-            if board_info.get('width')
-            else None
-        )
-        board_size  = self.detect_board_size()
+        try:
+            probe = self.driver.execute_script(_PROBE_BOARD_JS)
+            is_flipped = probe['is_flipped']
+            board_size = {'files': probe['files'], 'ranks': probe['ranks'],
+                          'method': probe['size_method']}
+            rect = probe.get('board_rect') or {}
+            board_rect = dict(rect) if rect.get('width') else None
+        except Exception as e:
+            print(f"[Board] Fused board probe failed, probing separately: {_short_err(e)}")
+            orientation = self.get_board_orientation()
+            is_flipped  = orientation['is_flipped']
+            board_info  = orientation.get('debug', {}).get('boardInfo') or {}
+            board_rect  = (
+                {'left': board_info['left'], 'top': board_info['top'],
+                 'width': board_info['width']}
+                if board_info.get('width')
+                else None
+            )
+            board_size  = self.detect_board_size()
         self._board_params_cache = (is_flipped, board_size, board_rect)
         self._board_params_time  = now
+        self._set_board_geom(is_flipped, board_size, board_rect)
         return self._board_params_cache
 
     def invalidate_board_params_cache(self):
         """Discard cached board parameters (call when a new game starts)."""
         self._board_params_cache = None
         self._board_params_time  = 0.0
+        self._board_geom = None
+        self._centres = None
         self._variant_name_cache = None
+        self._player_color_cache = None
+        self._player_position_cache = {}
 
     def _get_sidebar_right(self):
         """Return the right-edge x-coordinate of the left sidebar (CSS px).
@@ -185,39 +3121,132 @@ class ChessComInterface:
             self._sidebar_right_cache = 0.0
         return self._sidebar_right_cache
 
-    def _coords_for_square_py(self, square, is_flipped, board_size, board_rect):
-        """Return {'x': float, 'y': float} for square using pure Python arithmetic.
+    @staticmethod
+    def _flip_map(is_flipped, num_files, num_ranks):
+        """Resolve orientation once into linear square -> screen index maps.
+
+        Returns (file_base, file_sign, rank_base, rank_sign) such that
+        file_index = file_base + file_sign * file_num and
+        rank_index = rank_base + rank_sign * rank_number:
 
-        This is the execute_script-free fast path for coordinate lookup.
-        Requires board_rect from the cache (populated by _get_cached_board_params).
-        The math mirrors what get_two_square_coordinates() does in JS.
+            normal:  fi = file_num - 1,         ri = num_ranks - rank_number
+            flipped: fi = num_files - file_num, ri = rank_number - 1
         """
-        file_letter  = square[0].lower()
-        rank_number  = int(square[1:])
-        file_num     = ord(file_letter) - ord('a') + 1
-        num_files    = board_size.get('files', 8)
-        num_ranks    = board_size.get('ranks', 8)
-        sq_size      = board_rect['width'] / num_files
         if is_flipped:
-            fi = num_files - file_num
-            ri = rank_number - 1
-        else:
-            fi = file_num - 1
-            ri = num_ranks - rank_number
-        return {
-            'x': board_rect['left'] + fi * sq_size + sq_size / 2,
-            'y': board_rect['top']  + ri * sq_size + sq_size / 2,
-        }
+            return num_files, -1, -1, 1
+        return -1, 1, num_ranks, -1
+
+    @staticmethod
+    def _board_geometry(is_flipped, board_size, board_rect):
+        """Flatten board params into (left, top, square_size, is_flipped, files, ranks).
+
+        Returns None when board_rect is missing.
+        """
+        if not board_rect:
+            return None
+        num_files = board_size.get('files', 8)
+        num_ranks = board_size.get('ranks', 8)
+        return (board_rect['left'], board_rect['top'],
+                board_rect['width'] / num_files,
+                bool(is_flipped), num_files, num_ranks)
+
+    def _set_board_geom(self, is_flipped, board_size, board_rect):
+        """Cache the flattened board geometry and every square's centre.
+
+        The centre table is only rebuilt when the geometry actually changed
+        (get_game_state() re-reports the same rect on every poll).
+        """
+        geom = self._board_geometry(is_flipped, board_size, board_rect)
+        if geom == self._board_geom and (geom is None or self._centres is not None):
+            return
+        self._board_geom = geom
+        self._centres = None
+        if geom is None:
+            return
+        left, top, sq_size, is_flipped, num_files, num_ranks = geom
+        file_base, file_sign, rank_base, rank_sign = self._flip_map(
+            is_flipped, num_files, num_ranks)
+        centres = {}
+        for file_num in range(1, num_files + 1):
+            file_letter = chr(ord('a') + file_num - 1)
+            x = left + (file_base + file_sign * file_num + 0.5) * sq_size
+            for rank_number in range(1, num_ranks + 1):
+                ri = rank_base + rank_sign * rank_number
+                centres[f"{file_letter}{rank_number}"] = (x, top + (ri + 0.5) * sq_size)
+        self._centres = centres
+
+    def _get_move_coords(self, from_square, to_square):
+        """Return (from_coords, to_coords) for a move using the board-param cache.
+
+        Shared by every move method so that orientation, size and board rect
+        are detected at most once per cache lifetime instead of once (or
+        twice) per move.  Falls back to get_two_square_coordinates() when no
+        centre table is cached (board rect unavailable).
+        """
+        is_flipped, board_size, _ = self._get_cached_board_params()
+        if self._centres is not None:
+            from_xy = self._centres.get(from_square.lower())
+            to_xy = self._centres.get(to_square.lower())
+            if from_xy and to_xy:
+                return ({'x': from_xy[0], 'y': from_xy[1]},
+                        {'x': to_xy[0], 'y': to_xy[1]})
+        return self.get_two_square_coordinates(
+            from_square, to_square, is_flipped, board_size
+        )
+
+    def _resolve_move_coords(self, from_square, to_square):
+        """Session check plus _get_move_coords() for the start of a move.
+
+        Returns (from_coords, to_coords), or None when the browser session
+        is already dead.
+        """
+        # Fast bail-out: if the browser is already dead, avoid
+        # cascading through get_board_orientation / detect_board_size /
+        # get_two_square_coordinates which each print their own error.
+        if self._is_session_dead():
+            print("[ChessCom] Move aborted — browser session lost")
+            return None
+
+        # Board geometry is stable for an entire game.  The cache is
+        # filled with one execute_script on the first move (TTL 60 s,
+        # explicit invalidation between games) and reused at zero cost
+        # for every subsequent move — critical when the tab is occluded
+        # and Chrome throttles JS execution to several seconds per call.
+        # Square centres are then computed in pure Python from the cached
+        # board rect, so the hot path after the first move contains zero
+        # execute_script calls for coordinate lookup.
+        return self._get_move_coords(from_square, to_square)
+
+    def _wait_for_board_settle(self, quiet_ms, timeout_ms):
+        """Block until the board stops mutating, capped at timeout_ms.
 
+        Args:
+            quiet_ms: How long the board must stay unchanged to count as settled
+            timeout_ms: Upper bound on the wait
+
+        Returns:
+            tuple: (mutated, turn) - mutated is True if a board mutation was
+                   observed; turn is get_turn()'s answer read when the wait
+                   ended, or None if the script could not run
+        """
+        try:
+            mutated, turn = self.driver.execute_async_script(
+                _WAIT_BOARD_SETTLE_JS, quiet_ms, timeout_ms)
+            return bool(mutated), turn
+        except Exception:
+            # Observer unavailable - fall back to the old fixed delay
+            time.sleep(timeout_ms / 1000)
+            return False, None
 
     # ── Dual-square coordinate lookup ────────────────────────────────────────
 
     def get_two_square_coordinates(self, from_square, to_square, is_flipped, board_size):
-        """Return pixel centres for two squares in a single execute_script call.
+        """Return pixel centres for two squares in a single Runtime.evaluate call.
 
         Replacing two separate get_square_coordinates() calls (2 round-trips)
         with this method halves the number of execute_script calls needed for
-        a move, saving ~40 ms per move.
+        a move, saving ~40 ms per move.  The math lives in the helper bundle
+        (window.__tilted.squareCenters); only the numbers travel per call.
 
         Returns:
             (from_coords, to_coords) where each is a dict with 'x' and 'y',
@@ -228,52 +3257,20 @@ class ChessComInterface:
 
         def _parse(sq):
             """Split algebraic square into (file_num, rank_number)."""
-            if not sq or len(sq) < 2:
-                return None, None
-            file_letter = sq[0].lower()
-            rank_str    = sq[1:]
-            try:
-                file_num     = ord(file_letter) - ord('a') + 1
-                rank_number  = int(rank_str)
-                return file_num, rank_number
-            except ValueError:
+            m = _SQ_RE.match(sq.lower()) if sq else None
+            if not m:
                 return None, None
+            return _FILE_NUM[m.group(1)], int(m.group(2))
 
         ff, fr = _parse(from_square)
         tf, tr = _parse(to_square)
         if ff is None or tf is None:
             return None, None
 
-        js = f"""
-        const board = document.querySelector('.TheBoard-squares') ||
-                     document.querySelector('[class*="Board-squares"]') ||
-                     document.querySelector('.board') ||
-                     document.querySelector('[class*="board"]');
-        if (!board) return null;
-        const rect      = board.getBoundingClientRect();
-        const numFiles  = {num_files};
-        const numRanks  = {num_ranks};
-        const sqSize    = rect.width / numFiles;
-        const isFlipped = {str(is_flipped).lower()};
-
-        const coords = function(fileNum, rankNumber) {{
-            let fi, ri;
-            if (isFlipped) {{
-                fi = numFiles - fileNum;
-                ri = rankNumber - 1;
-            }} else {{
-                fi = fileNum - 1;
-                ri = numRanks - rankNumber;
-            }}
-            return {{
-                x: rect.left + fi * sqSize + sqSize / 2,
-                y: rect.top  + ri * sqSize + sqSize / 2
-            }};
-        }};
-        return [coords({ff}, {fr}), coords({tf}, {tr})];
-        """
         try:
-            result = self.driver.execute_script(js)
+            result = self._call_helper_cdp(
+                'squareCenters', num_files, num_ranks, bool(is_flipped),
+                [[ff, fr], [tf, tr]])
             if result and len(result) == 2:
                 return result[0], result[1]
         except Exception:
@@ -295,91 +3292,8 @@ class ChessComInterface:
                 'method': str  # Detection method used
             }
         """
-        js_script = """
-        // Find the main game board
-        const board = document.querySelector('.TheBoard-squares') ||
-                     document.querySelector('[class*="Board-squares"]') ||
-                     document.querySelector('.board') ||
-                     document.querySelector('[class*="board"]');
-
-        if (!board) {
-            return { files: 8, ranks: 8, method: 'default-no-board' };
-        }
-
-        const boardRect = board.getBoundingClientRect();
-        const margin = 60; // Area around board where labels appear
-
-        // Collect all coordinate labels near the board
-        const allElements = Array.from(document.querySelectorAll('*'));
-        const fileLetters = new Set();
-        const rankNumbers = new Set();
-
-        for (let el of allElements) {
-            const text = el.textContent?.trim();
-            if (!text || text.length > 3) continue;
-
-            const rect = el.getBoundingClientRect();
-            if (rect.width === 0 || rect.height === 0) continue;
-
-            // Skip elements inside pockets, material counters, player info, etc.
-            // Use String() to handle SVGAnimatedString and other non-string className types
-            const className = String(el.className || '');
-            const parentClasses = String(el.parentElement?.className || '');
-            const skipPatterns = ['pocket', 'material', 'player', 'captured', 'score', 'clock', 'timer'];
-            if (skipPatterns.some(pattern =>
-                className.toLowerCase().includes(pattern) ||
-                parentClasses.toLowerCase().includes(pattern))) {
-                continue;
-            }
-
-            // Check for file letters (a-z) - should be ABOVE or BELOW board
-            if (/^[a-z]$/.test(text)) {
-                const nearTopOrBottom = (
-                    Math.abs(rect.top - boardRect.bottom) < margin ||
-                    Math.abs(rect.bottom - boardRect.top) < margin
-                );
-                if (nearTopOrBottom) {
-                    fileLetters.add(text);
-                }
-            }
-            // Check for rank numbers (1-14) - should be LEFT or RIGHT of board
-            else if (/^[0-9]+$/.test(text)) {
-                const nearLeftOrRight = (
-                    Math.abs(rect.left - boardRect.right) < margin ||
-                    Math.abs(rect.right - boardRect.left) < margin
-                );
-                const num = parseInt(text);
-                if (nearLeftOrRight && num >= 1 && num <= 14) {
-                    rankNumbers.add(num);
-                }
-            }
-        }
-
-        // Determine board size from labels
-        let files = 8, ranks = 8;
-        let method = 'default';
-
-        if (fileLetters.size > 0 && rankNumbers.size > 0) {
-            // Find max file letter
-            const maxFile = Array.from(fileLetters).sort().pop();
-            files = maxFile.charCodeAt(0) - 'a'.charCodeAt(0) + 1;
-
-            // Find max rank number
-            ranks = Math.max(...Array.from(rankNumbers));
-
-            method = 'coordinate-labels';
-        }
-
-        return { files, ranks, method };
-        """
-
         try:
-            result = self.driver.execute_script(js_script)
-            files = result.get('files', 8)
-            ranks = result.get('ranks', 8)
-            method = result.get('method', 'unknown')
-
-            return result
+            return self.driver.execute_script(_DETECT_BOARD_SIZE_JS)
 
         except Exception as e:
             print(f"[Board] Error detecting size, defaulting to 8x8: {_short_err(e)}")
@@ -393,43 +3307,19 @@ class ChessComInterface:
         Example: rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
                  (starting position, white's turn)
 
+        Served from the page-side position cache, which the move observer
+        invalidates on every move-list mutation (see getPositionState).
+
         Returns:
             str: FEN string, or None if not available
         """
-        js_script = """
-        // Try multiple sources for the complete FEN
-        let fen = null;
-
-        // Priority 1: window.chessGame.getFEN() - most common
-        if (window.chessGame && typeof window.chessGame.getFEN === 'function') {
-            try {
-                fen = window.chessGame.getFEN();
-            } catch (e) {}
-        }
-
-        // Priority 2: window.game.getFEN() - alternative location
-        if (!fen && window.game && typeof window.game.getFEN === 'function') {
-            try {
-                fen = window.game.getFEN();
-            } catch (e) {}
-        }
-
-        // Priority 3: window.gameSetup.fen - used for puzzles/from-position games
-        if (!fen && window.gameSetup && window.gameSetup.fen) {
-            fen = window.gameSetup.fen;
-        }
-
-        return fen;
-        """
-
         try:
-            fen = self.driver.execute_script(js_script)
+            fen = self._call_helper_cdp('getPositionState')['fen']
             return fen if fen else None
         except Exception as e:
             print(f"[ChessCom] Error getting FEN: {_short_err(e)}")
             return None
 
-
     def get_turn(self):
         """
         Detect whose turn it is using move list parity.
@@ -441,54 +3331,14 @@ class ChessComInterface:
         - If no moves yet → White's turn (starting position)
 
         This is simple, reliable, and works for all variants regardless of FEN format.
+        Served from the same page-side position cache as get_fen(), so
+        repeated calls between moves skip the move-list walk.
 
         Returns:
             str: 'white', 'black', or 'unknown'
         """
-        js_script = """
-        // Find the move table container
-        const moveTable = document.querySelector('.moves-table');
-
-        if (!moveTable) {
-            return 'unknown';  // Can't find move list
-        }
-
-        // Find all move cells - these are individual moves (e4, b5, Bxb5, d5, etc.)
-        // Use the specific selector that matches the actual DOM structure
-        const moveCells = moveTable.querySelectorAll('.moves-table-cell.moves-move');
-
-        if (!moveCells || moveCells.length === 0) {
-            return 'white';  // No moves yet, white starts
-        }
-
-        // Filter out empty cells (placeholders for future moves)
-        const actualMoves = Array.from(moveCells).filter(cell => {
-            const text = cell.textContent.trim();
-            return text.length > 0;
-        });
-
-        if (actualMoves.length === 0) {
-            return 'white';  // No actual moves yet
-        }
-
-        // Get the last actual move
-        const lastMoveIndex = actualMoves.length - 1;
-
-        // Parity check:
-        // Index 0 = first move (white's e4) → black's turn next
-        // Index 1 = second move (black's b5) → white's turn next
-        // Index 2 = third move (white's Bxb5) → black's turn next
-        // Index 3 = fourth move (black's d5) → white's turn next
-        // etc.
-        if (lastMoveIndex % 2 === 0) {
-            return 'black';  // Even index (0, 2, 4...) = white moved, black's turn
-        } else {
-            return 'white';  // Odd index (1, 3, 5...) = black moved, white's turn
-        }
-        """
-
         try:
-            turn = self.driver.execute_script(js_script)
+            turn = self._call_helper_cdp('getPositionState')['turn']
             return turn
         except Exception as e:
             print(f"[ChessCom] Error detecting turn: {_short_err(e)}")
@@ -509,157 +3359,8 @@ class ChessComInterface:
                 'debug': dict         # Debug info
             }
         """
-        import time
-
-        js_script = """
-        const debug = { allLabels: [], nearLabels: [], boardInfo: null };
-
-        // STEP 1: Find the MAIN game board
-        const board = document.querySelector('.TheBoard-squares') ||
-                     document.querySelector('[class*="Board-squares"]') ||
-                     document.querySelector('.board') ||
-                     document.querySelector('[class*="board"]');
-
-        if (!board) {
-            return {
-                is_flipped: false,
-                method: 'none',
-                detail: 'board element not found',
-                debug: debug
-            };
-        }
-
-        const boardRect = board.getBoundingClientRect();
-        debug.boardInfo = {
-            top: Math.round(boardRect.top),
-            left: Math.round(boardRect.left),
-            width: Math.round(boardRect.width),
-            height: Math.round(boardRect.height),
-            hasFlippedClass: board.classList.contains('flipped')
-        };
-
-        // METHOD 1: Check for 'flipped' CSS class (like Wilted-Chess-Client)
-        if (board.classList.contains('flipped')) {
-            return {
-                is_flipped: true,
-                method: 'css-class',
-                detail: 'board has "flipped" class',
-                debug: debug
-            };
-        }
-
-        // METHOD 2: Analyze coordinate labels (generalized for any board size)
-        const margin = 40; // Coordinate labels are right next to the board
-        const allElements = Array.from(document.querySelectorAll('*'));
-        const coordinates = [];
-        const allRankNumbers = new Set();
-
-        // First pass: find all rank numbers near the board
-        for (let el of allElements) {
-            const text = el.textContent?.trim();
-
-            // Check if it's a number between 1-14 (support up to 14x14 boards)
-            if (/^[0-9]+$/.test(text) && text.length <= 3) {
-                const num = parseInt(text);
-                if (num >= 1 && num <= 14) {
-                    const rect = el.getBoundingClientRect();
-
-                    if (rect.width > 0 && rect.height > 0) {
-                        const className = String(el.className || '').toLowerCase();
-                        const labelInfo = {
-                            text: text,
-                            number: num,
-                            top: Math.round(rect.top),
-                            left: Math.round(rect.left),
-                            width: Math.round(rect.width),
-                            height: Math.round(rect.height),
-                            className: el.className
-                        };
-
-                        // Track ALL labels for debugging
-                        debug.allLabels.push(labelInfo);
-
-                        // FILTER 1: Exclude UI elements (notifications, icons, badges)
-                        const isUIElement = className.includes('notification') ||
-                                           className.includes('icon') ||
-                                           className.includes('badge') ||
-                                           className.includes('button') ||
-                                           className.includes('menu');
-
-                        if (isUIElement) {
-                            labelInfo.excluded = 'UI element';
-                            continue;
-                        }
-
-                        // FILTER 2: Must be near the board (within 40px)
-                        const nearBoard =
-                            Math.abs(rect.left - boardRect.left) < margin ||
-                            Math.abs(rect.right - boardRect.right) < margin ||
-                            Math.abs(rect.top - boardRect.top) < margin ||
-                            Math.abs(rect.bottom - boardRect.bottom) < margin;
-
-                        if (nearBoard) {
-                            debug.nearLabels.push(labelInfo);
-                            allRankNumbers.add(num);
-                            coordinates.push({
-                                text: text,
-                                number: num,
-                                top: rect.top,
-                                left: rect.left
-                            });
-                        }
-                    }
-                }
-            }
-        }
-
-        // Determine orientation from topmost label near board
-        if (coordinates.length >= 2) {
-            coordinates.sort((a, b) => a.top - b.top);
-            const topmost = coordinates[0];
-            const bottommost = coordinates[coordinates.length - 1];
-
-            debug.topmost = { text: topmost.text, top: Math.round(topmost.top) };
-            debug.bottommost = { text: bottommost.text, top: Math.round(bottommost.top) };
-
-            // Determine min and max ranks
-            const minRank = Math.min(...Array.from(allRankNumbers));
-            const maxRank = Math.max(...Array.from(allRankNumbers));
-
-            if (topmost.number === minRank) {
-                return {
-                    is_flipped: true,
-                    method: 'coordinate-labels',
-                    detail: `rank ${minRank} at top (black perspective)`,
-                    debug: debug
-                };
-            } else if (topmost.number === maxRank) {
-                return {
-                    is_flipped: false,
-                    method: 'coordinate-labels',
-                    detail: `rank ${maxRank} at top (white perspective)`,
-                    debug: debug
-                };
-            }
-        }
-
-        // Fallback: assume not flipped
-        return {
-            is_flipped: false,
-            method: 'default',
-            detail: 'assumed not flipped (no labels found)',
-            debug: debug
-        };
-        """
-
         try:
-            result = self.driver.execute_script(js_script)
-            is_flipped = result.get('is_flipped', False)
-            method = result.get('method', 'unknown')
-            detail = result.get('detail', '')
-            debug = result.get('debug', {})
-
-            return result
+            return self.driver.execute_script(_BOARD_ORIENTATION_JS)
 
         except Exception as e:
             print(f"[Board] Error detecting orientation: {_short_err(e)}")
@@ -681,19 +3382,15 @@ class ChessComInterface:
         Returns:
             str: Username or None if not found
         """
-        js_script = """
-        const statusBarUsername = document.querySelector('.status-bar-username');
-        if (statusBarUsername) {
-            return statusBarUsername.textContent.trim();
-        }
-        return null;
-        """
+        if self._username_cache:
+            return self._username_cache
 
         try:
-            username = self.driver.execute_script(js_script)
+            username = self._cdp_eval(_USERNAME_EXPR)
             if username:
                 if verbose:
                     print(f"[Player] Detected username: {username}")
+                self._username_cache = username
                 return username
             else:
                 if verbose:
@@ -714,35 +3411,15 @@ class ChessComInterface:
         Returns:
             str: 'top', 'bottom', or 'unknown'
         """
-        js_script = f"""
-        const username = "{username}";
-
-        // Find playerboxes
-        const topBox = document.querySelector('.playerbox-top');
-        const bottomBox = document.querySelector('.playerbox-bottom');
-
-        // Check top box
-        if (topBox) {{
-            const topUserTag = topBox.querySelector('.playerbox-user-tag');
-            if (topUserTag && topUserTag.textContent.includes(username)) {{
-                return 'top';
-            }}
-        }}
-
-        // Check bottom box
-        if (bottomBox) {{
-            const bottomUserTag = bottomBox.querySelector('.playerbox-user-tag');
-            if (bottomUserTag && bottomUserTag.textContent.includes(username)) {{
-                return 'bottom';
-            }}
-        }}
-
-        return 'unknown';
-        """
+        cached = self._player_position_cache.get(username)
+        if cached:
+            return cached
 
         try:
-            position = self.driver.execute_script(js_script)
+            position = self.driver.execute_script(_PLAYER_POSITION_JS, username)
             print(f"[Player] Username '{username}' found in {position} playerbox")
+            if position in ('top', 'bottom'):
+                self._player_position_cache[username] = position
             return position
         except Exception as e:
             print(f"[Player] Error finding player position: {_short_err(e)}")
@@ -764,84 +3441,8 @@ class ChessComInterface:
                 'confidence': str     # 'high', 'medium', 'low'
             }
         """
-        js_script = """
-        // Find all pieces on the board
-        const pieces = document.querySelectorAll('[class*="piece"]');
-
-        if (pieces.length === 0) {
-            return { white_ranks: [], black_ranks: [], confidence: 'low', error: 'No pieces found' };
-        }
-
-        // Count pieces by color and rank
-        const whitePieces = { 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0 };
-        const blackPieces = { 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0 };
-
-        pieces.forEach(piece => {
-            const classes = piece.className;
-
-            // Piece classes are like "piece wp" (white pawn), "piece bn" (black knight), etc.
-            // First letter after 'piece' indicates color: w=white, b=black
-            const isWhite = classes.includes(' w') || classes.includes('white');
-            const isBlack = classes.includes(' b') || classes.includes('black');
-
-            // Try to determine which square this piece is on
-            // Check parent square element
-            let square = piece.parentElement;
-            while (square && !square.className.includes('square')) {
-                square = square.parentElement;
-            }
-
-            if (square) {
-                // Square classes often include the square name like "square-11" (a1), "square-88" (h8)
-                // Format is typically "square-<file><rank>" where file=1-8 (a-h), rank=1-8
-                const match = square.className.match(/square-(\\d)(\\d)/);
-                if (match) {
-                    const rank = parseInt(match[2]);  // Second digit is the rank
-
-                    if (isWhite) {
-                        whitePieces[rank]++;
-                    } else if (isBlack) {
-                        blackPieces[rank]++;
-                    }
-                }
-            }
-        });
-
-        // Find ranks with most white and black pieces
-        const whiteRanks = Object.entries(whitePieces)
-            .filter(([rank, count]) => count > 0)
-            .map(([rank, count]) => ({ rank: parseInt(rank), count }))
-            .sort((a, b) => b.count - a.count)
-            .map(item => item.rank);
-
-        const blackRanks = Object.entries(blackPieces)
-            .filter(([rank, count]) => count > 0)
-            .map(([rank, count]) => ({ rank: parseInt(rank), count }))
-            .sort((a, b) => b.count - a.count)
-            .map(item => item.rank);
-
-        // Determine confidence
-        let confidence = 'low';
-        if (whiteRanks.length >= 2 && blackRanks.length >= 2) {
-            confidence = 'high';
-        } else if (whiteRanks.length >= 1 && blackRanks.length >= 1) {
-            confidence = 'medium';
-        }
-
-        return {
-            white_ranks: whiteRanks,
-            black_ranks: blackRanks,
-            confidence: confidence,
-            debug: {
-                total_pieces: pieces.length,
-                white_pieces: whitePieces,
-                black_pieces: blackPieces
-            }
-        };
-        """
-
         try:
-            result = self.driver.execute_script(js_script)
+            result = self.driver.execute_script(_DETECT_PIECE_COLORS_JS)
 
             print(f"[Pieces] Detection confidence: {result.get('confidence', 'unknown')}")
             print(f"[Pieces] White pieces on ranks: {result.get('white_ranks', [])}")
@@ -856,7 +3457,7 @@ class ChessComInterface:
 
             return {'white_ranks': [], 'black_ranks': [], 'confidence': 'low'}
 
-    def get_player_color(self, username=None, verbose=True):
+    def get_player_color(self, username=None, verbose=True, use_cache=False):
         """
         Detect which color the user is playing as.
 
@@ -867,10 +3468,15 @@ class ChessComInterface:
         Args:
             username: Optional username to use. If None, will auto-detect from page.
             verbose: If True, print detailed detection info. If False, silent mode.
+            use_cache: If True, return the colour detected earlier in this
+                      game (if any) without touching the page.
 
         Returns:
             str: 'white', 'black', or 'unknown'
         """
+        if use_cache and self._player_color_cache:
+            return self._player_color_cache
+
         if verbose:
             print(f"\n{'='*60}")
             print(f"[Player Color Detection]")
@@ -886,36 +3492,8 @@ class ChessComInterface:
             return 'unknown'
 
         # Step 2: Find username's playerbox and get data-player attribute
-        js_script = f"""
-        const username = "{username}";
-        const topBox = document.querySelector('.playerbox-top');
-        const bottomBox = document.querySelector('.playerbox-bottom');
-
-        // Check top box
-        if (topBox) {{
-            const userTag = topBox.querySelector('.playerbox-user-tag');
-            if (userTag && userTag.textContent.includes(username)) {{
-                const playerDiv = topBox.querySelector('[data-player]');
-                const dataPlayer = playerDiv ? playerDiv.getAttribute('data-player') : null;
-                return {{ position: 'top', dataPlayer: dataPlayer }};
-            }}
-        }}
-
-        // Check bottom box
-        if (bottomBox) {{
-            const userTag = bottomBox.querySelector('.playerbox-user-tag');
-            if (userTag && userTag.textContent.includes(username)) {{
-                const playerDiv = bottomBox.querySelector('[data-player]');
-                const dataPlayer = playerDiv ? playerDiv.getAttribute('data-player') : null;
-                return {{ position: 'bottom', dataPlayer: dataPlayer }};
-            }}
-        }}
-
-        return {{ position: 'unknown', dataPlayer: null }};
-        """
-
         try:
-            result = self.driver.execute_script(js_script)
+            result = self.driver.execute_script(_PLAYER_COLOR_JS, username)
             position = result.get('position', 'unknown')
             data_player = result.get('dataPlayer')
 
@@ -937,6 +3515,9 @@ class ChessComInterface:
                 if verbose:
                     print(f"[Player] ⚠ Unexpected data-player value: {data_player}")
 
+            if user_color != 'unknown':
+                self._player_color_cache = user_color
+
             if verbose:
                 print(f"\n{'─'*60}")
                 if user_color == 'white':
@@ -959,36 +3540,60 @@ class ChessComInterface:
         """
         Detect if the board is flipped (rank 1 at top).
 
+        Orientation is constant within a game, so this reads the shared
+        board-parameter cache rather than re-detecting it every call.
+
         Returns:
             bool: True if board is flipped, False otherwise
         """
-        orientation = self.get_board_orientation()
-        return orientation['is_flipped']
+        return self._get_cached_board_params()[0]
 
     # Debug functions removed to reduce output noise
     # Use browser DevTools console for detailed inspection if needed
 
-
-    def get_square_coordinates(self, square, is_flipped=None, board_size=None):
+    def get_square_coordinates(self, square, is_flipped=None, board_size=None,
+                               force_refresh=False):
         """
         Get the pixel coordinates of a square on the chess.com board.
         Automatically adjusts for board flip and board size.
 
+        Orientation and size that are not passed in come from the board
+        params cache (see _get_cached_board_params), whose single fused
+        probe also measures the board rect.  While those params agree with
+        any is_flipped / board_size passed in, the centre is looked up in
+        Python with no further execute_script call; the in-page script only
+        runs when no board rect is cached or force_refresh is set.
+
         Args:
             square: Square in UCI format (e.g., 'e2', 'd4', 'j8')
             is_flipped: Optional pre-computed board flip state (True/False).
                        If None, will detect automatically.
             board_size: Optional pre-computed board size dict {'files': int, 'ranks': int}.
                        If None, will detect automatically.
+            force_refresh: If True, always measure the board in-page.
 
         Returns:
             dict: {'x': x_coord, 'y': y_coord} or None if not found
         """
-        file_letter = square[0]
-        rank_number = int(square[1:])  # Support multi-digit ranks (e.g., '10', '14')
-
-        # Convert file letter to number (a=1, b=2, ..., j=10, etc.)
-        file_num = ord(file_letter) - ord('a') + 1
+        if not force_refresh and (is_flipped is None or board_size is None):
+            # One fused probe (on a cold cache) supplies orientation, size
+            # and board rect, and fills the centre table used just below
+            cached_flipped, cached_size, _ = self._get_cached_board_params()
+            if is_flipped is None:
+                is_flipped = cached_flipped
+            if board_size is None:
+                board_size = cached_size
+
+        geom = None if force_refresh else self._board_geom
+        if geom is not None and self._centres is not None:
+            _, _, _, flipped, num_files, num_ranks = geom
+            if ((is_flipped is None or bool(is_flipped) == flipped)
+                    and (board_size is None
+                         or (board_size.get('files', 8),
+                             board_size.get('ranks', 8)) == (num_files, num_ranks))):
+                centre = self._centres.get(square.lower())
+                if centre:
+                    return {'x': centre[0], 'y': centre[1]}
 
         # Detect board orientation (only if not provided)
         if is_flipped is None:
@@ -1001,70 +3606,15 @@ class ChessComInterface:
         num_files = board_size.get('files', 8)
         num_ranks = board_size.get('ranks', 8)
 
-        js_script = f"""
-        // Find the chess board
-        const board = document.querySelector('.TheBoard-squares') ||
-                     document.querySelector('[class*="Board-squares"]') ||
-                     document.querySelector('.board') ||
-                     document.querySelector('[class*="board"]');
-
-        if (!board) {{
-            console.log('[Coords] Could not find board element');
-            return null;
-        }}
-
-        const rect = board.getBoundingClientRect();
-        const numFiles = {num_files};
-        const numRanks = {num_ranks};
-        const squareSize = rect.width / numFiles;
-        const isFlipped = {str(is_flipped).lower()};
-
-        let fileIndex, rankIndex;
-
-        if (isFlipped) {{
-            // BLACK ON BOTTOM (flipped board)
-            // For any board size NxM:
-            // Visual: rightmost file at left, rank 1 at bottom
-            // Pixel coords (0,0) at top-left
-            fileIndex = numFiles - {file_num};  // rightmost=0, ..., leftmost=numFiles-1
-            rankIndex = {rank_number} - 1;      // rank 1=0, rank 2=1, ..., rank N=N-1
-            console.log('[Coords] FLIPPED ({square}): fileIndex=' + fileIndex + ', rankIndex=' + rankIndex);
-        }} else {{
-            // WHITE ON BOTTOM (normal board)
-            // For any board size NxM:
-            // Visual: leftmost file at left, highest rank at top
-            // Pixel coords (0,0) at top-left
-            fileIndex = {file_num} - 1;         // a=0, b=1, c=2, ...
-            rankIndex = numRanks - {rank_number};  // highest rank=0, ..., rank 1=numRanks-1
-            console.log('[Coords] NORMAL ({square}): fileIndex=' + fileIndex + ', rankIndex=' + rankIndex);
-        }}
-
-        const x = rect.left + (fileIndex * squareSize) + (squareSize / 2);
-        const y = rect.top + (rankIndex * squareSize) + (squareSize / 2);
-
-        return {{
-            x: x,
-            y: y,
-            method: 'calculated',
-            flipped: isFlipped,
-            boardSize: {{ files: numFiles, ranks: numRanks }},
-            debug: {{
-                boardRect: {{ left: rect.left, top: rect.top, width: rect.width, height: rect.height }},
-                squareSize: squareSize,
-                fileIndex: fileIndex,
-                rankIndex: rankIndex
-            }}
-        }};
-        """
-
         try:
-            coords = self.driver.execute_script(js_script)
-            return coords
+            return self.driver.execute_script(
+                _SQUARE_COORDS_JS, square, bool(is_flipped),
+                num_files, num_ranks, self._js_debug)
         except Exception as e:
             print(f"[ChessCom] Error getting coordinates for {square}: {_short_err(e)}")
             return None
 
-    def make_move_cdp(self, uci_move):
+    def make_move_cdp(self, uci_move, parsed=None, coords=None):
         """
         Make a move using Chrome DevTools Protocol (CDP) input events.
         This is the EXACT equivalent of Puppeteer's page.mouse API.
@@ -1072,13 +3622,18 @@ class ChessComInterface:
 
         Args:
             uci_move: Move in UCI format (e.g., 'e2e4', 'd7d5', 'g14n7')
+            parsed: Optional result of UCIHandler.parse_uci_move(uci_move),
+                    passed by make_move() to avoid re-parsing
+            coords: Optional (from_coords, to_coords) already resolved by
+                    make_move(), shared by every fallback
 
         Returns:
             bool: True if move was successful, False otherwise
         """
         try:
             # Parse UCI move properly (handles multi-digit ranks)
-            parsed = UCIHandler.parse_uci_move(uci_move)
+            if parsed is None:
+                parsed = UCIHandler.parse_uci_move(uci_move)
             if not parsed or parsed.get('type') != 'normal':
                 print(f"[ChessCom] ✗ Invalid move format: {uci_move}")
                 return False
@@ -1086,37 +3641,13 @@ class ChessComInterface:
             from_square = parsed['from']
             to_square = parsed['to']
 
-            print(f"[ChessCom] Move: {from_square} → {to_square}")
+            log.debug("[ChessCom] Move: %s → %s", from_square, to_square)
 
-            # Fast bail-out: if the browser is already dead, avoid
-            # cascading through get_board_orientation / detect_board_size /
-            # get_two_square_coordinates which each print their own error.
-            if self._is_session_dead():
-                print("[ChessCom] Move aborted — browser session lost")
-                return False
-
-            # Board geometry is stable for an entire game.  The cache is
-            # filled with one execute_script on the first move (TTL 60 s,
-            # explicit invalidation between games) and reused at zero cost
-            # for every subsequent move — critical when the tab is occluded
-            # and Chrome throttles JS execution to several seconds per call.
-            is_flipped, board_size, board_rect = self._get_cached_board_params()
-
-            # Compute square centres in pure Python from the cached board
-            # rect.  This replaces the per-move execute_script in
-            # get_two_square_coordinates() with simple arithmetic, so the
-            # hot path after the first move contains zero execute_script
-            # calls and is completely immune to Chrome's occlusion throttling.
-            if board_rect:
-                from_coords = self._coords_for_square_py(
-                    from_square, is_flipped, board_size, board_rect)
-                to_coords   = self._coords_for_square_py(
-                    to_square,   is_flipped, board_size, board_rect)
-            else:
-                # Fallback: board element not found in cache; use the JS path.
-                from_coords, to_coords = self.get_two_square_coordinates(
-                    from_square, to_square, is_flipped, board_size
-                )
+            if coords is None:
+                coords = self._resolve_move_coords(from_square, to_square)
+                if coords is None:
+                    return False
+            from_coords, to_coords = coords
 
             if not from_coords or not to_coords:
                 print(f"[ChessCom] ✗ Could not find board squares")
@@ -1141,11 +3672,10 @@ class ChessComInterface:
             x_from, y_from = from_coords['x'], from_coords['y']
             x_to,   y_to   = to_coords['x'],   to_coords['y']
 
-            # ── Primary: execute_async_script with 150 ms inter-click gap ────
-            # Five separate execute_cdp_cmd calls cost ~25-35 ms each on
-            # Windows/Edge (local HTTP overhead), totalling ~150 ms before any
-            # sleep is counted.  execute_async_script replaces all of them with
-            # a single HTTP round-trip that completes once the JS callback fires.
+            # ── Primary: _CLICK_CLICK_MOVE_JS, 150 ms inter-click gap ─────────
+            # One execute_async_script round-trip that completes once the JS
+            # callback fires, with both clicks and the gap between them
+            # run in-page (see the comment above for why not CDP).
             #
             # Click-to-click animation requires two things beyond just firing
             # two clicks:
@@ -1166,59 +3696,8 @@ class ChessComInterface:
             #     and the piece slide animation fires naturally on the second click.
             js_ok = False
             try:
-                js_ok = self.driver.execute_async_script("""
-                    var fx = arguments[0], fy = arguments[1];
-                    var tx = arguments[2], ty = arguments[3];
-                    var done = arguments[4];
-
-                    function moveCursor(x, y) {
-                        var base = {
-                            bubbles: true, cancelable: true, view: window,
-                            clientX: x, clientY: y, screenX: x, screenY: y,
-                            buttons: 0
-                        };
-                        document.dispatchEvent(new PointerEvent('pointermove',
-                            Object.assign({}, base, {
-                                pointerId: 1, pointerType: 'mouse', isPrimary: true
-                            })));
-                        document.dispatchEvent(new MouseEvent('mousemove', base));
-                    }
-
-                    function syntheticClick(x, y) {
-                        var el = document.elementFromPoint(x, y);
-                        if (!el) return false;
-                        function mkP(t, b) {
-                            return new PointerEvent(t, {
-                                bubbles: true, cancelable: true, view: window,
-                                clientX: x,  clientY: y,
-                                screenX: x,  screenY: y,
-                                pointerId: 1, pointerType: 'mouse',
-                                isPrimary: true, button: 0, buttons: b
-                            });
-                        }
-                        function mkM(t, b) {
-                            return new MouseEvent(t, {
-                                bubbles: true, cancelable: true, view: window,
-                                clientX: x,  clientY: y,
-                                screenX: x,  screenY: y,
-                                button: 0, buttons: b
-                            });
-                        }
-                        el.dispatchEvent(mkP('pointerdown', 1));
-                        el.dispatchEvent(mkM('mousedown',   1));
-                        el.dispatchEvent(mkP('pointerup',   0));
-                        el.dispatchEvent(mkM('mouseup',     0));
-                        el.dispatchEvent(mkM('click',       0));
-                        return true;
-                    }
-
-                    moveCursor(fx, fy);
-                    if (!syntheticClick(fx, fy)) { done(false); return; }
-                    setTimeout(function() {
-                        moveCursor(tx, ty);
-                        done(syntheticClick(tx, ty));
-                    }, 150);
-                """, x_from, y_from, x_to, y_to) or False
+                js_ok = self.driver.execute_async_script(
+                    _CLICK_CLICK_MOVE_JS, x_from, y_from, x_to, y_to) or False
             except Exception:
                 pass
 
@@ -1226,31 +3705,19 @@ class ChessComInterface:
                 # ── Fallback: CDP multi-call (four HTTP round-trips) ──────────
                 # Used when execute_script returns False (element not found) or
                 # raises an exception.  Slower but goes through the browser's
-                # native input pipeline.
+                # native input pipeline.  The browser does not hold an event
+                # back until its timestamp: each press/release pair arrives
+                # back-to-back, and only event.timeStamp is staggered.  The
+                # one real gap is the sleep between the two clicks, so the
+                # selection is committed before the destination press.
                 try:
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mousePressed',
-                        'x': x_from, 'y': y_from,
-                        'button': 'left', 'clickCount': 1
-                    })
-                    time.sleep(0.004)
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseReleased',
-                        'x': x_from, 'y': y_from,
-                        'button': 'left', 'clickCount': 1
-                    })
+                    t0 = time.time()
+                    self._cdp_mouse('down', x_from, y_from, t0)
+                    self._cdp_mouse('up', x_from, y_from, t0 + 0.004)
                     time.sleep(0.010)
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mousePressed',
-                        'x': x_to, 'y': y_to,
-                        'button': 'left', 'clickCount': 1
-                    })
-                    time.sleep(0.004)
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseReleased',
-                        'x': x_to, 'y': y_to,
-                        'button': 'left', 'clickCount': 1
-                    })
+                    t1 = time.time()
+                    self._cdp_mouse('down', x_to, y_to, t1)
+                    self._cdp_mouse('up', x_to, y_to, t1 + 0.004)
                 except Exception as cdp_error:
                     print(f"[ChessCom] ✗ CDP error: {_short_err(cdp_error)}")
                     return False
@@ -1267,23 +3734,25 @@ class ChessComInterface:
                 print(f"[ChessCom] Error making move: {_short_err(e)}")
             return False
 
-    def make_move_js(self, uci_move):
+    def make_move_js(self, uci_move, parsed=None, coords=None):
         """
         Make a move using pure JavaScript event dispatch (Puppeteer-style).
         This method does NOT require window focus and can work in the background.
 
         Args:
             uci_move: Move in UCI format (e.g., 'e2e4', 'd7d5', 'g14n7')
+            parsed: Optional result of UCIHandler.parse_uci_move(uci_move),
+                    passed by make_move() to avoid re-parsing
+            coords: Optional (from_coords, to_coords) already resolved by
+                    make_move(), shared by every fallback
 
         Returns:
             bool: True if move was successful, False otherwise
         """
         try:
-            # Check whose turn it is
-            turn = self.get_turn()
-
             # Parse UCI move properly (handles multi-digit ranks)
-            parsed = UCIHandler.parse_uci_move(uci_move)
+            if parsed is None:
+                parsed = UCIHandler.parse_uci_move(uci_move)
             if not parsed or parsed.get('type') != 'normal':
                 print(f"[ChessCom] ✗ Invalid move format: {uci_move}")
                 return False
@@ -1291,120 +3760,39 @@ class ChessComInterface:
             from_square = parsed['from']
             to_square = parsed['to']
 
-            print(f"[ChessCom] Move: {from_square} -> {to_square}")
-
-            # Detect board parameters once (cache for this move)
-            is_flipped = self.is_board_flipped()
-            board_size = self.detect_board_size()
+            log.debug("[ChessCom] Move: %s -> %s", from_square, to_square)
 
-            # Get coordinates for both squares
-            from_coords = self.get_square_coordinates(from_square, is_flipped, board_size)
-            to_coords = self.get_square_coordinates(to_square, is_flipped, board_size)
+            # Board parameters come from the shared per-game cache
+            if coords is None:
+                coords = self._get_move_coords(from_square, to_square)
+            from_coords, to_coords = coords
 
             if not from_coords or not to_coords:
                 print(f"[ChessCom] Could not find board squares")
                 return False
 
-
             # Execute move using JavaScript event dispatch
-            # This works WITHOUT window focus (like Puppeteer)
-            js_move_script = f"""
-                const fromX = {from_coords['x']};
-                const fromY = {from_coords['y']};
-                const toX = {to_coords['x']};
-                const toY = {to_coords['y']};
-
-                // Find elements at coordinates
-                const fromElement = document.elementFromPoint(fromX, fromY);
-                const toElement = document.elementFromPoint(toX, toY);
-
-                if (!fromElement || !toElement) {{
-                    return {{success: false, error: 'Elements not found'}};
-                }}
-
-                // Helper to create mouse event with all required properties
-                function createMouseEvent(type, x, y, element) {{
-                    return new MouseEvent(type, {{
-                        view: window,
-                        bubbles: true,
-                        cancelable: true,
-                        clientX: x,
-                        clientY: y,
-                        screenX: x,
-                        screenY: y,
-                        button: 0,
-                        buttons: type === 'mouseup' ? 0 : 1,
-                        relatedTarget: element
-                    }});
-                }}
-
-                // Helper to create pointer event (some sites use this instead)
-                function createPointerEvent(type, x, y, element) {{
-                    return new PointerEvent(type, {{
-                        view: window,
-                        bubbles: true,
-                        cancelable: true,
-                        clientX: x,
-                        clientY: y,
-                        screenX: x,
-                        screenY: y,
-                        pointerId: 1,
-                        pointerType: 'mouse',
-                        isPrimary: true,
-                        button: 0,
-                        buttons: type === 'pointerup' ? 0 : 1,
-                        relatedTarget: element
-                    }});
-                }}
-
-                // Dispatch full event sequence
-                // Some chess sites need both mouse AND pointer events
-                try {{
-                    // 1. Start at source square
-                    fromElement.dispatchEvent(createPointerEvent('pointerdown', fromX, fromY, fromElement));
-                    fromElement.dispatchEvent(createMouseEvent('mousedown', fromX, fromY, fromElement));
-
-                    // 2. Small delay (simulate human timing)
-                    setTimeout(() => {{
-                        // 3. Move events
-                        fromElement.dispatchEvent(createPointerEvent('pointermove', fromX, fromY, toElement));
-                        fromElement.dispatchEvent(createMouseEvent('mousemove', fromX, fromY, toElement));
-
-                        // 4. Arrive at destination
-                        toElement.dispatchEvent(createPointerEvent('pointermove', toX, toY, toElement));
-                        toElement.dispatchEvent(createMouseEvent('mousemove', toX, toY, toElement));
-
-                        // 5. Release at destination
-                        toElement.dispatchEvent(createPointerEvent('pointerup', toX, toY, toElement));
-                        toElement.dispatchEvent(createMouseEvent('mouseup', toX, toY, toElement));
-
-                        // 6. Click event (some sites need this)
-                        toElement.dispatchEvent(new MouseEvent('click', {{
-                            view: window,
-                            bubbles: true,
-                            cancelable: true,
-                            clientX: toX,
-                            clientY: toY
-                        }}));
-                    }}, 50);
-
-                    return {{
-                        success: true,
-                        from: fromElement.className,
-                        to: toElement.className
-                    }};
-                }} catch (error) {{
-                    return {{success: false, error: error.message}};
-                }}
-            """
-
-            result = self.driver.execute_script(js_move_script)
+            # This works WITHOUT window focus (like Puppeteer).  The turn
+            # before the move comes back from the same script.
+            result = self.driver.execute_script(
+                _SYNTHETIC_DRAG_MOVE_JS, from_coords['x'], from_coords['y'],
+                to_coords['x'], to_coords['y'])
+            if not result.get('success'):
+                # Nothing was dispatched, so there is nothing to wait for
+                print(f"[ChessCom] ✗ Move events not dispatched: {result.get('error')}")
+                return False
+            turn = result.get('turn') or 'unknown'
 
-            # Wait for move to process
-            time.sleep(0.6)
+            # Wait for move to process (returns as soon as the board settles,
+            # capped at the old fixed 0.6 s) and read the turn in the same
+            # round-trip.  The release fires 50 ms after the press, so the
+            # quiet window must be longer than that.
+            mutated, new_turn = self._wait_for_board_settle(100, 600)
+            settled = new_turn is not None
 
             # Validate: check if turn changed
-            new_turn = self.get_turn()
+            if new_turn is None:
+                new_turn = self.get_turn()
 
             if turn != 'unknown' and new_turn != 'unknown' and turn != new_turn:
                 print(f"[ChessCom] ✓ Move successful - turn changed from {turn} to {new_turn}")
@@ -1415,8 +3803,10 @@ class ChessComInterface:
                 return False
             else:
                 print(f"[ChessCom] Move {uci_move} executed (turn detection unavailable)")
-                # If we can't detect turn, assume success based on JS result
-                return result.get('success', False)
+                # Without a turn to compare, a board mutation during the wait
+                # is the success signal (assume success if the wait itself
+                # could not run)
+                return mutated or not settled
 
         except Exception as e:
             err_str = str(e).lower()
@@ -1438,222 +3828,51 @@ class ChessComInterface:
             bool: True if promotion was handled successfully, False otherwise
         """
         try:
-            print(f"[ChessCom] Handling promotion to: {promotion_piece.upper()}")
-
-            # Wait for promotion dialog to appear
-            time.sleep(0.3)
-
-            js_script = """
-            // Map UCI promotion characters to piece types
-            // NOTE: UCI uses 'a'/'c' for Archbishop/Chancellor, but chess.com uses 'H'/'E'
-            const promotionPiece = arguments[0].toLowerCase();
-            const pieceMap = {
-                'q': 'Q',  // Queen
-                'r': 'R',  // Rook
-                'b': 'B',  // Bishop
-                'n': 'N',  // Knight
-                'k': 'K',  // King (for variants)
-                'u': 'U',  // Unicorn (for variants)
-                'w': 'W',  // Wazir (for variants)
-                'f': 'F',  // Ferz (for variants)
-                'a': 'H',  // Archbishop (UCI: a → chess.com: H)
-                'c': 'E',  // Chancellor (UCI: c → chess.com: E)
-                'd': 'Δ'   // Dragon Bishop (UCI: d → chess.com: Δ)
-            };
-
-            const targetPiece = pieceMap[promotionPiece];
-            if (!targetPiece) {
-                return { error: 'Unknown promotion piece: ' + promotionPiece };
-            }
-
-            // First, find the promotion dialog container
-            const dialogSelectors = [
-                '[class*="promotion"]',
-                '.promotion-area',
-                '[class*="piece-choice"]',
-                '[class*="upgrade"]'
-            ];
-
-            // Find the LARGEST visible promotion dialog (not hidden/minimized ones)
-            let promotionDialog = null;
-            let largestArea = 0;
-
-            for (const selector of dialogSelectors) {
-                const elements = document.querySelectorAll(selector);
-                for (const elem of elements) {
-                    const rect = elem.getBoundingClientRect();
-                    const area = rect.width * rect.height;
-
-                    // Must be visible and larger than what we've found
-                    if (area > largestArea && rect.width > 50 && rect.height > 50) {
-                        promotionDialog = elem;
-                        largestArea = area;
-                    }
-                }
-            }
-
-            if (!promotionDialog) {
-                return { error: 'Promotion dialog container not found (no large visible dialogs)' };
-            }
-
-            // LOG DIALOG DETAILS
-            const dialogRect = promotionDialog.getBoundingClientRect();
-            console.log('[Promotion] Dialog found:', {
-                class: promotionDialog.className,
-                rect: { x: dialogRect.left, y: dialogRect.top, w: dialogRect.width, h: dialogRect.height },
-                innerHTML: promotionDialog.innerHTML.substring(0, 300)
-            });
-
-            // Find pieces WITHIN the promotion dialog - try multiple selectors
-            let promotionPieces = promotionDialog.querySelectorAll('[data-piece]');
-
-            // If no pieces found, try alternative selectors
-            if (promotionPieces.length === 0) {
-                promotionPieces = promotionDialog.querySelectorAll('[class*="piece"]');
-            }
-            if (promotionPieces.length === 0) {
-                promotionPieces = promotionDialog.querySelectorAll('img[src*="piece"]');
-            }
-            if (promotionPieces.length === 0) {
-                promotionPieces = promotionDialog.querySelectorAll('div[role="button"]');
-            }
-
-            if (promotionPieces.length === 0) {
-                return { error: 'No promotion pieces found in dialog' };
-            }
-
-            // Debug: Log all available pieces with their actual positions
-            const availablePieces = Array.from(promotionPieces).map((p, idx) => {
-                const pRect = p.getBoundingClientRect();
-                return {
-                    index: idx,
-                    dataPiece: p.getAttribute('data-piece'),
-                    rect: { x: Math.round(pRect.left), y: Math.round(pRect.top), w: Math.round(pRect.width), h: Math.round(pRect.height) }
-                };
-            });
-            console.log('[Promotion] Available pieces:', availablePieces);
-            console.log('[Promotion] Looking for:', targetPiece);
-
-            // Find the matching piece
-            for (const piece of promotionPieces) {
-                const dataPiece = piece.getAttribute('data-piece');
-
-                // ONLY match by data-piece attribute (exact match)
-                // This prevents false positives like 'H' matching "bisHop"
-                if (dataPiece === targetPiece) {
-                    // Found the target piece! Use its ACTUAL bounding rect
-                    const pieceRect = piece.getBoundingClientRect();
-
-                    console.log('[Promotion] Found target piece:', {
-                        dataPiece,
-                        rect: { x: Math.round(pieceRect.left), y: Math.round(pieceRect.top), w: Math.round(pieceRect.width), h: Math.round(pieceRect.height) }
-                    });
-
-                    // Use the piece's actual position (trust getBoundingClientRect now that we have the right dialog!)
-                    const x = Math.round(pieceRect.left + pieceRect.width / 2);
-                    const y = Math.round(pieceRect.top + pieceRect.height / 2);
-
-                    console.log('[Promotion] Will click at piece center:', { x, y });
-
-                    return {
-                        found: true,
-                        piece: targetPiece,
-                        clickMethod: 'cdp',
-                        x: x,
-                        y: y
-                    };
-                }
-            }
-
-            // Not found
-            return {
-                found: false,
-                searched: targetPiece,
-                available: availablePieces.map(p => p.dataPiece).join(', ')
-            };
-
-            // If exact match not found, return what we found for debugging
-            return {
-                found: false,
-                searched: targetPiece,
-                available: availablePieces.join(', ')
-            };
-            """
+            log.debug("[ChessCom] Handling promotion to: %s", promotion_piece.upper())
 
-            result = self.driver.execute_script(js_script, promotion_piece)
+            # Wait for the dialog, click the piece in-page and wait for the
+            # dialog to close, all in one round-trip
+            result = self.driver.execute_async_script(
+                _PROMOTE_IN_PAGE_JS, promotion_piece, self._js_debug,
+                self._promo_selector_cache, 500, 500)
 
             if result.get('found'):
-                # Use CDP to click on the promotion piece (creates trusted events)
+                self._promo_selector_cache = result.get('selector')
+                if not result.get('stillVisible'):
+                    print(f"[ChessCom] ✓ Promoted to {result['piece']} (in-page click, dialog closed)")
+                    return True
+
+                # The synthetic click was ignored: retry with trusted CDP
+                # input at the piece's centre
                 x = result['x']
                 y = result['y']
 
-                print(f"[ChessCom] Clicking promotion piece at ({x}, {y})")
-                if 'debug' in result:
-                    print(f"[ChessCom] Piece size: {result['debug']['pieceWidth']}x{result['debug']['pieceHeight']}, Container: {result['debug']['containerWidth']}x{result['debug']['containerHeight']}")
+                log.debug("[ChessCom] Clicking promotion piece at (%s, %s)", x, y)
 
                 # DEBUG: Check what element is at these coordinates
-                elem_at_coords = self.driver.execute_script(f"""
-                    const elem = document.elementFromPoint({x}, {y});
-                    if (!elem) return {{ error: 'No element at coordinates' }};
-
-                    const rect = elem.getBoundingClientRect();
-                    return {{
-                        tag: elem.tagName,
-                        class: elem.className,
-                        dataPiece: elem.getAttribute('data-piece'),
-                        rect: {{ x: rect.left, y: rect.top, w: rect.width, h: rect.height }},
-                        pointerEvents: window.getComputedStyle(elem).pointerEvents
-                    }};
-                """)
-                print(f"[ChessCom] Element at ({x}, {y}): {elem_at_coords}")
+                if self._js_debug:
+                    elem_at_coords = self.driver.execute_script(
+                        _ELEMENT_AT_POINT_JS, x, y)
+                    print(f"[ChessCom] Element at ({x}, {y}): {elem_at_coords}")
 
                 try:
-                    # Click using CDP (creates trusted mouse events)
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseMoved',
-                        'x': x,
-                        'y': y
-                    })
-                    time.sleep(0.05)
-
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mousePressed',
-                        'x': x,
-                        'y': y,
-                        'button': 'left',
-                        'clickCount': 1
-                    })
-                    time.sleep(0.05)
-
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseReleased',
-                        'x': x,
-                        'y': y,
-                        'button': 'left',
-                        'clickCount': 1
-                    })
-
-                    # Wait and verify the promotion dialog closed
-                    time.sleep(0.5)
-
-                    # Check if promotion dialog is still visible
-                    dialog_check = self.driver.execute_script("""
-                        const dialogs = document.querySelectorAll('[class*="promotion"]');
-                        for (const dialog of dialogs) {
-                            const rect = dialog.getBoundingClientRect();
-                            if (rect.width > 0 && rect.height > 0) {
-                                return { stillVisible: true };
-                            }
-                        }
-                        return { stillVisible: false };
-                    """)
-
-                    if dialog_check.get('stillVisible'):
-                        print(f"[ChessCom] ⚠ Promotion dialog still visible after click - promotion may have failed")
-                        return False
-                    else:
-                        print(f"[ChessCom] ✓ Promoted to {result['piece']} (CDP, dialog closed)")
-                        return True
+                    # Click using CDP (creates trusted mouse events).  Wait
+                    # briefly for the dialog located above to be dismissed
+                    # (a detached element counts as closed); if it is still
+                    # showing, the piece is still under (x, y), so click
+                    # once more and wait again.
+                    for attempt in range(2):
+                        self._cdp_click(x, y)
+                        dialog_check = self.driver.execute_async_script(
+                            _WAIT_PROMO_DIALOG_CLOSED_JS, 250)
+                        if not dialog_check.get('stillVisible'):
+                            print(f"[ChessCom] ✓ Promoted to {result['piece']} (CDP, dialog closed)")
+                            return True
+                        if attempt == 0:
+                            print(f"[ChessCom] ⚠ Promotion dialog still visible after click - re-clicking")
+
+                    print(f"[ChessCom] ⚠ Promotion dialog still visible after click - promotion may have failed")
+                    return False
 
                 except Exception as cdp_error:
                     print(f"[ChessCom] ✗ CDP click failed: {_short_err(cdp_error)}")
@@ -1662,6 +3881,8 @@ class ChessComInterface:
                 error_msg = f"[ChessCom] ✗ Promotion piece not found"
                 if 'available' in result:
                     error_msg += f" (searched: {result.get('searched')}, available: {result['available']})"
+                elif 'error' in result:
+                    error_msg += f" ({result['error']})"
                 print(error_msg)
                 return False
 
@@ -1681,9 +3902,9 @@ class ChessComInterface:
 
         This is the main entry point that tries multiple methods:
         1. Drop moves: make_drop_move (for piece placements)
-        2. CDP Input.dispatchMouseEvent (exact Puppeteer equivalent)
-        3. JavaScript DOM event dispatch (backup)
-        4. ActionChains (requires focus - last resort)
+        2. make_move_cdp: click-click via in-page events, then CDP
+        3. make_move_js: JavaScript DOM event dispatch (backup)
+        4. make_move_drag: CDP drag, then in-page synthetic drag (last resort)
 
         Args:
             uci_move: Move in UCI format (e.g., 'e2e4', 'd7d5', 'N@g3', 'A@e1')
@@ -1694,11 +3915,9 @@ class ChessComInterface:
         # Check if this is a drop move (contains '@')
         if '@' in uci_move:
             # Parse drop move: P@e5, N@g3, etc.
-            parts = uci_move.upper().split('@')
-            if len(parts) == 2:
-                piece_type = parts[0]
-                to_square = parts[1].lower()
-                return self.make_drop_move(piece_type, to_square)
+            piece_type, _, to_square = uci_move.partition('@')
+            if piece_type and to_square and '@' not in to_square:
+                return self.make_drop_move(piece_type.upper(), to_square.lower())
             else:
                 print(f"[ChessCom] ✗ Invalid drop move format: {uci_move}")
                 return False
@@ -1713,10 +3932,22 @@ class ChessComInterface:
             promotion_piece = parsed_move['promotion']
             # Reconstruct base move without promotion
             base_move = parsed_move['from'] + parsed_move['to']
-            print(f"[ChessCom] Promotion move detected: {base_move} → {promotion_piece.upper()}")
+            log.debug("[ChessCom] Promotion move detected: %s → %s",
+                      base_move, promotion_piece.upper())
+
+        # Square coordinates are resolved once and shared by every method
+        # below, so a fallback does not redo the work
+        coords = None
+        if parsed_move and parsed_move.get('type') == 'normal':
+            coords = self._resolve_move_coords(parsed_move['from'], parsed_move['to'])
+            if coords is None:
+                return False
+            if not (coords[0] and coords[1]):
+                # Unresolved: let each method try again on its own
+                coords = None
 
         # Regular move - try CDP first (works in background)
-        success = self.make_move_cdp(base_move)
+        success = self.make_move_cdp(base_move, parsed_move, coords)
         if success:
             # Handle promotion if needed
             if promotion_piece:
@@ -1731,7 +3962,7 @@ class ChessComInterface:
 
         # Fallback to JS events
         print("[ChessCom] Trying JS fallback...")
-        success = self.make_move_js(base_move)
+        success = self.make_move_js(base_move, parsed_move, coords)
         if success:
             # Handle promotion if needed
             if promotion_piece:
@@ -1741,33 +3972,40 @@ class ChessComInterface:
         if self._is_session_dead():
             return False
 
-        # Last resort: ActionChains (requires focus)
-        print("[ChessCom] Trying ActionChains fallback...")
-        success = self.make_move_actionchains(base_move)
+        # Last resort: drag instead of click-click
+        print("[ChessCom] Trying drag fallback...")
+        success = self.make_move_drag(base_move, parsed_move, coords)
         if success and promotion_piece:
             return self.handle_promotion(promotion_piece)
         return success
 
-    def make_move_actionchains(self, uci_move):
+    def make_move_drag(self, uci_move, parsed=None, coords=None):
         """
-        Make a move using Selenium ActionChains (requires window focus).
-        This is the fallback method when JavaScript dispatch doesn't work.
+        Make a move by dragging the piece (last-resort fallback).
+
+        A trusted CDP drag is tried first: it reuses the computed square
+        coordinates and needs neither window focus nor element lookups.
+        When the CDP dispatch itself fails, the same drag is replayed
+        in-page as synthetic pointer + mouse events (_DISPATCH_MOUSE_PATH_JS)
+        in one round-trip.  Neither needs window focus.
 
         Args:
             uci_move: Move in UCI format (e.g., 'e2e4', 'd7d5', 'g14n7')
+            parsed: Optional result of UCIHandler.parse_uci_move(uci_move),
+                    passed by make_move() to avoid re-parsing
+            coords: Optional (from_coords, to_coords) already resolved by
+                    make_move(), shared by every fallback
 
         Returns:
             bool: True if move was successful, False otherwise
         """
         try:
-            # Focus the browser window first (required for ActionChains!)
-            self.focus_browser()
-
             # Check whose turn it is
             turn = self.get_turn()
 
             # Parse UCI move properly (handles multi-digit ranks)
-            parsed = UCIHandler.parse_uci_move(uci_move)
+            if parsed is None:
+                parsed = UCIHandler.parse_uci_move(uci_move)
             if not parsed or parsed.get('type') != 'normal':
                 print(f"[ChessCom] ✗ Invalid move format: {uci_move}")
                 return False
@@ -1775,62 +4013,38 @@ class ChessComInterface:
             from_square = parsed['from']
             to_square = parsed['to']
 
-            # Detect board parameters once (cache for this move)
-            is_flipped = self.is_board_flipped()
-            board_size = self.detect_board_size()
-
-            # Get coordinates for both squares
-            from_coords = self.get_square_coordinates(from_square, is_flipped, board_size)
-            to_coords = self.get_square_coordinates(to_square, is_flipped, board_size)
+            # Board parameters come from the shared per-game cache
+            if coords is None:
+                coords = self._get_move_coords(from_square, to_square)
+            from_coords, to_coords = coords
 
             if not from_coords or not to_coords:
                 print(f"[ChessCom] Could not find board squares")
                 return False
 
+            # ── Primary: CDP native drag (works without focus) ────────────
+            path = self._drag_path(from_coords['x'], from_coords['y'],
+                                   to_coords['x'], to_coords['y'])
+            try:
+                self._cdp_drag(path)
+                dragged = True
+            except Exception as cdp_error:
+                print(f"[ChessCom] CDP drag failed ({_short_err(cdp_error)}), using JS drag")
+                dragged = False
 
-            # Use Selenium ActionChains for physical drag-and-drop
-            # This actually moves the mouse and triggers real browser events
-
-            # Method 1: Try to find square elements by position
-            # Chess.com uses divs for squares, try to get the actual elements
-            from_square_element = self.driver.execute_script(f"""
-                const fromX = {from_coords['x']};
-                const fromY = {from_coords['y']};
-                return document.elementFromPoint(fromX, fromY);
-            """)
-
-            to_square_element = self.driver.execute_script(f"""
-                const toX = {to_coords['x']};
-                const toY = {to_coords['y']};
-                return document.elementFromPoint(toX, toY);
-            """)
-
-            if from_square_element and to_square_element:
-                # Try direct drag and drop between elements
-                actions = ActionChains(self.driver)
-                actions.drag_and_drop(from_square_element, to_square_element)
-                try:
-                    actions.perform()
-                except Exception as e:
-                    # Fallback: manual click and hold sequence
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(from_square_element)
-                    actions.pause(0.1)
-                    actions.click_and_hold(from_square_element)
-                    actions.pause(0.3)
-                    actions.move_to_element(to_square_element)
-                    actions.pause(0.3)
-                    actions.release(to_square_element)
-                    actions.perform()
-            else:
-                print(f"[ChessCom] ✗ Could not find square elements")
-                return False
+            # ── Fallback: synthetic drag in one execute_async_script ──────
+            if not dragged:
+                if not self.driver.execute_async_script(_DISPATCH_MOUSE_PATH_JS, path):
+                    print(f"[ChessCom] ✗ Could not find square elements")
+                    return False
 
-            # Wait for move to register
-            time.sleep(0.5)
+            # Wait for move to register (returns as soon as the board settles)
+            # and read the turn in the same round-trip
+            _, new_turn = self._wait_for_board_settle(50, 500)
 
             # Validate: check if turn changed
-            new_turn = self.get_turn()
+            if new_turn is None:
+                new_turn = self.get_turn()
 
             if turn != 'unknown' and new_turn != 'unknown' and turn != new_turn:
                 print(f"[ChessCom] ✓ Move successful - turn changed from {turn} to {new_turn}")
@@ -1851,7 +4065,8 @@ class ChessComInterface:
                 print(f"[ChessCom] Error making move: {_short_err(e)}")
             return False
 
-    def get_pocket_piece_coordinates(self, piece_type, player_color=None):
+    def get_pocket_piece_coordinates(self, piece_type, player_color=None,
+                                     is_flipped=None):
         """
         Get the coordinates of a piece in the pocket (captured pieces in hand).
 
@@ -1859,13 +4074,15 @@ class ChessComInterface:
             piece_type: Single letter piece type (Q, R, N, B, P, U, W, F, A, C)
                        UCI: A=Archbishop, C=Chancellor (chess.com: H, E)
             player_color: 'white' or 'black', or None to auto-detect
+            is_flipped: Optional board flip state; read from the board-param
+                       cache when None
 
         Returns:
             dict: {'x': x_coord, 'y': y_coord} or None if not found
         """
         # Auto-detect player color if not provided
         if not player_color:
-            player_color = self.get_player_color()
+            player_color = self.get_player_color(use_cache=True)
 
         # Convert UCI notation to chess.com notation
         # UCI: A=Archbishop, C=Chancellor → chess.com: H, E
@@ -1875,10 +4092,11 @@ class ChessComInterface:
         }
 
         # Use chess.com notation if piece is A or C, otherwise use as-is
-        chesscom_piece = uci_to_chesscom.get(piece_type.upper(), piece_type.upper())
+        piece_upper = piece_type.upper()
+        chesscom_piece = uci_to_chesscom.get(piece_upper, piece_upper)
 
-        if piece_type.upper() != chesscom_piece:
-            print(f"[ChessCom] Converting UCI {piece_type.upper()} → chess.com {chesscom_piece}")
+        if piece_upper != chesscom_piece:
+            print(f"[ChessCom] Converting UCI {piece_upper} → chess.com {chesscom_piece}")
 
         # Map piece type to full name for Chess.com's class naming
         # NOTE: UCI uses A/C for Archbishop/Chancellor, but chess.com uses H/E
@@ -1900,134 +4118,19 @@ class ChessComInterface:
             print(f"[ChessCom] ✗ Unknown piece type: {piece_type}")
             return None
 
-        # Chess.com uses data-piece attribute (e.g., data-piece="P")
-        # and positions pieces to the LEFT of the board for pockets
-        js_script = f"""
-        const pieceType = '{chesscom_piece}';  // Use chess.com notation (H/E, not A/C)
-        const playerColor = '{player_color}';
-
-        // Step 1: Find the board position
-        const board = document.querySelector('.TheBoard-squares') ||
-                     document.querySelector('[class*="Board-squares"]') ||
-                     document.querySelector('.board');
-
-        if (!board) {{
-            return {{ error: 'Board not found' }};
-        }}
-
-        const boardRect = board.getBoundingClientRect();
-
-        // DEBUG: Find ALL pocket pieces to see what's available
-        const allPocketElements = document.querySelectorAll('[class*="pocket"] [data-piece]');
-        const debugPocketPieces = [];
-        for (const elem of allPocketElements) {{
-            const dataPiece = elem.getAttribute('data-piece');
-            const rect = elem.getBoundingClientRect();
-            if (rect.width > 0 && rect.height > 0) {{
-                debugPocketPieces.push({{
-                    dataPiece: dataPiece,
-                    className: elem.className,
-                    rect: {{ x: Math.round(rect.left), y: Math.round(rect.top), w: Math.round(rect.width), h: Math.round(rect.height) }}
-                }});
-            }}
-        }}
-        console.log('[PocketDrop] All pocket pieces found:', debugPocketPieces);
-        console.log('[PocketDrop] Searching for piece type:', pieceType);
-
-        // Step 2: Find all pieces with matching data-piece attribute
-        const allPieces = document.querySelectorAll(`[data-piece="${{pieceType}}"]`);
-
-        // Step 3: Filter to pieces LEFT of the board (pocket area)
-        // Pocket pieces are positioned to the left of the board
-        const pocketPieces = [];
-
-        for (const piece of allPieces) {{
-            const rect = piece.getBoundingClientRect();
-
-            // Check if piece is to the LEFT of the board
-            // (right edge of piece is before or near left edge of board)
-            const isLeftOfBoard = rect.right < boardRect.left + 50;
-
-            // Check if piece is near the vertical range of the board
-            const isNearBoard = rect.bottom > boardRect.top - 50 &&
-                               rect.top < boardRect.bottom + 50;
-
-            // Must have non-zero size (filters out hidden elements)
-            if (isLeftOfBoard && isNearBoard && rect.width > 0 && rect.height > 0) {{
-                pocketPieces.push({{
-                    element: piece,
-                    rect: rect,
-                    dataColor: piece.getAttribute('data-color'),
-                    dataPlayer: piece.getAttribute('data-player'),
-                    className: piece.className,
-                    position: {{
-                        top: rect.top,
-                        bottom: rect.bottom,
-                        left: rect.left,
-                        right: rect.right,
-                        centerX: rect.left + rect.width / 2,
-                        centerY: rect.top + rect.height / 2
-                    }}
-                }});
-            }}
-        }}
-
-        if (pocketPieces.length === 0) {{
-            return {{ error: 'No pocket pieces found', searched: pieceType }};
-        }}
-
-        // Step 4: Select the correct pocket based on player color AND board orientation
-        // - NORMAL orientation (rank 8 at top): Black pocket at TOP, White pocket at BOTTOM
-        // - FLIPPED orientation (rank 1 at top): Black pocket at BOTTOM, White pocket at TOP
-
-        const isFlipped = {str(self.is_board_flipped()).lower()};
-
-        let selectedPiece = null;
-        let selectTopPocket = false;
-
-        if (playerColor === 'black') {{
-            // Black in normal orientation → top pocket
-            // Black in flipped orientation → bottom pocket
-            selectTopPocket = !isFlipped;
-        }} else if (playerColor === 'white') {{
-            // White in normal orientation → bottom pocket
-            // White in flipped orientation → top pocket
-            selectTopPocket = isFlipped;
-        }} else {{
-            // Unknown - try bottom pocket
-            selectTopPocket = false;
-        }}
-
-        if (selectTopPocket) {{
-            // Select piece closest to TOP of screen
-            pocketPieces.sort((a, b) => a.position.centerY - b.position.centerY);
-            selectedPiece = pocketPieces[0];
-        }} else {{
-            // Select piece closest to BOTTOM of screen
-            pocketPieces.sort((a, b) => b.position.centerY - a.position.centerY);
-            selectedPiece = pocketPieces[0];
-        }}
-
-        if (selectedPiece) {{
-            return {{
-                x: selectedPiece.position.centerX,
-                y: selectedPiece.position.centerY,
-                dataColor: selectedPiece.dataColor,
-                className: selectedPiece.className,
-                found: true
-            }};
-        }}
-
-        return {{ error: 'Could not select pocket piece' }};
-        """
+        # Orientation is stable for the whole game; reuse the cached value
+        if is_flipped is None:
+            is_flipped = self._get_cached_board_params()[0]
 
         try:
-            result = self.driver.execute_script(js_script)
+            result = self.driver.execute_script(
+                _POCKET_PIECE_COORDS_JS, chesscom_piece, player_color,
+                bool(is_flipped), self._js_debug)
 
             if result and result.get('found'):
                 return {'x': result['x'], 'y': result['y']}
             else:
-                print(f"[ChessCom] ✗ Could not find {piece_type.upper()} in pocket: {result.get('error', 'Unknown')}")
+                print(f"[ChessCom] ✗ Could not find {piece_upper} in pocket: {result.get('error', 'Unknown')}")
                 return None
 
         except Exception as e:
@@ -2049,76 +4152,73 @@ class ChessComInterface:
         """
         try:
             # Get player color
-            player_color = self.get_player_color(verbose=False)
+            player_color = self.get_player_color(verbose=False, use_cache=True)
             if player_color == 'unknown':
                 print(f"[ChessCom] ✗ Cannot determine player color")
                 return False
 
+            # Board parameters come from the shared per-game cache, read
+            # once here for both the pocket lookup and the destination
+            is_flipped, board_size, _ = self._get_cached_board_params()
+
             # Get coordinates of pocket piece
-            from_coords = self.get_pocket_piece_coordinates(piece_type, player_color)
+            from_coords = self.get_pocket_piece_coordinates(
+                piece_type, player_color, is_flipped)
             if not from_coords:
                 print(f"[ChessCom] ✗ Could not find {piece_type} in pocket")
+                # The cached colour may be stale; re-detect on the next drop
+                self._player_color_cache = None
                 return False
 
-            # Detect board parameters once (cache for this move)
-            is_flipped = self.is_board_flipped()
-            board_size = self.detect_board_size()
-
             # Get coordinates of destination square
-            to_coords = self.get_square_coordinates(to_square, is_flipped, board_size)
+            centre = self._centres.get(to_square.lower()) if self._centres else None
+            if centre:
+                to_coords = {'x': centre[0], 'y': centre[1]}
+            else:
+                to_coords = self.get_square_coordinates(to_square, is_flipped, board_size)
             if not to_coords:
                 print(f"[ChessCom] ✗ Could not find destination square {to_square}")
                 return False
 
-            # Execute drop using CDP (same as regular moves)
-            try:
-                # Move to pocket piece position
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved',
-                    'x': from_coords['x'],
-                    'y': from_coords['y']
-                })
-                time.sleep(0.01)
+            fx, fy = from_coords['x'], from_coords['y']
+            tx, ty = to_coords['x'],   to_coords['y']
 
-                # Mouse down on pocket piece
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed',
-                    'x': from_coords['x'],
-                    'y': from_coords['y'],
-                    'button': 'left',
-                    'clickCount': 1
-                })
-                time.sleep(0.02)
-
-                # Drag to destination square with steps
-                steps = 3
-                for i in range(1, steps + 1):
-                    x = from_coords['x'] + (to_coords['x'] - from_coords['x']) * i / steps
-                    y = from_coords['y'] + (to_coords['y'] - from_coords['y']) * i / steps
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseMoved',
-                        'x': x,
-                        'y': y,
-                        'button': 'left'
-                    })
-
-                # Mouse up at destination
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased',
-                    'x': to_coords['x'],
-                    'y': to_coords['y'],
-                    'button': 'left',
-                    'clickCount': 1
-                })
+            path = self._drag_path(fx, fy, tx, ty)
 
-                # Wait for move to process
-                time.sleep(0.05)
-                return True
+            # ── Primary: whole drag in one execute_async_script ───────────
+            # Six separate execute_cdp_cmd calls plus the Python sleeps
+            # between them cost one HTTP round-trip each; replaying the path
+            # in-page costs a single round-trip.
+            js_ok = False
+            try:
+                js_ok = self.driver.execute_async_script(
+                    _DISPATCH_MOUSE_PATH_JS, path) or False
+            except Exception:
+                pass
 
+            if js_ok:
+                # Let chess.com process the drop before returning.  The
+                # synthetic events are untrusted and may be ignored; if the
+                # board did not change, replay the drag with trusted input.
+                mutated, _ = self._wait_for_board_settle(30, 150)
+                if mutated:
+                    return True
+                log.debug("[ChessCom] Synthetic drop left the board unchanged, "
+                          "retrying via CDP")
+
+            # ── Fallback: CDP native input (one round-trip per event) ─────
+            try:
+                self._cdp_drag(path)
             except Exception as cdp_error:
                 print(f"[ChessCom] ✗ CDP error during drop: {_short_err(cdp_error)}")
                 return False
 
+            # Wait for move to process
+            mutated, _ = self._wait_for_board_settle(30, 150)
+            if not mutated:
+                print(f"[ChessCom] ✗ Drop {piece_type}@{to_square} did not change the board")
+            return mutated
+
         except Exception as e:
             err_str = str(e).lower()
             if any(kw in err_str for kw in _SESSION_DEATH_KEYWORDS):
@@ -2137,157 +4237,18 @@ class ChessComInterface:
         print("[ChessCom] Attempting to resign...")
 
         try:
-            js_script = """
-            // Find resign button - try multiple selectors
-            const resignSelectors = [
-                'button[aria-label*="Resign"]',
-                'button:has-text("Resign")',
-                '[class*="resign"]',
-                'button[data-cy="resign"]',
-                '[data-test-element="resign"]'
-            ];
-
-            // Try to find resign button
-            let resignButton = null;
-
-            // Method 1: Look for buttons with "resign" text
-            const allButtons = document.querySelectorAll('button');
-            for (const button of allButtons) {
-                const text = button.textContent?.toLowerCase() || '';
-                const ariaLabel = button.getAttribute('aria-label')?.toLowerCase() || '';
-
-                if (text.includes('resign') || ariaLabel.includes('resign')) {
-                    const rect = button.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {
-                        resignButton = button;
-                        break;
-                    }
-                }
-            }
-
-            // Method 2: Look in game menu/options
-            if (!resignButton) {
-                // Try to find and open game menu first
-                const menuButtons = document.querySelectorAll('button[aria-label*="Menu"], button[aria-label*="menu"], [class*="menu-button"]');
-                for (const menuBtn of menuButtons) {
-                    const rect = menuBtn.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {
-                        menuBtn.click();
-                        break;
-                    }
-                }
-
-                // Wait a bit for menu to open
-                return { needsMenu: true };
-            }
+            # Find, click and confirm in one round-trip; each in-page wait
+            # (menu opening, confirmation dialog) is capped at 500 ms
+            result = self.driver.execute_async_script(_RESIGN_IN_PAGE_JS, 500)
 
-            if (!resignButton) {
-                return { error: 'Resign button not found' };
-            }
-
-            // Get button coordinates for CDP click
-            const rect = resignButton.getBoundingClientRect();
-            return {
-                found: true,
-                x: rect.left + rect.width / 2,
-                y: rect.top + rect.height / 2
-            };
-            """
-
-            result = self.driver.execute_script(js_script)
-
-            if result.get('needsMenu'):
-                # Menu was opened, wait and try again
-                time.sleep(0.5)
-                result = self.driver.execute_script(js_script)
-
-            if result.get('found'):
-                x = result['x']
-                y = result['y']
-
-                print(f"[ChessCom] Clicking resign button at ({x}, {y})")
-
-                # Click using CDP
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved',
-                    'x': x,
-                    'y': y
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
-
-                # Wait for confirmation dialog
-                time.sleep(0.5)
-
-                # Look for confirmation button
-                confirm_script = """
-                const confirmButtons = document.querySelectorAll('button');
-                for (const button of confirmButtons) {
-                    const text = button.textContent?.toLowerCase() || '';
-                    if (text.includes('resign') || text.includes('confirm') || text.includes('yes')) {
-                        const rect = button.getBoundingClientRect();
-                        if (rect.width > 0 && rect.height > 0) {
-                            return {
-                                found: true,
-                                x: rect.left + rect.width / 2,
-                                y: rect.top + rect.height / 2
-                            };
-                        }
-                    }
-                }
-                return { found: false };
-                """
-
-                confirm_result = self.driver.execute_script(confirm_script)
-
-                if confirm_result.get('found'):
-                    # Click confirmation button
-                    x = confirm_result['x']
-                    y = confirm_result['y']
-
-                    print(f"[ChessCom] Confirming resignation at ({x}, {y})")
-
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseMoved',
-                        'x': x,
-                        'y': y
-                    })
-                    time.sleep(0.05)
-
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mousePressed',
-                        'x': x,
-                        'y': y,
-                        'button': 'left',
-                        'clickCount': 1
-                    })
-                    time.sleep(0.05)
-
-                    self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                        'type': 'mouseReleased',
-                        'x': x,
-                        'y': y,
-                        'button': 'left',
-                        'clickCount': 1
-                    })
+            if result.get('resignClicked'):
+                print(f"[ChessCom] Clicked resign button at ({result['x']:.0f}, {result['y']:.0f})")
+                if result.get('confirmClicked'):
+                    print(f"[ChessCom] Confirmed resignation at "
+                          f"({result['confirmX']:.0f}, {result['confirmY']:.0f})")
 
                 print("[ChessCom] ✓ Resignation successful")
+                self._player_color_cache = None
                 return True
             else:
                 print(f"[ChessCom] ✗ {result.get('error', 'Could not find resign button')}")
@@ -2309,85 +4270,17 @@ class ChessComInterface:
         print("[ChessCom] Attempting to click Rematch button...")
 
         try:
-            js_script = """
-            const SIDEBAR_RIGHT = arguments[0];
-            // Find rematch button - appears after game ends
-            const rematchSelectors = [
-                'button[aria-label*="Rematch"]',
-                'button[aria-label*="rematch"]',
-                '[class*="rematch"]',
-                'button[data-cy="rematch"]'
-            ];
-
-            let rematchButton = null;
-
-            // Look for buttons with "rematch" text (not "play again")
-            const allButtons = document.querySelectorAll('button, a');
-            for (const button of allButtons) {
-                const text = button.textContent?.toLowerCase() || '';
-                const ariaLabel = button.getAttribute('aria-label')?.toLowerCase() || '';
-
-                if (text.includes('rematch') || ariaLabel.includes('rematch')) {
-                    const rect = button.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0 && rect.left > SIDEBAR_RIGHT) {
-                        rematchButton = button;
-                        break;
-                    }
-                }
-            }
-
-            if (!rematchButton) {
-                return { error: 'Rematch button not found - game may not be over yet' };
-            }
+            result = self._call_helper(
+                'clickActionButton', 'rematch', self._get_sidebar_right())
 
-            // Get button coordinates for CDP click
-            const rect = rematchButton.getBoundingClientRect();
-            return {
-                found: true,
-                x: rect.left + rect.width / 2,
-                y: rect.top + rect.height / 2,
-                text: rematchButton.textContent
-            };
-            """
-
-            result = self.driver.execute_script(js_script, self._get_sidebar_right())
-
-            if result.get('found'):
-                x = result['x']
-                y = result['y']
-
-                print(f"[ChessCom] Clicking Rematch button at ({x}, {y})")
-
-                # Click using CDP
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved',
-                    'x': x,
-                    'y': y
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
+            if result.get('clicked'):
+                print(f"[ChessCom] Clicked Rematch button at ({result['x']}, {result['y']})")
 
-                time.sleep(0.5)
+                self._wait_for_click_effect(500)
                 print("[ChessCom] ✓ Rematch button clicked")
                 return True
             else:
-                print(f"[ChessCom] ✗ {result.get('error', 'Could not find Rematch button')}")
+                print(f"[ChessCom] ✗ {result.get('error', 'Rematch button not found - game may not be over yet')}")
                 print("[ChessCom] Hint: Make sure the game has ended")
                 return False
 
@@ -2406,94 +4299,17 @@ class ChessComInterface:
         print("[ChessCom] Attempting to click Play Again button...")
 
         try:
-            js_script = """
-            const SIDEBAR_RIGHT = arguments[0];
-            // Find play again button - appears after game ends
-            const playAgainSelectors = [
-                'button[aria-label*="Play"]',
-                'button[aria-label*="play"]',
-                '[class*="play-again"]',
-                'button[data-cy="play-again"]'
-            ];
-
-            let playAgainButton = null;
-
-            // Look for buttons with "play again" or "play" text (not "rematch")
-            // Note: Button may be shortened to just "Play"
-            // Important: Ignore buttons in the left sidebar
-            const allButtons = document.querySelectorAll('button, a');
-            for (const button of allButtons) {
-                const text = button.textContent?.toLowerCase() || '';
-                const ariaLabel = button.getAttribute('aria-label')?.toLowerCase() || '';
-
-                // Check for "play again" or standalone "play" (but not "rematch")
-                const hasPlayAgain = text.includes('play again') || ariaLabel.includes('play again');
-                const hasPlay = (text.trim() === 'play' || text.includes('play')) && !text.includes('rematch');
-
-                if (hasPlayAgain || hasPlay) {
-                    const rect = button.getBoundingClientRect();
-
-                    // Ignore buttons in the left sidebar
-                    // We want the Play button in the main game area
-                    if (rect.width > 0 && rect.height > 0 && rect.left > SIDEBAR_RIGHT) {
-                        playAgainButton = button;
-                        break;
-                    }
-                }
-            }
-
-            if (!playAgainButton) {
-                return { error: 'Play Again button not found - game may not be over yet' };
-            }
-
-            // Get button coordinates for CDP click
-            const rect = playAgainButton.getBoundingClientRect();
-            return {
-                found: true,
-                x: rect.left + rect.width / 2,
-                y: rect.top + rect.height / 2,
-                text: playAgainButton.textContent
-            };
-            """
-
-            result = self.driver.execute_script(js_script, self._get_sidebar_right())
-
-            if result.get('found'):
-                x = result['x']
-                y = result['y']
-
-                print(f"[ChessCom] Clicking Play Again button at ({x}, {y})")
+            result = self._call_helper(
+                'clickActionButton', 'playAgain', self._get_sidebar_right())
 
-                # Click using CDP
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved',
-                    'x': x,
-                    'y': y
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
-                time.sleep(0.05)
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
+            if result.get('clicked'):
+                print(f"[ChessCom] Clicked Play Again button at ({result['x']}, {result['y']})")
 
-                time.sleep(0.5)
+                self._wait_for_click_effect(500)
                 print("[ChessCom] ✓ Play Again button clicked")
                 return True
             else:
-                print(f"[ChessCom] ✗ {result.get('error', 'Could not find Play Again button')}")
+                print(f"[ChessCom] ✗ {result.get('error', 'Play Again button not found - game may not be over yet')}")
                 print("[ChessCom] Hint: Make sure the game has ended")
                 return False
 
@@ -2506,146 +4322,36 @@ class ChessComInterface:
         """
         Exit to the lobby after a game by clicking the Exit button.
 
-        Returns:
-            bool: True if exit was successful, False otherwise
-        """
-        print("[ChessCom] Attempting to click Exit button...")
-
-        try:
-            js_script = """
-            const SIDEBAR_RIGHT = arguments[0];
-            // Find exit button - appears after game ends
-            const exitSelectors = [
-                'button[aria-label*="Exit"]',
-                'button[aria-label*="exit"]',
-                '[class*="exit"]',
-                'button[data-cy="exit"]'
-            ];
-
-            let exitButton = null;
-
-            // Look for buttons with "exit" text
-            // Ignore buttons in the left sidebar
-            const allButtons = document.querySelectorAll('button, a');
-            for (const button of allButtons) {
-                const text = button.textContent?.toLowerCase() || '';
-                const ariaLabel = button.getAttribute('aria-label')?.toLowerCase() || '';
-
-                if (text.includes('exit') || ariaLabel.includes('exit')) {
-                    const rect = button.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0 && rect.left > SIDEBAR_RIGHT) {
-                        exitButton = button;
-                        break;
-                    }
-                }
-            }
-
-            if (!exitButton) {
-                return { error: 'Exit button not found - game may not be over yet' };
-            }
-
-            // Get button coordinates for CDP click
-            const rect = exitButton.getBoundingClientRect();
-            return {
-                found: true,
-                x: rect.left + rect.width / 2,
-                y: rect.top + rect.height / 2,
-                text: exitButton.textContent
-            };
-            """
-
-            result = self.driver.execute_script(js_script, self._get_sidebar_right())
-
-            if result.get('found'):
-                x = result['x']
-                y = result['y']
-
-                print(f"[ChessCom] Clicking Exit button at ({x}, {y})")
-
-                # Click using CDP
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved',
-                    'x': x,
-                    'y': y
-                })
-                time.sleep(0.05)
+        Returns:
+            bool: True if exit was successful, False otherwise
+        """
+        print("[ChessCom] Attempting to click Exit button...")
 
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
-                time.sleep(0.05)
+        try:
+            result = self._call_helper(
+                'clickActionButton', 'exit', self._get_sidebar_right())
 
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased',
-                    'x': x,
-                    'y': y,
-                    'button': 'left',
-                    'clickCount': 1
-                })
+            if result.get('clicked'):
+                print(f"[ChessCom] Clicked Exit button at ({result['x']}, {result['y']})")
 
-                time.sleep(0.5)
+                self._wait_for_click_effect(500)
                 print("[ChessCom] ✓ Exit button clicked")
 
-                # --- Click the Lobby tab ---
+                # --- Click the Lobby tab (found and clicked in one call) ---
                 # Exclude the left sidebar to avoid clicking a nav link.
-                lobby_result = self.driver.execute_script("""
-                    const SIDEBAR_RIGHT = arguments[0];
-                    function findTabByLabel(label) {
-                        const re = new RegExp('^' + label + '$', 'i');
-                        const walker = document.createTreeWalker(
-                            document.body, NodeFilter.SHOW_TEXT, null
-                        );
-                        let node;
-                        while ((node = walker.nextNode())) {
-                            if (re.test(node.nodeValue.trim())) {
-                                let el = node.parentElement;
-                                while (el && el !== document.body) {
-                                    const rect = el.getBoundingClientRect();
-                                    if (rect.width > 0 && rect.height > 0 && rect.left > SIDEBAR_RIGHT) {
-                                        return {
-                                            found: true,
-                                            x: rect.left + rect.width / 2,
-                                            y: rect.top + rect.height / 2
-                                        };
-                                    }
-                                    el = el.parentElement;
-                                }
-                            }
-                        }
-                        return { found: false };
-                    }
-                    return findTabByLabel('Lobby');
-                """, self._get_sidebar_right())
+                lobby_result = self._call_helper(
+                    'clickTabByLabel', 'Lobby', self._get_sidebar_right())
 
-                if not lobby_result.get('found'):
+                if not lobby_result.get('clicked'):
                     print("[ChessCom] ✗ Lobby tab not found after exit")
                     return False
 
-                lx, ly = lobby_result['x'], lobby_result['y']
-                print(f"[ChessCom] Clicking Lobby tab at ({lx}, {ly})")
-
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved', 'x': lx, 'y': ly
-                })
-                time.sleep(0.05)
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed', 'x': lx, 'y': ly,
-                    'button': 'left', 'clickCount': 1
-                })
-                time.sleep(0.05)
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased', 'x': lx, 'y': ly,
-                    'button': 'left', 'clickCount': 1
-                })
-                time.sleep(0.3)
+                print(f"[ChessCom] Clicked Lobby tab at ({lobby_result['x']}, {lobby_result['y']})")
+                self._wait_for_click_effect(300)
                 print("[ChessCom] ✓ Lobby tab clicked, returning to lobby")
                 return True
             else:
-                print(f"[ChessCom] ✗ {result.get('error', 'Could not find Exit button')}")
+                print(f"[ChessCom] ✗ {result.get('error', 'Exit button not found - game may not be over yet')}")
                 print("[ChessCom] Hint: Make sure the game has ended or you're on the post-game screen")
                 return False
 
@@ -2736,19 +4442,7 @@ class ChessComInterface:
 
             x, y = lobby_result['x'], lobby_result['y']
             print(f"[ChessCom] Clicking Lobby tab at ({x:.0f}, {y:.0f})")
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseMoved', 'x': x, 'y': y
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mousePressed', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseReleased', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
+            self._cdp_click(x, y)
             time.sleep(0.2)
 
             # --- Step 2: Click the Play / Home tab (leftmost in the bar) ---
@@ -2787,19 +4481,7 @@ class ChessComInterface:
 
             x, y = play_result['x'], play_result['y']
             print(f"[ChessCom] Clicking Play/Home tab at ({x:.0f}, {y:.0f})")
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseMoved', 'x': x, 'y': y
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mousePressed', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseReleased', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
+            self._cdp_click(x, y)
             time.sleep(0.2)
 
             if abort_check and abort_check():
@@ -2911,29 +4593,7 @@ class ChessComInterface:
                 variant_name.strip().lower(),
                 variant_name.strip().lower()
             )
-            card = self.driver.execute_script(f"""
-                const target = {repr(target_lower)};
-
-                for (const el of document.querySelectorAll('*')) {{
-                    // Read only the direct text nodes of this element (not descendants)
-                    // so we match the card title, not the full card text block.
-                    let ownText = '';
-                    for (const node of el.childNodes) {{
-                        if (node.nodeType === Node.TEXT_NODE)
-                            ownText += node.textContent;
-                    }}
-                    if (ownText.trim().toLowerCase() !== target) continue;
-
-                    // Click the title element itself — it sits on the right side of
-                    // the card, away from the icon on the left.
-                    const r = el.getBoundingClientRect();
-                    if (r.width === 0 || r.height === 0) continue;
-
-                    return {{x: r.left + r.width / 2, y: r.top + r.height / 2,
-                             text: ownText.trim()}};
-                }}
-                return null;
-            """)
+            card = self.driver.execute_script(_VARIANT_CARD_JS, target_lower)
 
             if card:
                 cx, cy = card['x'], card['y']
@@ -3028,19 +4688,7 @@ class ChessComInterface:
 
             lx, ly = lobby_result2['x'], lobby_result2['y']
             print(f"[ChessCom] Clicking Lobby tab at ({lx:.0f}, {ly:.0f})")
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseMoved', 'x': lx, 'y': ly
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mousePressed', 'x': lx, 'y': ly,
-                'button': 'left', 'clickCount': 1
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseReleased', 'x': lx, 'y': ly,
-                'button': 'left', 'clickCount': 1
-            })
+            self._cdp_click(lx, ly)
             time.sleep(0.3)
 
             print(f"[ChessCom] ✓ Challenge placed for {variant_name}")
@@ -3087,19 +4735,7 @@ class ChessComInterface:
 
             x, y, label = result['x'], result['y'], result['text']
             print(f"[ChessCom] Clicking '{label}' button at ({x:.0f}, {y:.0f})")
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseMoved', 'x': x, 'y': y
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mousePressed', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
-            time.sleep(0.05)
-            self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                'type': 'mouseReleased', 'x': x, 'y': y,
-                'button': 'left', 'clickCount': 1
-            })
+            self._cdp_click(x, y)
             time.sleep(0.3)
             print(f"[ChessCom] ✓ '{label}' button clicked")
             return True
@@ -3131,71 +4767,7 @@ class ChessComInterface:
             }
         """
         try:
-            js_script = """
-            const result = {
-                started: false,
-                game_number: null,
-                method: null
-            };
-
-            // Method 1: Check for "Game #X started" in chat
-            const chatMessages = document.querySelectorAll('[class*="chat"], [class*="message"]');
-            for (const msg of chatMessages) {
-                const text = msg.textContent || '';
-                const match = text.match(/Game #(\\d+) started/i);
-                if (match) {
-                    result.started = true;
-                    result.game_number = match[1];
-                    result.method = 'chat_message';
-                    return result;
-                }
-            }
-
-            // Method 2: Check for blue notification pop-ups (game starting notifications)
-            const notifications = document.querySelectorAll('[class*="notification"], [class*="alert"], [class*="toast"]');
-            for (const notif of notifications) {
-                const text = (notif.textContent || '').toLowerCase();
-                if (text.includes('game has begun') ||
-                    text.includes('game is starting') ||
-                    text.includes('your game')) {
-                    const rect = notif.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {
-                        result.started = true;
-                        result.method = 'notification_popup';
-                        return result;
-                    }
-                }
-            }
-
-            // Method 3: Check if username is in player boxes and game is active
-            const playerBoxes = document.querySelectorAll('[class*="player"], [class*="user"]');
-            let usernameFound = false;
-
-            for (const box of playerBoxes) {
-                const text = (box.textContent || '').trim();
-                if (text.length > 0 && text.length < 50) {
-                    // Check if this looks like an active game (timer present, etc.)
-                    const parent = box.closest('[class*="player-component"], [class*="player-panel"]');
-                    if (parent) {
-                        const hasTimer = parent.querySelector('[class*="clock"], [class*="timer"]');
-                        if (hasTimer) {
-                            usernameFound = true;
-                            break;
-                        }
-                    }
-                }
-            }
-
-            if (usernameFound) {
-                result.started = true;
-                result.method = 'player_boxes';
-            }
-
-            return result;
-            """
-
-            result = self.driver.execute_script(js_script)
-            return result
+            return self._call_helper('detectGameStarted')
 
         except Exception as e:
             print(f"[ChessCom] Error detecting game start: {_short_err(e)}")
@@ -3209,73 +4781,19 @@ class ChessComInterface:
         The observer sets a JS global flag, which Python polls via execute_script.
         (console.log-based approach doesn't work when attaching to existing browser)
         """
-        js_script = """
-        // Clean up any existing observer
-        if (window.__moveObserver) {
-            window.__moveObserver.disconnect();
-            delete window.__moveObserver;
-        }
-
-        // Initialize the flag
-        window.__boardChanged = false;
-
-        // Create the observer.
-        // NO debounce timer: MutationObserver callbacks fire synchronously
-        // with DOM mutations and are NOT subject to Chrome's timer throttling
-        // (IntensiveWakeUpThrottling, background-tab setTimeout slowdown, etc).
-        // A setTimeout debounce inside the callback IS throttled, adding a
-        // guaranteed ≥50 ms floor to every move detection in background tabs.
-        // The moves table fires one clean mutation per move (a new cell is
-        // appended), so batching is unnecessary.
-        const observer = new MutationObserver(() => {
-            window.__boardChanged = true;
-        });
-
-        // Watch only the moves table - this fires exactly once per move played.
-        // NOTE: Variants server uses .moves-table, NOT .move-list
-        // Observing the board element (even childList only) fires on every piece
-        // animation (elements added/removed during movement), so we avoid it.
-        const moveTable = document.querySelector('.moves-table');
-        const movesContainer = document.querySelector('[class*="moves"]');
-
-        let observerActive = false;
-
-        if (moveTable) {
-            observer.observe(moveTable, {
-                childList: true,
-                subtree: true
-            });
-            observerActive = true;
-        }
-
-        if (movesContainer && movesContainer !== moveTable) {
-            observer.observe(movesContainer, {
-                childList: true,
-                subtree: true
-            });
-            observerActive = true;
-        }
-
-        if (observerActive) {
-            window.__moveObserver = observer;
-            return true;
-        } else {
-            return false;
-        }
-        """
-
         try:
-            result = self.driver.execute_script(js_script)
-            return result
+            return self._call_helper('setupMoveObserver')
         except Exception as e:
             print(f"[ChessCom] Error setting up move observer: {_short_err(e)}")
             return False
 
     def reset_game_over_observer(self):
         """Reset the game over observer flags so the next game is detected."""
+        self._last_game_over = None
         try:
             self.driver.execute_script(
-                "window.__gameOver = false; window.__gameOverLogged = false; window.__gameOverResult = null;"
+                "window.__gameOver = false; window.__gameOverLogged = false; "
+                "window.__gameOverResult = null; window.__gameOverInfo = null;"
             )
         except:
             pass
@@ -3288,95 +4806,9 @@ class ChessComInterface:
         The observer logs to console when a dialog appears.
         Python listens to browser console logs (no polling of DOM!).
         """
-        js_script = """
-        // Clean up any existing observer
-        if (window.__gameOverObserver) {
-            window.__gameOverObserver.disconnect();
-            delete window.__gameOverObserver;
-        }
-
-        // Initialize flags (both exposed on window so Python can reset them)
-        window.__gameOver = false;
-        window.__gameOverLogged = false;
-        window.__gameOverResult = null;
-
-        function extractResultText(text) {
-            if (text.match(/black won/i))           return 'Black Won';
-            if (text.match(/white won/i))           return 'White Won';
-            if (text.match(/you won/i))             return 'You Won';
-            if (text.match(/you lost/i))            return 'You Lost';
-            if (text.match(/you drew/i))            return 'Draw';
-            if (text.match(/draw by agreement/i))   return 'Draw (By Agreement)';
-            if (text.match(/stalemate/i))           return 'Stalemate';
-            if (text.match(/checkmate/i))           return 'Checkmate';
-            if (text.match(/draw/i))                return 'Draw';
-            if (text.match(/time.*out|flagged/i))   return 'Timeout';
-            if (text.match(/resign/i))              return 'Resigned';
-            if (text.match(/abandon/i))             return 'Abandoned';
-            return 'Game Over';
-        }
-
-        // Create the observer
-        const observer = new MutationObserver((mutations) => {
-            // Only check if we haven't already logged
-            if (window.__gameOverLogged) return;
-
-            // Check if any game over dialog has appeared.
-            // Use a broad set of class selectors since variants.chess.com may
-            // use class names unlike the standard chess.com modal/dialog names.
-            const GAME_OVER_RE = /black won|white won|you won|you lost|you drew|draw by agreement|draw|checkmate|stalemate|time.*out|flagged|resign|abandon/i;
-
-            const selectors =
-                '[class*="modal"], [class*="dialog"], [class*="popup"], ' +
-                '[class*="game-over"], [class*="result"], [class*="challenge"], ' +
-                '[class*="win"], [class*="victory"], [class*="defeat"], [class*="end"]';
-
-            for (const dialog of document.querySelectorAll(selectors)) {
-                const rect = dialog.getBoundingClientRect();
-                if (rect.width > 0 && rect.height > 0) {
-                    const text = dialog.textContent || '';
-                    if (GAME_OVER_RE.test(text)) {
-                        window.__gameOver = true;
-                        window.__gameOverLogged = true;
-                        window.__gameOverResult = extractResultText(text);
-                        return;
-                    }
-                }
-            }
-
-            // Fallback: scan visible, large-enough divs whose inline style
-            // indicates overlay/modal positioning (position:fixed or z-index).
-            for (const el of document.querySelectorAll(
-                    '[style*="position: fixed"], [style*="position:fixed"], [style*="z-index"]')) {
-                const rect = el.getBoundingClientRect();
-                if (rect.width > 150 && rect.height > 80) {
-                    const text = el.textContent || '';
-                    if (GAME_OVER_RE.test(text)) {
-                        window.__gameOver = true;
-                        window.__gameOverLogged = true;
-                        window.__gameOverResult = extractResultText(text);
-                        return;
-                    }
-                }
-            }
-        });
-
-        // Watch the entire document body for changes
-        // This catches any new dialogs being added
-        observer.observe(document.body, {
-            childList: true,
-            subtree: true,
-            attributes: true,
-            attributeFilter: ['class', 'style']  // Watch for dialogs becoming visible
-        });
-
-        window.__gameOverObserver = observer;
-        return true;
-        """
-
+        self._last_game_over = None
         try:
-            self.driver.execute_script(js_script)
-            return True
+            return bool(self._call_helper('setupGameOverObserver'))
         except Exception as e:
             print(f"[ChessCom] Error setting up game over observer: {_short_err(e)}")
             return False
@@ -3385,6 +4817,10 @@ class ChessComInterface:
         """
         Detect if the game has ended by looking for the result dialog.
 
+        Answers from the payload delivered with the observer's game-over
+        flag (see poll_observer_flags) when there is one; otherwise scans
+        the page.
+
         Returns:
             dict: {
                 'game_over': bool,
@@ -3392,79 +4828,11 @@ class ChessComInterface:
                 'dialog_found': bool
             }
         """
-        try:
-            js_script = """
-            const result = {
-                game_over: false,
-                result: null,
-                dialog_found: false,
-                dialog_coords: null
-            };
-
-            // If the MutationObserver already detected and cached the result, use it
-            if (window.__gameOverResult) {
-                result.game_over = true;
-                result.dialog_found = true;
-                result.result = window.__gameOverResult;
-                // Still find dialog coords for dismissal
-            }
-
-            const GAME_OVER_RE = /black won|white won|you won|you lost|you drew|draw by agreement|draw|checkmate|stalemate|time.*out|flagged|resign|abandon/i;
-
-            function extractResult(text) {
-                if (text.match(/black won/i))           return 'Black Won';
-                if (text.match(/white won/i))           return 'White Won';
-                if (text.match(/you won/i))             return 'You Won';
-                if (text.match(/you lost/i))            return 'You Lost';
-                if (text.match(/you drew/i))            return 'Draw';
-                if (text.match(/draw by agreement/i))   return 'Draw (By Agreement)';
-                if (text.match(/stalemate/i))           return 'Stalemate';
-                if (text.match(/checkmate/i))           return 'Checkmate';
-                if (text.match(/draw/i))                return 'Draw';
-                if (text.match(/time.*out|flagged/i))   return 'Timeout';
-                if (text.match(/resign/i))              return 'Resigned';
-                if (text.match(/abandon/i))             return 'Abandoned';
-                return 'Game Over';
-            }
-
-            function checkElement(el) {
-                const rect = el.getBoundingClientRect();
-                if (rect.width <= 0 || rect.height <= 0) return false;
-                const text = el.textContent || '';
-                if (!GAME_OVER_RE.test(text)) return false;
-                result.game_over = true;
-                result.dialog_found = true;
-                // Prefer the observer-cached result; fall back to re-extracting
-                if (!result.result) result.result = extractResult(text);
-                result.dialog_coords = {
-                    left: rect.left, top: rect.top,
-                    right: rect.right, bottom: rect.bottom,
-                    width: rect.width, height: rect.height
-                };
-                return true;
-            }
-
-            // Primary sweep: broad set of class-name patterns
-            const selectors =
-                '[class*="modal"], [class*="dialog"], [class*="popup"], ' +
-                '[class*="game-over"], [class*="result"], [class*="challenge"], ' +
-                '[class*="win"], [class*="victory"], [class*="defeat"], [class*="end"]';
-            for (const el of document.querySelectorAll(selectors)) {
-                if (checkElement(el)) return result;
-            }
-
-            // Fallback: inline-styled overlay/modal elements
-            for (const el of document.querySelectorAll(
-                    '[style*="position: fixed"], [style*="position:fixed"], [style*="z-index"]')) {
-                const rect = el.getBoundingClientRect();
-                if (rect.width > 150 && rect.height > 80 && checkElement(el)) return result;
-            }
+        if self._last_game_over:
+            return self._last_game_over
 
-            return result;
-            """
-
-            result = self.driver.execute_script(js_script)
-            return result
+        try:
+            return self._call_helper_cdp('detectGameOver')
 
         except Exception as e:
             print(f"[ChessCom] Error detecting game over: {_short_err(e)}")
@@ -3476,7 +4844,7 @@ class ChessComInterface:
 
         Attempts dismissal in this order:
           1. Escape key press (works for most modal overlays)
-          2. CDP mouse click on a close/X button found via JS
+          2. Mouse click on a close/X button found via JS
           3. Backdrop click (left of the dialog)
 
         Returns:
@@ -3500,113 +4868,30 @@ class ChessComInterface:
                 'windowsVirtualKeyCode': 27,
                 'nativeVirtualKeyCode': 27
             })
-            time.sleep(0.3)
 
-            # Check if the dialog is gone after Escape
-            still_open = self.driver.execute_script("""
-                const GAME_OVER_RE = /black won|white won|you won|you lost|you drew|draw|checkmate|stalemate|time.*out|flagged|resign|abandon/i;
-                const selectors =
-                    '[class*="modal"], [class*="dialog"], [class*="popup"], ' +
-                    '[class*="game-over"], [class*="result"]';
-                for (const el of document.querySelectorAll(selectors)) {
-                    const rect = el.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0 && GAME_OVER_RE.test(el.textContent || '')) {
-                        return true;
-                    }
-                }
-                return false;
-            """)
+            # Check if the dialog is gone after Escape (returns as soon as
+            # it closes, at most 300 ms)
+            self._ensure_helpers()
+            still_open = self._wait_for_game_over_dialog_closed(300)
 
             if not still_open:
                 print("[ChessCom] ✓ Dialog dismissed via Escape key")
                 return True
 
-            # --- Strategies 2 & 3: Find the close/X button, then CDP-click it ---
-            js_script = """
-            const SIDEBAR_RIGHT = arguments[0];
-            // Candidates: explicit close/dismiss buttons and aria-labelled buttons
-            const closeSelectors = [
-                '[aria-label="Close"]',
-                '[aria-label="close"]',
-                '[aria-label*="Close"]',
-                '[aria-label*="close"]',
-                '[class*="close"]',
-                '[class*="dismiss"]',
-                'button[class*="icon-"]'
-            ];
-
-            for (const sel of closeSelectors) {
-                for (const btn of document.querySelectorAll(sel)) {
-                    const rect = btn.getBoundingClientRect();
-                    if (rect.width <= 0 || rect.height <= 0) continue;
-
-                    // Must be inside a modal/dialog container
-                    const parent = btn.closest(
-                        '[class*="modal"], [class*="dialog"], [class*="popup"], [class*="game-over"]'
-                    );
-                    if (!parent) continue;
-
-                    const parentRect = parent.getBoundingClientRect();
-                    // X button is typically in upper-right corner of the dialog
-                    if (rect.right > parentRect.right - 60 && rect.top < parentRect.top + 60) {
-                        return {
-                            found: true,
-                            method: 'close_button',
-                            x: rect.left + rect.width / 2,
-                            y: rect.top + rect.height / 2
-                        };
-                    }
-                }
-            }
-
-            // If no X button found, fall back to backdrop (left of dialog).
-            // Only target large dialogs (actual modals, not small sidebar
-            // elements that happen to match the class selectors), and clamp
-            // the click x-coordinate so it never lands on the left sidebar.
-            const dialogs = document.querySelectorAll(
-                '[class*="modal"], [class*="dialog"], [class*="popup"], [class*="game-over"]'
-            );
-            for (const dialog of dialogs) {
-                const rect = dialog.getBoundingClientRect();
-                if (rect.width >= 250 && rect.height >= 200) {
-                    const bx = Math.max(SIDEBAR_RIGHT + 10, rect.left - 60);
-                    return {
-                        found: true,
-                        method: 'backdrop',
-                        x: bx,
-                        y: rect.top + rect.height / 2
-                    };
-                }
-            }
-
-            return { found: false };
-            """
-
-            result = self.driver.execute_script(js_script, self._get_sidebar_right())
+            # --- Strategies 2 & 3: Find the close/X button (or backdrop), then click it ---
+            result = self._call_helper('findDismissTarget', self._get_sidebar_right())
 
             if result.get('found'):
                 x = result['x']
                 y = result['y']
                 method = result['method']
 
-                # Strategy 2: CDP mouse click at the coordinates
+                # Strategy 2: mouse click at the coordinates
                 print(f"[ChessCom] Clicking to dismiss dialog ({method}) at ({x:.0f}, {y:.0f})")
 
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseMoved', 'x': x, 'y': y
-                })
-                time.sleep(0.05)
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mousePressed', 'x': x, 'y': y,
-                    'button': 'left', 'clickCount': 1
-                })
-                time.sleep(0.05)
-                self.driver.execute_cdp_cmd('Input.dispatchMouseEvent', {
-                    'type': 'mouseReleased', 'x': x, 'y': y,
-                    'button': 'left', 'clickCount': 1
-                })
+                self._click_at(x, y)
 
-                time.sleep(0.3)
+                self._wait_for_game_over_dialog_closed(300)
                 print("[ChessCom] ✓ Dialog dismissed")
                 return True
             else:
@@ -3622,32 +4907,35 @@ class ChessComInterface:
         """
         Get the current game state (whether in an active game or not).
 
+        One Runtime.evaluate returns the whole per-tick snapshot; the fresh
+        board rect it carries also refreshes the cached board params, so a
+        board that moved on screen is picked up without a re-probe.
+
         Returns:
             dict: {
                 'in_game': bool,
                 'username': str or None,
                 'color': str or None,
-                'turn': str or None
+                'turn': str or None,
+                'fen': str or None,
+                'board_rect': dict or None   # {'left', 'top', 'width'}
             }
         """
         try:
-            # Check if we can get player color (indicates active game)
-            # Use verbose=False to avoid spamming console during automatic monitoring
-            color = self.get_player_color(verbose=False)
-            turn = self.get_turn()
-            username = self.get_username_from_page(verbose=False)
-
-            # We're in a game if data-player is 0 or 2, which means color is 'white' or 'black'
-            # If color is 'unknown', it means data-player was None, so we're NOT in a game
-            # We only need to check color since data-player is the reliable indicator
-            in_game = (color in ['white', 'black'])
-
-            return {
-                'in_game': in_game,
-                'username': username,
-                'color': color,
-                'turn': turn
-            }
+            # Username, colour, turn, FEN and board rect are read in a single
+            # round-trip (previously get_player_color + get_turn +
+            # get_username_from_page).  We're in a game if data-player is 0
+            # or 2, which means color is 'white' or 'black'; 'unknown' means
+            # we're NOT in a game.
+            state = self._call_helper_cdp('getSnapshot')
+            if state['in_game']:
+                self._player_color_cache = state['color']
+            board_rect = state.get('board_rect')
+            if self._board_params_cache and board_rect and board_rect.get('width'):
+                is_flipped, board_size, _ = self._board_params_cache
+                self._board_params_cache = (is_flipped, board_size, board_rect)
+                self._set_board_geom(is_flipped, board_size, board_rect)
+            return state
 
         except Exception as e:
             print(f"[ChessCom] Error getting game state: {_short_err(e)}")
@@ -3655,7 +4943,9 @@ class ChessComInterface:
                 'in_game': False,
                 'username': None,
                 'color': None,
-                'turn': None
+                'turn': None,
+                'fen': None,
+                'board_rect': None
             }
 
     def get_variant_name(self):
@@ -3784,8 +5074,6 @@ class ChessComInterface:
         str | None  UCI move string ("g8h6", "a7a8q", …) or None if the text
                     cannot be parsed or the converted squares are out of range.
         """
-        import re
-
         # ── Normalise chess.com special Unicode piece symbols to ASCII ────────
         # Δ (Greek capital Delta) is used for the Dragon Bishop; replace it with
         # 'D' so the regex below can treat it as any other piece-letter prefix.
@@ -3879,461 +5167,9 @@ class ChessComInterface:
         num_files = board_size.get('files', 8)
         num_ranks = board_size.get('ranks', 8)
 
-        js_script = f"""
-        return (function() {{
-            // ── chess.com piece letter → UCI character ──────────────────────
-            // Used for class-encoded pieces ("piece wn").
-            // chess.com: E=Chancellor, H=Archbishop; UCI: c=Chancellor, a=Archbishop
-            const chesscomToUci = {{
-                'p': 'p', 'n': 'n', 'b': 'b', 'r': 'r',
-                'q': 'q', 'k': 'k',
-                'e': 'c',   // Chancellor  (chess.com E → UCI c)
-                'h': 'a',   // Archbishop  (chess.com H → UCI a)
-                'u': 'u', 'w': 'w', 'f': 'f', 'd': 'd'
-            }};
-
-            // data-piece values from the TheBoard architecture (uppercase).
-            // Δ is chess.com's symbol for the Dragon Bishop.
-            const dataPieceToUci = {{
-                'R':'r','N':'n','B':'b','Q':'q','K':'k','P':'p',
-                'E':'c', 'H':'a', 'Δ':'d', 'D':'d',
-                'U':'u', 'W':'w', 'F':'f'
-            }};
-
-            // data-color: chess.com's internal player-color codes.
-            const dataColorToStr = {{ '5': 'white', '6': 'black' }};
-
-            const numFiles  = {num_files};
-            const numRanks  = {num_ranks};
-            const isFlipped = {str(is_flipped).lower()};
-
-            // ── Read last move text from move list ──────────────────────────
-            // Reuses the same selector as get_turn().
-            let lastMoveText  = null;
-            let lastMoveTitle = null;   // title attribute – contains raw 14×14 coords
-            let actualMovesLength = 0;  // total moves played (used to determine castling color)
-            const moveTable = document.querySelector('.moves-table');
-            if (moveTable) {{
-                const moveCells = moveTable.querySelectorAll(
-                    '.moves-table-cell.moves-move'
-                );
-                const actualMoves = Array.from(moveCells).filter(
-                    c => c.textContent.trim().length > 0
-                );
-                actualMovesLength = actualMoves.length;
-                if (actualMoves.length > 0) {{
-                    const lastCell = actualMoves[actualMoves.length - 1];
-                    const raw = lastCell.textContent.trim();
-                    // Strip check (+) and mate (#) markers – irrelevant to what moved
-                    lastMoveText  = raw.replace(/[+#]/g, '');
-                    // The title attribute lives on an inner child (e.g. the
-                    // .moves-pointer element), not on the outer cell element.
-                    lastMoveTitle = lastCell.getAttribute('title')
-                                 || lastCell.querySelector('[title]')?.getAttribute('title');
-                }}
-            }}
-
-            // ── Locate the board ────────────────────────────────────────────
-            const board = document.querySelector('.TheBoard-squares') ||
-                          document.querySelector('[class*="Board-squares"]') ||
-                          document.querySelector('.board') ||
-                          document.querySelector('[class*="board"]');
-            if (!board) return {{ error: 'Board not found' }};
-
-            // Use the board dimensions from detect_board_size() (coordinate-label
-            // detection).  A previous DOM child-count heuristic was unreliable:
-            // on 10x8 boards the board element's direct children are file-columns
-            // (10 items), not rank-rows, so it returned files/ranks swapped.
-            const numFilesActual = numFiles;
-            const numRanksActual = numRanks;
-
-            const boardRect  = board.getBoundingClientRect();
-            const squareW    = boardRect.width  / numFiles;
-            const squareH    = boardRect.height / numRanks;
-
-            // ── Pixel → algebraic square ────────────────────────────────────
-            function pixelToSquare(cx, cy) {{
-                if (cx < boardRect.left - 2 || cx > boardRect.right  + 2) return null;
-                if (cy < boardRect.top  - 2 || cy > boardRect.bottom + 2) return null;
-
-                const fi = Math.min(Math.floor((cx - boardRect.left) / squareW), numFiles - 1);
-                const ri = Math.min(Math.floor((cy - boardRect.top)  / squareH), numRanks - 1);
-
-                let file, rank;
-                if (isFlipped) {{
-                    file = String.fromCharCode('a'.charCodeAt(0) + (numFiles - 1 - fi));
-                    rank = ri + 1;
-                }} else {{
-                    file = String.fromCharCode('a'.charCodeAt(0) + fi);
-                    rank = numRanks - ri;
-                }}
-                return file + rank;
-            }}
-
-            // ── Extract UCI piece type from element's className ──────────────
-            function pieceTypeFromClass(cls) {{
-                if (typeof cls !== 'string') return null;
-                // Pattern: "piece w<letter>" or "piece b<letter>"
-                const m = cls.match(/piece\\s+[wb]([a-z])/);
-                if (!m) return null;
-                return chesscomToUci[m[1]] || m[1];
-            }}
-
-            // ── Extract color ('white'/'black') from className ──────────────
-            function pieceColorFromClass(cls) {{
-                if (typeof cls !== 'string') return null;
-                const m = cls.match(/piece\\s+([wb])/);
-                if (!m) return null;
-                return m[1] === 'w' ? 'white' : 'black';
-            }}
-
-            // ── Element-level helpers: prefer data-* attrs (TheBoard arch) ──
-            // Falls back to class-based detection for the traditional .board.
-            function pieceTypeFromEl(el) {{
-                const dp = el.getAttribute('data-piece');
-                if (dp) return dataPieceToUci[dp] || null;
-                return pieceTypeFromClass(el.className);
-            }}
-            function pieceColorFromEl(el) {{
-                const dc = el.getAttribute('data-color');
-                if (dc) return dataColorToStr[dc] || null;
-                return pieceColorFromClass(el.className);
-            }}
-
-            // ── Collect highlighted squares ─────────────────────────────────
-            const highlightEls = document.querySelectorAll('[class*="highlight"]');
-            const seenSquares  = new Set();
-            const highlighted  = [];
-            const rawHighlightCount = highlightEls.length;
-
-            // Helper: extract an algebraic square name (e.g. "f3") from a
-            // title/aria-label string, e.g. "Square f3", "f3 highlight", "f3".
-            function sqFromTitle(attr) {{
-                if (!attr) return null;
-                const m = attr.match(/\b([a-n]\d{{1,2}})\b/i);
-                return m ? m[1].toLowerCase() : null;
-            }}
-
-            // Primary: title attribute first (most direct + works for variants),
-            // then pixel-based getBoundingClientRect as fallback.
-            for (const el of highlightEls) {{
-                const rect = el.getBoundingClientRect();
-                if (rect.width === 0 || rect.height === 0) continue;
-                const cx = (rect.left + rect.right)  / 2;
-                const cy = (rect.top  + rect.bottom) / 2;
-
-                // Try title/aria-label on the element and its nearest ancestor
-                let sq = sqFromTitle(el.getAttribute('title'))
-                      || sqFromTitle(el.getAttribute('aria-label'))
-                      || sqFromTitle(el.parentElement?.getAttribute('title'))
-                      || sqFromTitle(el.parentElement?.getAttribute('aria-label'))
-                      || sqFromTitle(el.closest('[title]')?.getAttribute('title'));
-                if (!sq) sq = pixelToSquare(cx, cy);
-
-                if (!sq || seenSquares.has(sq)) continue;
-                seenSquares.add(sq);
-                highlighted.push({{ square: sq,
-                    left: rect.left, right: rect.right,
-                    top:  rect.top,  bottom: rect.bottom }});
-            }}
-
-            // Fallback 1: extract square from CSS class (e.g. 'square-35' → 'c5').
-            // Used when the pixel approach finds nothing – e.g. elements are
-            // inside a shadow DOM or the board rect belongs to a different
-            // container than where the highlights are positioned.
-            if (highlighted.length === 0) {{
-                for (const el of highlightEls) {{
-                    const cls = typeof el.className === 'string' ? el.className : '';
-                    const m = cls.match(/(?:^| )square-(\d+)(?= |$)/);
-                    if (!m) continue;
-                    const code = m[1];
-                    // chess.com square code: last char = rank (1-8),
-                    // leading chars = file index (1=a, 2=b, …, 10=j, …)
-                    const rankNum   = parseInt(code.slice(-1), 10);
-                    const fileDigit = parseInt(code.slice(0, -1), 10);
-                    if (isNaN(rankNum) || isNaN(fileDigit) || fileDigit < 1) continue;
-                    const sq = String.fromCharCode('a'.charCodeAt(0) + fileDigit - 1) + rankNum;
-                    if (seenSquares.has(sq)) continue;
-                    seenSquares.add(sq);
-                    highlighted.push({{ square: sq }});
-                }}
-            }}
-
-            // Fallback 2: scan every square's computed background colour.
-            // Chess.com variants don't add a CSS class or inline style to
-            // highlighted squares; instead the highlight is applied via CSS
-            // rules that change the element's rendered background.
-            // Strategy:
-            //   • collect getComputedStyle().backgroundColor for all squares
-            //   • the two most frequent colours are the normal light/dark tile colours
-            //   • any square with a different colour is a highlight candidate
-            //   • piece presence is determined by a direct rect-overlap test
-            //     against each piece element's getBoundingClientRect() – this
-            //     avoids the globally-built pieceMap which has wrong keys when
-            //     board-size detection is off (e.g. 8×8 detected for a 10×10 board)
-            if (highlighted.length === 0 && board) {{
-                // Snapshot piece visual centres before entering the square loop
-                const pieceCenters = [];
-                for (const el of document.querySelectorAll('[class*="piece"]')) {{
-                    const r = el.getBoundingClientRect();
-                    if (r.width === 0 || r.height === 0) continue;
-                    const pt = pieceTypeFromEl(el);
-                    const pc = pieceColorFromEl(el);
-                    if (!pt || !pc) continue;
-                    pieceCenters.push({{
-                        cx: (r.left + r.right) / 2,
-                        cy: (r.top  + r.bottom) / 2,
-                        left: r.left, right: r.right, top: r.top, bottom: r.bottom,
-                        pieceType: pt, pieceColor: pc
-                    }});
-                }}
-
-                const bgCount = {{}};
-                const allSqBgs = [];
-                for (const rankRow of board.children) {{
-                    for (const sqEl of rankRow.children) {{
-                        const bg = window.getComputedStyle(sqEl).backgroundColor;
-                        bgCount[bg] = (bgCount[bg] || 0) + 1;
-                        allSqBgs.push({{ sqEl, bg }});
-                    }}
-                }}
-                // Two most common bg colours = normal square colours
-                const normalBgs = new Set(
-                    Object.entries(bgCount)
-                          .sort((a, b) => b[1] - a[1])
-                          .slice(0, 2)
-                          .map(([c]) => c)
-                );
-                for (const {{ sqEl, bg }} of allSqBgs) {{
-                    if (normalBgs.has(bg)) continue;
-                    const sqRect = sqEl.getBoundingClientRect();
-                    if (sqRect.width === 0 || sqRect.height === 0) continue;
-                    const cx = (sqRect.left + sqRect.right) / 2;
-                    const cy = (sqRect.top  + sqRect.bottom) / 2;
-                    const sq = pixelToSquare(cx, cy);
-                    if (!sq || seenSquares.has(sq)) continue;
-                    seenSquares.add(sq);
-                    // Overlap test: find a piece whose visual centre is inside this square
-                    let piece = null, color = null;
-                    for (const pc of pieceCenters) {{
-                        if (pc.cx >= sqRect.left && pc.cx <= sqRect.right &&
-                            pc.cy >= sqRect.top  && pc.cy <= sqRect.bottom) {{
-                            piece = pc.pieceType;
-                            color = pc.pieceColor;
-                            break;
-                        }}
-                    }}
-                    highlighted.push({{ square: sq, piece, color }});
-                }}
-            }}
-
-            // ── Collect board pieces ────────────────────────────────────────
-            // Map: square → {{ pieceType, pieceColor }}
-            //
-            // Strategy: walk the board DOM (rank-rows → square elements) so
-            // that we can read each square element's title/aria-label for the
-            // square name, and look for piece children inside it.  This avoids
-            // calling pixelToSquare on piece elements whose bounding rect can be
-            // slightly off due to CSS transitions / animations.
-            //
-            // If pieces are NOT children of their square elements (some board
-            // implementations float all pieces at the board root), the fallback
-            // global scan uses the overlap approach instead.
-            const pieceMap = {{}};
-            let piecesFoundViaStructure = 0;
-
-            for (const rankRow of board.children) {{
-                for (const sqEl of rankRow.children) {{
-                    const sqRect = sqEl.getBoundingClientRect();
-                    if (sqRect.width === 0 || sqRect.height === 0) continue;
-
-                    // Square name: title attr > aria-label > pixelToSquare on centre
-                    let sqName = sqFromTitle(sqEl.getAttribute('title'))
-                              || sqFromTitle(sqEl.getAttribute('aria-label'));
-                    if (!sqName) {{
-                        const cx = (sqRect.left + sqRect.right) / 2;
-                        const cy = (sqRect.top  + sqRect.bottom) / 2;
-                        sqName = pixelToSquare(cx, cy);
-                    }}
-                    if (!sqName) continue;
-
-                    // Find a piece that is a descendant of this square element
-                    for (const child of sqEl.querySelectorAll('[class*="piece"]')) {{
-                        const pt = pieceTypeFromEl(child);
-                        const pc = pieceColorFromEl(child);
-                        if (pt && pc) {{
-                            pieceMap[sqName] = {{ pieceType: pt, pieceColor: pc }};
-                            piecesFoundViaStructure++;
-                            break;
-                        }}
-                    }}
-                }}
-            }}
-
-            // Fallback: if no pieces were found as square children (pieces live
-            // at the board root), scan globally and use a spatial overlap test
-            // against the highlighted square rects to assign them.
-            const pieceEls = document.querySelectorAll('[class*="piece"]');
-            if (piecesFoundViaStructure === 0) {{
-                for (const el of pieceEls) {{
-                    const pieceType  = pieceTypeFromEl(el);
-                    const pieceColor = pieceColorFromEl(el);
-                    if (!pieceType || !pieceColor) continue;
-
-                    const rect = el.getBoundingClientRect();
-                    if (rect.width === 0 || rect.height === 0) continue;
-                    const cx = (rect.left + rect.right) / 2;
-                    const cy = (rect.top  + rect.bottom) / 2;
-                    const sq = pixelToSquare(cx, cy);
-                    if (!sq) continue;
-                    pieceMap[sq] = {{ pieceType, pieceColor }};
-                }}
-            }}
-
-            // ── Annotate each highlighted square with its piece ─────────────
-            const annotated = highlighted.map(h => {{
-                const p = pieceMap[h.square];
-                return {{
-                    square: h.square,
-                    piece:  p ? p.pieceType  : null,
-                    color:  p ? p.pieceColor : null
-                }};
-            }});
-
-            // ── Piece-map diagnostic (runs when highlights exist but all lack piece) ──
-            const pieceMapDiag = (annotated.length > 0 && annotated.every(h => !h.piece))
-                ? (() => {{
-                    // TheBoard-pieces is a separate layer; its children are the
-                    // actual piece elements.  Capture their classes so we can
-                    // update pieceTypeFromClass to match.
-                    const piecesLayer = document.querySelector('.TheBoard-pieces');
-                    const layerChildren = piecesLayer
-                        ? Array.from(piecesLayer.children).slice(0, 5).map(c => ({{
-                            cls:       c.className,
-                            title:     c.getAttribute('title'),
-                            ariaLabel: c.getAttribute('aria-label'),
-                            dataAttrs: Object.fromEntries(
-                                Array.from(c.attributes)
-                                     .filter(a => a.name.startsWith('data-'))
-                                     .map(a => [a.name, a.value])
-                            ),
-                            style:     (c.getAttribute('style') || '').slice(0, 80)
-                          }}))
-                        : null;
-                    return {{
-                        pieceMapKeys:          Object.keys(pieceMap).slice(0, 10),
-                        piecesFoundViaStruct:  piecesFoundViaStructure,
-                        totalPieceEls:         pieceEls.length,
-                        samplePieceClass:      pieceEls[0] ? pieceEls[0].className : null,
-                        sampleSqTitle:         board.children[0]?.children[0]?.getAttribute('title'),
-                        sampleSqAriaLabel:     board.children[0]?.children[0]?.getAttribute('aria-label'),
-                        highlightedSquares:    annotated.map(h => h.square),
-                        piecesLayerChildren:   layerChildren
-                    }};
-                  }})()
-                : null;
-
-            // ── Diagnostic: DOM inspection when no highlights found ─────────────
-            let diag = null;
-            if (rawHighlightCount === 0 && board && board.parentElement) {{
-
-                // 1. Class-frequency map inside the board wrapper.
-                //    Elements that appear only 1-2 times are candidates for
-                //    highlight squares (from + to square).
-                const classCounts = {{}};
-                for (const el of board.parentElement.querySelectorAll('*')) {{
-                    for (const cls of el.classList) {{
-                        classCounts[cls] = (classCounts[cls] || 0) + 1;
-                    }}
-                }}
-                const rareClasses = Object.entries(classCounts)
-                    .filter(([, n]) => n <= 4)
-                    .sort((a, b) => a[1] - b[1])
-                    .slice(0, 20);
-
-                // 2. CSS custom properties set via inline style on the board
-                //    and every ancestor up to <body>.
-                const cssVarChain = [];
-                let el = board;
-                while (el && el.tagName !== 'BODY') {{
-                    const st = el.getAttribute('style') || '';
-                    if (st.includes('--')) {{
-                        cssVarChain.push({{
-                            cls:   (el.className || '').slice(0, 60),
-                            style: st.slice(0, 300)
-                        }});
-                    }}
-                    el = el.parentElement;
-                }}
-
-                // 3. Canvas / SVG elements anywhere in the board wrapper.
-                const canvases = Array.from(
-                    board.parentElement.querySelectorAll('canvas, svg')
-                ).map(c => ({{
-                    tag: c.tagName,
-                    id:  c.id,
-                    cls: (c.className && c.className.baseVal !== undefined
-                          ? c.className.baseVal : c.className || '').slice(0, 60),
-                    w:   c.getAttribute('width'),
-                    h:   c.getAttribute('height'),
-                    childCount: c.children.length
-                }}));
-
-                // 4. Computed background of individual squares (catches highlight
-                //    colours applied via CSS rules that don't change className).
-                //    Also samples the ::before pseudo-element background.
-                const squareBgs = [];
-                let ri = 0;
-                for (const rankRow of board.children) {{
-                    let ci = 0;
-                    for (const sq of rankRow.children) {{
-                        const cs   = window.getComputedStyle(sq);
-                        const csBefore = window.getComputedStyle(sq, '::before');
-                        const bg   = cs.backgroundColor;
-                        const bgB  = csBefore.backgroundColor;
-                        const transparent = ['rgba(0, 0, 0, 0)', 'transparent', ''];
-                        if (!transparent.includes(bg) || !transparent.includes(bgB)) {{
-                            squareBgs.push({{ ri, ci, bg, bgBefore: bgB }});
-                        }}
-                        ci++;
-                    }}
-                    ri++;
-                }}
-
-                // 5. Last non-empty move-list cell outer-HTML.
-                const moveCells2 = document.querySelectorAll('.moves-table-cell.moves-move');
-                const lastNonEmpty = Array.from(moveCells2)
-                    .filter(c => c.textContent.trim().length > 0)
-                    .pop();
-                const lastCellHtml = lastNonEmpty ? lastNonEmpty.outerHTML : null;
-
-                diag = {{
-                    rareClasses,
-                    cssVarChain,
-                    canvases,
-                    squareBgs:   squareBgs.slice(0, 10),
-                    lastCellHtml
-                }};
-            }}
-
-            return {{
-                highlights:        annotated,
-                numHighlights:     annotated.length,
-                pieceMap:          pieceMap,
-                lastMoveText:      lastMoveText,
-                lastMoveTitle:     lastMoveTitle,
-                numFilesActual:    numFilesActual,
-                numRanksActual:    numRanksActual,
-                rawHighlightCount: rawHighlightCount,
-                actualMovesLength: actualMovesLength,
-                pieceMapDiag:      pieceMapDiag,
-                diag:              diag
-            }};
-        }})();
-        """
-
         try:
-            data = self.driver.execute_script(js_script)
+            data = self.driver.execute_script(
+                _LAST_MOVE_JS, num_files, num_ranks, bool(is_flipped))
         except Exception as e:
             if verbose:
                 print(f"[getmove] Script error: {_short_err(e)}")
@@ -1,6 +1,18 @@
 """UCI protocol handler for chess variant engines."""
+import functools
 import re
 
+# Regular UCI move: source square + destination square + optional promotion.
+# Files: a-n (up to 14 files); ranks: 1-14; promotion pieces:
+# q, r, b, n, k, u, w, f, a, c, d (variants: Unicorn, Wazir, Ferz,
+# Archbishop, Chancellor, Dragon Bishop).  Matched against the lowercased
+# move.
+_REGULAR_MOVE_RE = re.compile(
+    r'^([a-n])([1-9][0-4]?)([a-n])([1-9][0-4]?)([qrbnkuwfacd]?)$')
+
+# Drop move for Crazyhouse/variants: <PIECE>@<square>, e.g. P@e5, N@g3.
+_DROP_MOVE_RE = re.compile(r'^([QRNBPUWFACDqrnbpuwfacd])@([a-nA-N][1-9][0-4]?)$')
+
 
 class UCIHandler:
     """Handles UCI protocol parsing and validation."""
@@ -17,21 +29,7 @@ class UCIHandler:
         Returns:
             bool: True if valid UCI format, False otherwise
         """
-        # Regular UCI move pattern: e2e4, a7a8q, j1j8 (with promotion)
-        # For all board sizes: source square + destination square + optional promotion
-        # Files: a-n (supports up to 14 files)
-        # Ranks: 1-14 (supports up to 14 ranks)
-        # Promotion pieces: q, r, b, n, k, u, w, f, a, c, d (variants: Unicorn, Wazir, Ferz, Archbishop, Chancellor, Dragon Bishop)
-        regular_pattern = r'^[a-n][1-9][0-4]?[a-n][1-9][0-4]?[qrbnkuwfacd]?$'
-
-        # Drop move pattern for Crazyhouse/variants: P@e5, N@g3, Q@d8, etc.
-        # Format: <PIECE>@<square> where PIECE is Q, R, N, B, P, U, W, F, A, C, D
-        # Pattern is case-insensitive for squares
-        drop_pattern = r'^[QRNBPUWFACDqrnbpuwfacd]@[a-nA-N][1-9][0-4]?$'
-
-        move_lower = move.lower()
-
-        return bool(re.match(regular_pattern, move_lower)) or bool(re.match(drop_pattern, move))
+        return bool(_REGULAR_MOVE_RE.match(move.lower()) or _DROP_MOVE_RE.match(move))
 
     @staticmethod
     def parse_uci_move(move):
@@ -48,40 +46,23 @@ class UCIHandler:
                 - Drop move: {'type': 'drop', 'piece': 'N', 'to': 'g3'}
             None: If move is invalid
         """
-        move = move.strip()
-
-        if not UCIHandler.validate_uci_move(move):
-            return None
-
-        # Check if it's a drop move (contains '@')
-        if '@' in move:
-            # Drop move: P@e5, N@g3, etc.
-            parts = move.upper().split('@')
-            if len(parts) != 2:
-                return None
-
-            piece = parts[0]  # Q, R, N, B, or P
-            square = parts[1].lower()  # e5, g3, etc.
-
-            return {
-                'type': 'drop',
-                'piece': piece,
-                'to': square
-            }
-        else:
-            # Regular move: e2e4, a7a8q, j10j12, etc.
-            move_lower = move.lower()
-
-            # Parse using regex to handle multi-digit ranks
-            # Pattern: <file><rank><file><rank><promotion?>
-            pattern = r'^([a-n])([1-9][0-4]?)([a-n])([1-9][0-4]?)([qrbnkuwfacd]?)$'
-            match = re.match(pattern, move_lower)
+        parsed = UCIHandler._parse_uci_move_cached(move.strip())
+        # Hand out a copy so callers cannot corrupt the memoized result
+        return dict(parsed) if parsed else None
 
-            if not match:
-                return None
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _parse_uci_move_cached(move):
+        """
+        Memoized body of parse_uci_move().
 
+        The same move is typically parsed several times per turn (make_move
+        plus each fallback and retry), so results are cached.
+        """
+        # One precompiled match per form; the groups are the parse
+        match = _REGULAR_MOVE_RE.match(move.lower())
+        if match:
             from_file, from_rank, to_file, to_rank, promotion = match.groups()
-
             return {
                 'type': 'normal',
                 'from': from_file + from_rank,
@@ -89,6 +70,15 @@ class UCIHandler:
                 'promotion': promotion if promotion else None
             }
 
+        match = _DROP_MOVE_RE.match(move)
+        if match:
+            # Drop move: P@e5, N@g3, etc.
+            return {
+                'type': 'drop',
+                'piece': match.group(1).upper(),
+                'to': match.group(2).lower()
+            }
+
         return None
 
     @staticmethod
@@ -6,6 +6,7 @@ import sys
 import tempfile
 import time
 import threading
+import traceback
 from collections import deque
 from browser_launcher import BrowserLauncher
 from chesscom_interface import ChessComInterface
@@ -97,6 +98,9 @@ class VariantsClient:
         self.monitor_thread = None
         self.monitor_thread_running = False
         self.monitor_interval = 0.010  # Poll JS flags every 10ms (~1 frame at 60 fps)
+        # Set to cut the monitor's inter-poll wait short: after we play a
+        # move (so its observer flag is read at once) and on shutdown.
+        self._monitor_wake = threading.Event()
         # Automated variant-loop state
         self.loop_running = False
         self.loop_thread = None
@@ -202,7 +206,6 @@ class VariantsClient:
             print("  - Make sure Microsoft Edge is installed")
             print("  - Close any existing Edge windows and try again")
             print("  - Check that port 9223 is not in use")
-            import traceback
             traceback.print_exc()
         finally:
             self.cleanup()
@@ -218,7 +221,8 @@ class VariantsClient:
                 self.process_console_events()
                 # Reset failure counter on success
                 self._session_fail_count = 0
-                time.sleep(self.monitor_interval)
+                if self._monitor_wake.wait(self.monitor_interval):
+                    self._monitor_wake.clear()
             except Exception as e:
                 err_str = str(e).lower()
                 is_session_dead = any(
@@ -239,8 +243,10 @@ class VariantsClient:
                         if self._attempt_session_recovery():
                             continue  # recovered — resume monitoring
                         else:
-                            # Back off before retrying recovery
-                            time.sleep(10)
+                            # Back off before retrying recovery (a
+                            # shutdown request ends the back-off early)
+                            self._monitor_wake.wait(10)
+                            self._monitor_wake.clear()
                     else:
                         # Brief pause before next attempt
                         time.sleep(0.5)
@@ -251,22 +257,14 @@ class VariantsClient:
     def process_console_events(self):
         """
         Poll JS global flags set by MutationObservers in the browser.
-        Uses execute_script instead of get_log (which requires logging prefs at launch).
+        Uses Runtime.evaluate instead of get_log (which requires logging prefs at launch).
         """
         try:
-            driver = self.chesscom_interface.driver
-
-            # Poll board change flag and reset atomically
-            board_changed = driver.execute_script(
-                "var v = window.__boardChanged; window.__boardChanged = false; return v;"
-            )
+            # Poll and reset both observer flags atomically in one call
+            board_changed, game_over = self.chesscom_interface.poll_observer_flags()
             if board_changed:
                 self.handle_board_changed()
 
-            # Poll game over flag and reset atomically
-            game_over = driver.execute_script(
-                "var v = window.__gameOver; window.__gameOver = false; return v;"
-            )
             if game_over:
                 self.handle_game_over()
 
@@ -568,6 +566,7 @@ class VariantsClient:
         if self.monitor_thread and self.monitor_thread.is_alive():
             print("[Monitor] ⏸ Stopping background monitoring thread...")
             self.monitor_thread_running = False
+            self._monitor_wake.set()
             self.monitor_thread.join(timeout=2.0)  # Wait up to 2 seconds
             self.monitor_thread = None
 
@@ -1237,6 +1236,7 @@ class VariantsClient:
                 success = self.chesscom_interface.make_move(user_input)
 
                 if success:
+                    self._monitor_wake.set()
                     print("[Success] Move executed!")
                     # Verify the move registered in the background so the
                     # terminal prompt returns immediately.  If a disconnect
@@ -1446,7 +1446,9 @@ class VariantsClient:
             t_exec_start = time.monotonic()
             success = self.chesscom_interface.make_move(uci_move)
             exec_ms = int((time.monotonic() - t_exec_start) * 1000)
-            if not success:
+            if success:
+                self._monitor_wake.set()
+            else:
                 _bg_print(f"[Engine] ✗ Failed to execute move: {uci_move}")
             total_ms = detect_ms + think_ms + exec_ms
             overhead_ms = total_ms - think_ms